@@ -1,36 +1,73 @@
 import streamlit as st
 import pandas as pd
-import io
+from brvm.alerts import AlertStore, evaluate
+from brvm.csv_import import import_directory, to_price_sheets
+from brvm.snapshot import export_snapshot
+from brvm.sqlite_store import PriceDatabase
+from brvm.workbook import content_hash, get_workbook, share_workbook
 
-def load_sheet_data(uploaded_file, sheet_name):
-    data = pd.read_excel(uploaded_file, sheet_name=sheet_name)
+def load_sheet_data(workbook, sheet_name):
+    data = workbook.raw_sheet(sheet_name)
     return data
 
 def setup_streamlit_app():
     st.set_page_config(page_title="Investor Dashboard", page_icon="📊", layout="wide")
     st.markdown("<h1 style='text-align: center;'>Data 📊</h1>", unsafe_allow_html=True)
     
-    uploaded_file = st.file_uploader("Importer les données (.xlsm)", type=['xlsm'])
+    uploaded_file = st.file_uploader("Importer les données (.xlsm ou instantané .zip)", type=['xlsm', 'zip'])
     if uploaded_file is not None:
-        st.session_state['uploaded_file'] = io.BytesIO(uploaded_file.getvalue())
-        xl = pd.ExcelFile(st.session_state['uploaded_file'])
-        sheet_names = xl.sheet_names
+        # Le classeur n'est analysé qu'une fois par contenu, puis partagé par toutes les pages
+        workbook = get_workbook(st.session_state, uploaded_file.getvalue())
+        sheet_names = workbook.sheet_names
 
         # Chargement des noms de colonnes de la feuille "MAX" pour utilisation ultérieure
         if "MAX" in sheet_names:
-            max_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name="MAX")
-            st.session_state['max_columns'] = max_data.columns.tolist()  # Stockage des noms des colonnes
+            st.session_state['max_columns'] = workbook.columns("MAX")  # Stockage des noms des colonnes
 
         selected_sheet = st.selectbox('Visualisation des données', sheet_names, index=sheet_names.index('MAX') if 'MAX' in sheet_names else 0)
-        data = load_sheet_data(st.session_state['uploaded_file'], selected_sheet)
+        data = load_sheet_data(workbook, selected_sheet)
         
         st.session_state['df'] = data
         st.session_state['selected_sheet_index'] = sheet_names.index(selected_sheet)
         
         st.dataframe(data)
 
+        # Import des exports CSV par action (même format que DANGSUG.csv)
+        csv_directory = st.text_input("Dossier d'exports CSV par action", help="Fichiers séparés par ';' au format de DANGSUG.csv ; leurs cours remplacent ceux du classeur.")
+        if csv_directory and st.button("Importer les CSV"):
+            frames = import_directory(csv_directory)
+            if frames:
+                # Le classeur est partagé entre sessions : les CSV donnent une variante sous une autre clé
+                key = content_hash(workbook.key.encode() + b''.join(pd.util.hash_pandas_object(frames[ticker]).to_numpy().tobytes() + ticker.encode() for ticker in sorted(frames)))
+                source = workbook
+                workbook = share_workbook(st.session_state, key, lambda: source.with_prices(to_price_sheets(frames), key))
+                st.session_state['max_columns'] = workbook.columns("MAX")
+                st.success(f"{len(frames)} action(s) importée(s) depuis {csv_directory}")
+            else:
+                st.warning(f"Aucun fichier CSV trouvé dans {csv_directory}")
+
+        # Instantané (feuilles + cube de prix) à réimporter à la place du .xlsm, sans analyse Excel
+        if st.button("Préparer un instantané"):
+            st.session_state['snapshot'] = (workbook.key, export_snapshot(workbook))
+        if st.session_state.get('snapshot', (None,))[0] == workbook.key:
+            st.download_button("Télécharger l'instantané", st.session_state['snapshot'][1], file_name=f"instantane_{workbook.key[:12]}.zip", mime="application/zip")
+
+        # Sauvegarde optionnelle dans la base SQLite locale (historique conservé entre les sessions)
+        if st.button("Enregistrer dans la base locale"):
+            database = PriceDatabase()
+            count = database.load_workbook(workbook)
+            database.close()
+            st.success(f"{count} cours enregistrés dans la base locale")
+
+        # Règles d'alerte évaluées sur toutes les actions, une seule fois par nouvelle séance de données
+        store = AlertStore()
+        fired = evaluate(workbook, store)
+        store.close()
+        if fired:
+            st.info(f"{fired} nouvelle(s) alerte(s) déclenchée(s) : voir la page Alertes.")
+
 def main():
-    if 'uploaded_file' in st.session_state:
+    if 'workbook' in st.session_state:
         setup_streamlit_app()
     else:
         setup_streamlit_app()
@@ -0,0 +1,47 @@
+import streamlit as st
+from brvm.screener import screen
+from brvm.signals import SIGNALS
+
+# Configuration de la page
+st.set_page_config(page_title="Investor Dashboard", page_icon="🔎", layout="wide")
+st.markdown("<h1 style='text-align: center;'>🔎 Screener du marché 🔎</h1>", unsafe_allow_html=True)
+
+# Classeur chargé sur la page Data (feuilles lues une seule fois)
+workbook = st.session_state.get('workbook')
+if workbook is None:
+    st.error("Les données n'ont pas été chargées. Veuillez d'abord charger le fichier sur la page de données.")
+    st.stop()
+
+# Signaux des Indicateurs Techniques et score global de toutes les actions, calculés une fois par classeur
+table = screen(workbook)
+
+# Filtres
+col1, col2, col3 = st.columns(3)
+with col1:
+    recommendations = st.multiselect("Recommandation :", ['Acheter', 'Neutre', 'Vendre'], default=['Acheter', 'Neutre', 'Vendre'])
+with col2:
+    min_score = st.slider("Score global minimum :", 0, 100, 0, step=5)
+with col3:
+    search = st.text_input("Action :", help="Filtrer les actions dont le nom contient ce texte")
+required = st.multiselect("Signaux à l'achat exigés :", SIGNALS)
+
+filtered = table[table['Recommandation'].isin(recommendations) & (table['Score'] >= min_score)]
+if search:
+    filtered = filtered[filtered.index.str.contains(search, case=False, regex=False)]
+for name in required:
+    filtered = filtered[filtered[name] == 'Acheter']
+
+st.markdown(f"**{len(filtered)}** action(s) sur {len(table)} — cliquez sur un en-tête de colonne pour trier.")
+
+
+def highlight_action(val):
+    color = 'red' if val == 'Vendre' else 'blue' if val == 'Acheter' else 'black'
+    return f'color: {color};'
+
+
+st.dataframe(
+    filtered.style.map(highlight_action, subset=['Recommandation'] + SIGNALS).format(
+        {'Cours': '{:.2f}', 'Score': '{:.1f}', 'RSI': '{:.2f}', 'ROC %': '{:.2f}'}, na_rep='-'),
+    use_container_width=True,
+    height=min(38 * (len(filtered) + 1), 900),
+)
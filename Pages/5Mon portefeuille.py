@@ -1,13 +1,15 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from ta.trend import SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
 import plotly.graph_objects as go
-from ta.volatility import BollingerBands
-from ta.trend import MACD
-from ta.momentum import ROCIndicator, StochRSIIndicator
-from ta.trend import CCIIndicator
+from brvm.allocation import allocation
+from brvm.correlation import cluster_order, correlation_state
+from brvm.indicators import START, TickerIndicators
+from brvm.montecarlo import METHODS, project
+from brvm.portfolio import TRANSACTION_COLUMNS, Portfolio, transactions
+from brvm.risk import max_drawdown, risk_metrics, risk_table
+from brvm.signals import score_matrix, ticker_signals, weekly_scores
 
 # Configuration de la page
 st.set_page_config(page_title="Investor Dashboard", page_icon="💰", layout="wide")
@@ -87,6 +89,9 @@ st.markdown("""
 
 st.markdown("<h1 style='text-align: center;'>💰Tableau de Bord de l'investisseur 💰</h1>", unsafe_allow_html=True)
 
+# Classeur chargé sur la page Data (feuilles lues une seule fois)
+workbook = st.session_state.get('workbook')
+
 # Zone de sélection du marché
 st.markdown("#### Sélectionnez le marché")
 market = st.selectbox("Marché:", ["BRVM"], index=0, help="Sélectionnez le marché pour afficher les données correspondantes.")
@@ -123,47 +128,19 @@ with col1:
     st.markdown("<div class='section-title'>📈 Analyse Technique</div>", unsafe_allow_html=True)
     if 'max_columns' in st.session_state and action:
         # Chargement et préparation des données
-        data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
+        data = workbook.cours()
         data = data[::-1]  # Inverser si nécessaire
-        data['Date'] = pd.to_datetime(data['Date'])
-        filtered_data = data[data['Date'].dt.year >= 2021]
-
-        ouverture_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='OUVERTURE')
-        ouverture_data['Date'] = pd.to_datetime(ouverture_data['Date'])
-
-        max_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MAX')
-        max_data['Date'] = pd.to_datetime(max_data['Date'])
-
-        min_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MIN')
-        min_data['Date'] = pd.to_datetime(min_data['Date'])
+        filtered_data = data[data['Date'] >= pd.Timestamp(START)]
 
         # Supprimer les valeurs nulles dans la colonne Date
         filtered_data.dropna(subset=['Date'], inplace=True)
-        ouverture_data.dropna(subset=['Date'], inplace=True)
-        max_data.dropna(subset=['Date'], inplace=True)
-        min_data.dropna(subset=['Date'], inplace=True)
-
-        # Aligner les données par date
-        merged_data = pd.merge(filtered_data, ouverture_data, on='Date', suffixes=('', '_open'))
-        merged_data = pd.merge(merged_data, max_data, on='Date', suffixes=('', '_max'))
-        merged_data = pd.merge(merged_data, min_data, on='Date', suffixes=('', '_min'))
-
-        # Renommer les colonnes pour plus de clarté
-        merged_data.rename(columns={
-            action: 'Close',
-            f'{action}_open': 'Open',
-            f'{action}_max': 'High',
-            f'{action}_min': 'Low'
-        }, inplace=True)
-
-        # Vérifier et nettoyer les données
-        valid_indices = (
-            (merged_data['High'] >= merged_data['Low']) &
-            (merged_data['Open'].between(merged_data['Low'], merged_data['High'])) &
-            (merged_data['Close'].between(merged_data['Low'], merged_data['High']))
-        )
 
-        valid_data = merged_data[valid_indices]
+        # Cours OHLC alignés par date et nettoyés (High >= Low, Open et Close entre Low et High),
+        # lus dans le cube de prix construit une seule fois par classeur
+        valid_data = workbook.price_cube().frame(action, start=START, valid_only=True)
+
+        # Indicateurs calculés une seule fois par action et par classeur, partagés entre onglets et pages
+        indicators = TickerIndicators(workbook, action)
 
     # Utilisation des onglets pour différents indicateurs
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["Cours", "Volume", "RSI", "MACD", "Moyennes Mobiles", "Bandes de Bollinger", "EMA", "ROC", "Momentum"])
@@ -194,8 +171,7 @@ with col1:
 
     with tab2:
         # Tracer le graphique du volume
-        volume_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='VOLUME')
-        volume_data['Date'] = pd.to_datetime(volume_data['Date'])
+        volume_data = workbook.volume()
         filtered_volume_data = volume_data[volume_data['Date'].dt.year >= 2018]
         fig = px.bar(filtered_volume_data, x='Date', y=action, color_discrete_sequence=['red'], labels={action: "Volume"}, height=400)
         fig.update_layout(margin=dict(l=10, r=10, t=10, b=10))  # Réduire les marges
@@ -203,7 +179,7 @@ with col1:
 
     with tab3:
         # Calculer le RSI pour la période de 14 jours
-        rsi = RSIIndicator(filtered_data[action], window=14).rsi()
+        rsi = indicators.rsi(14)
 
         # Tracer le RSI sur un nouveau graphique
         fig_rsi = px.line(filtered_data, x='Date', y=rsi)
@@ -221,10 +197,10 @@ with col1:
 
     with tab4:
         # Calculer le MACD
-        macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-        macd_line = macd_indicator.macd()
-        signal_line = macd_indicator.macd_signal()
-        histogram = macd_indicator.macd_diff()
+        macd_indicator = indicators.macd(12, 26, 9)
+        macd_line = macd_indicator['macd']
+        signal_line = macd_indicator['signal']
+        histogram = macd_indicator['diff']
 
         # Créer un nouveau graphique pour le MACD
         fig = go.Figure()
@@ -268,9 +244,9 @@ with col1:
 
     with tab5:
         # Calculer les Moyennes Mobiles
-        sma_7 = SMAIndicator(valid_data['Close'], window=7).sma_indicator()
-        sma_21 = SMAIndicator(valid_data['Close'], window=21).sma_indicator()
-        sma_100 = SMAIndicator(valid_data['Close'], window=100).sma_indicator()
+        sma_7 = indicators.sma(7, source='ohlc')
+        sma_21 = indicators.sma(21, source='ohlc')
+        sma_100 = indicators.sma(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles
         fig = go.Figure(data=[go.Candlestick(
@@ -314,10 +290,10 @@ with col1:
 
     with tab6:
         # Calculer les Bandes de Bollinger pour la fenêtre de 20 jours et 2 écarts-types
-        bb_indicator = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-        bb_high_band = bb_indicator.bollinger_hband()
-        bb_low_band = bb_indicator.bollinger_lband()
-        bb_mid_band = bb_indicator.bollinger_mavg()
+        bb_indicator = indicators.bollinger(20, 2)
+        bb_high_band = bb_indicator['hband']
+        bb_low_band = bb_indicator['lband']
+        bb_mid_band = bb_indicator['mavg']
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Bandes de Bollinger
         fig_bb = go.Figure(data=[go.Candlestick(
@@ -361,8 +337,8 @@ with col1:
 
     with tab7:
         # Calculer les Moyennes Mobiles Exponentielles (EMA)
-        ema_14 = EMAIndicator(valid_data['Close'], window=14).ema_indicator()
-        ema_100 = EMAIndicator(valid_data['Close'], window=100).ema_indicator()
+        ema_14 = indicators.ema(14, source='ohlc')
+        ema_100 = indicators.ema(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles Exponentielles
         fig = go.Figure(data=[go.Candlestick(
@@ -406,8 +382,7 @@ with col1:
 
     with tab8:
         # Calculer le ROC pour une période de 12 jours
-        roc_indicator = ROCIndicator(close=filtered_data[action], window=12)
-        roc = roc_indicator.roc()
+        roc = indicators.roc(12)
 
         # Tracer le ROC sur un nouveau graphique
         fig_roc = px.line(filtered_data, x='Date', y=roc)
@@ -422,8 +397,7 @@ with col1:
 
     with tab9:
         # Calculer le Momentum pour une période de 10 jours
-        momentum_indicator = SMAIndicator(filtered_data[action], window=10)  # Utilisation de SMA comme proxy pour le momentum
-        momentum = momentum_indicator.sma_indicator()
+        momentum = indicators.sma(10)  # Utilisation de SMA comme proxy pour le momentum
 
         # Tracer le Momentum sur un nouveau graphique
         fig_momentum = px.line(filtered_data, x='Date', y=momentum)
@@ -438,8 +412,8 @@ with col1:
 
 with col2:
     st.markdown("<div class='section-title'>📊 Analyse Fondamentale</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+    if 'workbook' in st.session_state and action:
+        indices_data = workbook.indices()
         
         if action in indices_data.columns:
             indices_list = indices_data[action].dropna().tolist()
@@ -450,7 +424,7 @@ with col2:
                 
                 with tab1:
                     # Comparaison de l'action avec les indices associés
-                    indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+                    indices_data = workbook.indices()
                     if action in indices_data.columns:
                         indices_list = indices_data[action].dropna().tolist()
                         
@@ -501,8 +475,7 @@ with col2:
                 for i, tab in enumerate(tabs):
                     with tab:
                         selected_index = indices_list[i]
-                        cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-                        cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+                        cours_data = workbook.cours()
                         
                         if selected_index in cours_data.columns:
                             valid_dates = cours_data[cours_data[selected_index].notna()]['Date']
@@ -533,11 +506,8 @@ with col2:
 with col3:     
     # Section Profil
     st.markdown("<div class='section-title'>🏢 Profil</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-        
-        # Ensure the first column is the index
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil()
         
         # Find the column for the selected action
         if action in profile_data.columns:
@@ -555,9 +525,8 @@ with col3:
     <div class='section-title' style='text-align: center; color: black; font-size: 20px;'>📋 Informations</div>
     """, unsafe_allow_html=True)
     
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil 1', header=0)
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil_1()
         
         if action in profile_data.columns:
             # Split the dataframe into two halves
@@ -585,107 +554,8 @@ indicateurs_tech_col, stats_cle_col, eval_methods_col = st.columns(3)
 with indicateurs_tech_col:
     st.markdown("<div class='section-title'>🧩 Indicateurs Techniques</div>", unsafe_allow_html=True)
 
-    # Création d'une liste pour contenir les signaux
-    signals = []
-
-    # Moyennes Mobiles
-    sma_7 = SMAIndicator(filtered_data[action], window=7).sma_indicator()
-    sma_21 = SMAIndicator(filtered_data[action], window=21).sma_indicator()
-    sma_100 = SMAIndicator(filtered_data[action], window=100).sma_indicator()
-    last_price = filtered_data[action].iloc[-1]
-        
-    # Signaux pour les moyennes mobiles
-    signals.extend([
-            {
-                'Nom': 'Moyenne Mobile (7)',
-                'Valeur': round(sma_7.iloc[-1],2),
-                'Action': 'Acheter' if sma_7.iloc[-1] < last_price else 'Vendre' if sma_7.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (21)',
-                'Valeur': round(sma_21.iloc[-1],2),
-                'Action': 'Acheter' if sma_21.iloc[-1] < last_price else 'Vendre' if sma_21.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (100)',
-                'Valeur': round(sma_100.iloc[-1],2),
-                'Action': 'Acheter' if sma_100.iloc[-1] < last_price else 'Vendre' if sma_100.iloc[-1] > last_price else 'Neutre'
-            }
-        ])
-
-    # RSI
-    rsi = RSIIndicator(filtered_data[action], window=14).rsi()
-    last_rsi = round(rsi.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Indice de force relative (14)',
-            'Valeur': last_rsi,
-            'Action': 'Acheter' if last_rsi < 30 else 'Vendre' if last_rsi > 70 else 'Neutre'
-        })
-
-    # MACD
-    macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-    macd_diff = round(macd_indicator.macd_diff().iloc[-1],2)
-    signals.append({
-            'Nom': 'MACD (12,26)',
-            'Valeur': macd_diff,
-            'Action': 'Acheter' if macd_diff > 0 else 'Vendre' if macd_diff < 0 else 'Neutre'
-        })
-
-
-    # Ajout du signal de Bandes de Bollinger
-    indicator_bb = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-    bb_upper = indicator_bb.bollinger_hband_indicator().iloc[-1]
-    bb_lower = indicator_bb.bollinger_lband_indicator().iloc[-1]
-        
-    # La logique de signal pour les Bandes de Bollinger peut être basée sur le croisement des prix avec les bandes
-    if filtered_data[action].iloc[-1] > bb_upper:
-            bb_action = 'Vendre'  # Prix au-dessus de la bande supérieure
-    elif filtered_data[action].iloc[-1] < bb_lower:
-            bb_action = 'Acheter'  # Prix en dessous de la bande inférieure
-    else:
-            bb_action = 'Neutre'
-        
-    signals.append({
-            'Nom': 'Bandes de Bollinger (20, 2)',
-            'Valeur': f"Upper: {bb_upper}, Lower: {bb_lower}",
-            'Action': bb_action
-        })
-        # EMA
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=14)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (14)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=100)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (100)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    # Momentum
-    momentum_indicator = SMAIndicator(filtered_data[action], window=10).sma_indicator()
-    last_momentum = round(momentum_indicator.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Momentum (10)',
-            'Valeur': last_momentum,
-            'Action': 'Acheter' if last_momentum > 0 else 'Vendre' if last_momentum < 0 else 'Neutre'
-        })
-
-    # Rate of Change (ROC)
-    roc_indicator = ROCIndicator(filtered_data[action], window=12)
-    last_roc = round(roc_indicator.roc().iloc[-1], 2)
-    signals.append({
-            'Nom': 'ROC (12)',
-            'Valeur': last_roc,
-            'Action': 'Acheter' if last_roc > 0 else 'Vendre' if last_roc < 0 else 'Neutre'
-        })
+    # Signaux à la dernière date : une tranche de la matrice historique des signaux
+    signals = ticker_signals(workbook, action)
 
     def display_signals(signals):
             # En-têtes des colonnes
@@ -736,9 +606,9 @@ with stats_cle_col:
         return val
 
     with tab1:
-        if 'uploaded_file' in st.session_state and action:
+        if 'workbook' in st.session_state and action:
             # Charger les données de la feuille correspondante à l'action sélectionnée
-            sheet_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name=action, header=None)
+            sheet_data = workbook.ticker_sheet(action)
 
             # Fonction pour convertir les valeurs en flottants
             def to_float(val):
@@ -775,9 +645,9 @@ with stats_cle_col:
             st.write(styled_table.to_html(escape=False), unsafe_allow_html=True)
         
     with tab2:
-        if 'uploaded_file' in st.session_state and action:
+        if 'workbook' in st.session_state and action:
             # Charger les données de la feuille correspondant à l'action sélectionnée
-            sheet_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name=action, header=None)
+            sheet_data = workbook.ticker_sheet(action)
             
             # Utiliser les colonnes D et E (indices 3 et 4) pour le pie chart
             pie_data = sheet_data.iloc[:, [3, 4]].dropna()
@@ -795,9 +665,8 @@ with stats_cle_col:
         
         
     with tab3:
-        if 'uploaded_file' in st.session_state and action:
-            profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-            profile_data.set_index(profile_data.columns[0], inplace=True)
+        if 'workbook' in st.session_state and action:
+            profile_data = workbook.profil()
             if action in profile_data.columns:
                 stats_for_action = profile_data[[action]].dropna().iloc[1:]
                 col_label, col_value = st.columns([1, 1])
@@ -813,15 +682,13 @@ with stats_cle_col:
             
 with eval_methods_col:
     st.markdown("<div class='section-title'>📝 Méthodes d'évaluation</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        stats_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Statistique', header=0)
-        stats_data.set_index(stats_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        stats_data = workbook.statistique()
         if action in stats_data.columns:
             stats_data[action] = pd.to_numeric(stats_data[action], errors='coerce')
             eval_methods = stats_data.iloc[-4:][[action]].dropna()
             eval_signals = []
-            cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-            cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+            cours_data = workbook.cours()
             filtered_data = cours_data[cours_data['Date'].dt.year >= 2018]
             last_price = filtered_data[action].iloc[-1]
             for method_name, value in eval_methods[action].items():
@@ -881,6 +748,22 @@ fig_score.add_annotation(x=0.83, y=0.5, text="Strong Buy", showarrow=False, font
 
 st.plotly_chart(fig_score, use_container_width=True)
 
+# Historique du score global de l'action : une colonne de la matrice des scores du marché
+if 'workbook' in st.session_state and action in score_matrix(workbook).columns:
+    history = score_matrix(workbook)[action].dropna()
+    fig_history = go.Figure(go.Scatter(x=history.index, y=history, mode='lines', name='Score global', line=dict(color='black')))
+    fig_history.add_hrect(y0=60, y1=100, fillcolor='green', opacity=0.08, line_width=0)
+    fig_history.add_hrect(y0=0, y1=40, fillcolor='red', opacity=0.08, line_width=0)
+    fig_history.update_layout(xaxis_title='Date', yaxis_title='Score global', yaxis=dict(range=[0, 100]), template='plotly_white', height=300, margin=dict(l=10, r=10, t=10, b=10))
+    st.plotly_chart(fig_history, use_container_width=True)
+
+    # Score de fin de semaine de toutes les actions sur les dernières semaines
+    weeks = st.slider("Semaines affichées :", 4, 52, 12, step=4)
+    heatmap = weekly_scores(workbook, weeks)
+    fig_heatmap = px.imshow(heatmap, color_continuous_scale='RdYlGn', zmin=0, zmax=100, aspect='auto')
+    fig_heatmap.update_layout(template='plotly_white', height=max(400, 14 * len(heatmap)), margin=dict(l=10, r=10, t=10, b=10))
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
 # Recommandation basée sur le score global
 recommendation = "Acheter" if score_global > 60 else "Vendre" if score_global < 40 else "Neutre"
 
@@ -894,4 +777,192 @@ st.markdown(f"""
         <strong>Raison Principale :</strong> Basé sur une analyse approfondie des indicateurs techniques, fondamentaux et des méthodes d'évaluation, la recommandation est   {recommendation.lower()} .
     </p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Suivi du portefeuille : transactions saisies, valorisées chaque séance sur la feuille COURS
+st.markdown("<div class='section-title'>💼 Suivi du portefeuille</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    cube = workbook.price_cube()
+    if 'transactions' not in st.session_state:
+        st.session_state['transactions'] = pd.DataFrame(columns=TRANSACTION_COLUMNS).astype({'Date': 'datetime64[ns]', 'Action': 'object', 'Quantité': 'float', 'Prix': 'float', 'Frais': 'float'})
+    edited = st.data_editor(
+        st.session_state['transactions'],
+        num_rows="dynamic",
+        use_container_width=True,
+        key='transactions_editor',
+        column_config={
+            'Date': st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+            'Action': st.column_config.SelectboxColumn("Action", options=cube.tickers),
+            'Quantité': st.column_config.NumberColumn("Quantité", help="Positive pour un achat, négative pour une vente"),
+            'Prix': st.column_config.NumberColumn("Prix", help="Vide : cours de clôture de la séance"),
+            'Frais': st.column_config.NumberColumn("Frais", help="Frais de l'ordre, en montant"),
+        },
+    )
+    rows = transactions(edited)
+    # Seules les nouvelles transactions et les nouvelles séances sont ajoutées au portefeuille précédent
+    portfolio = st.session_state.get('portfolio')
+    try:
+        portfolio = portfolio.synced(cube, rows) if portfolio is not None else Portfolio.from_cube(cube).add_all(rows)
+    except (KeyError, ValueError) as error:
+        st.error(str(error).strip('"'))
+    if portfolio is not None:
+        st.session_state['portfolio'] = portfolio
+    if portfolio is not None and portfolio.transactions:
+        history = portfolio.history()
+        last = history.iloc[-1]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Valeur", f"{last['Valeur']:,.0f}")
+        col2.metric("Investi net", f"{last['Investi']:,.0f}")
+        col3.metric("P&L", f"{last['P&L']:,.0f}")
+        col4.metric("Rendement", f"{last['Rendement %']:.2f} %", f"{history['Rendement %'].diff().iloc[-1]:.2f} % sur la séance" if len(history) > 1 else None)
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=history.index, y=history['Valeur'], mode='lines', name='Valeur', line=dict(color='blue')))
+        fig.add_trace(go.Scatter(x=history.index, y=history['Investi'], mode='lines', name='Investi net', line=dict(color='gray', dash='dash')))
+        fig.update_layout(xaxis_title='Date', yaxis_title='Montant', template='plotly_white', height=350, margin=dict(l=10, r=10, t=10, b=10))
+        st.plotly_chart(fig, use_container_width=True)
+
+        summary = portfolio.summary()
+        col_weights, col_contribution = st.columns(2)
+        with col_weights:
+            held = summary[summary['Valeur'] > 0]
+            fig = px.pie(held, values='Valeur', names=held.index, title="Répartition")
+            fig.update_layout(template='plotly_white', margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        with col_contribution:
+            fig = go.Figure(go.Bar(x=summary.index, y=summary['Contribution %'], marker_color=['green' if value >= 0 else 'red' for value in summary['Contribution %']]))
+            fig.update_layout(title="Contribution au rendement (%)", template='plotly_white', margin=dict(l=10, r=10, t=40, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(summary.round(2), use_container_width=True)
+
+        # Projection Monte Carlo des lignes détenues, sans rééquilibrage
+        st.markdown("**🔮 Projection Monte Carlo**")
+        col_method, col_days, col_paths = st.columns(3)
+        with col_method:
+            method = st.radio("Méthode :", METHODS, horizontal=True, help="Covariance : rendements gaussiens corrélés estimés sur deux ans ; Bootstrap : séances historiques tirées au hasard")
+        with col_days:
+            days = st.slider("Horizon (séances) :", 20, 500, 250, step=10)
+        with col_paths:
+            paths = st.select_slider("Trajectoires :", [1000, 10000, 50000, 100000], value=10000)
+        values = held['Valeur'].to_dict()
+        projection_args = (tuple(values.items()), method, days, paths)
+        if st.button("Lancer la projection"):
+            st.session_state['projection'] = projection_args
+        if st.session_state.get('projection') == projection_args:
+            try:
+                with st.spinner("Simulation des trajectoires..."):
+                    projection = project(workbook, values, days=days, paths=paths, method=method)
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                bands = projection.bands
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=bands.index, y=bands['P95'], mode='lines', line=dict(width=0), showlegend=False))
+                fig.add_trace(go.Scatter(x=bands.index, y=bands['P5'], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(0, 0, 255, 0.1)', name='P5 - P95'))
+                fig.add_trace(go.Scatter(x=bands.index, y=bands['P75'], mode='lines', line=dict(width=0), showlegend=False))
+                fig.add_trace(go.Scatter(x=bands.index, y=bands['P25'], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(0, 0, 255, 0.25)', name='P25 - P75'))
+                fig.add_trace(go.Scatter(x=bands.index, y=bands['P50'], mode='lines', line=dict(color='blue'), name='Médiane'))
+                fig.update_layout(xaxis_title='Séances', yaxis_title='Valeur projetée', template='plotly_white', height=350, margin=dict(l=10, r=10, t=10, b=10))
+                st.plotly_chart(fig, use_container_width=True)
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Valeur médiane à l'horizon", f"{bands['P50'].iloc[-1]:,.0f}")
+                col2.metric("Probabilité de perte", f"{projection.probability_of_loss() * 100:.1f} %")
+                col3.metric("Drawdown moyen", f"{projection.expected_drawdown() * 100:.1f} %")
+    else:
+        st.info("Saisissez vos transactions ci-dessus pour suivre la valeur de votre portefeuille.")
+
+# Allocation optimale d'un univers d'actions : covariance rétrécie calculée une fois par version du classeur
+st.markdown("<div class='section-title'>⚖️ Allocation optimale</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    cube = workbook.price_cube()
+    portfolio = st.session_state.get('portfolio')
+    current = portfolio.summary()['Valeur'] if portfolio is not None and portfolio.transactions else pd.Series(dtype=float)
+    current = current[current > 0]
+    col_universe, col_cap = st.columns([3, 1])
+    with col_universe:
+        universe = st.multiselect("Univers :", cube.tickers, default=list(current.index) if len(current) > 1 else [action])
+    with col_cap:
+        cap = st.slider("Poids maximal par action (%) :", 5, 100, 100, step=5) / 100
+    # Ordre du classeur : un même univers partage la même entrée de cache
+    universe = [ticker for ticker in cube.tickers if ticker in universe]
+    if len(universe) < 2:
+        st.info("Sélectionnez au moins deux actions.")
+    else:
+        try:
+            optimizer = allocation(workbook, universe)
+            weights, metrics = optimizer.portfolios(cap)
+            frontier = optimizer.frontier(cap)
+        except ValueError as error:
+            st.error(str(error))
+        else:
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=frontier['Volatilité %'], y=frontier['Rendement %'], mode='lines+markers', name='Frontière efficiente', line=dict(color='blue')))
+            colors = {'Variance minimale': 'green', 'Sharpe maximal': 'orange', 'Parité de risque': 'purple'}
+            for name in metrics.columns:
+                fig.add_trace(go.Scatter(x=[metrics.loc['Volatilité %', name]], y=[metrics.loc['Rendement %', name]], mode='markers', name=name, marker=dict(size=12, color=colors[name])))
+            if len(current) and set(current.index) <= set(universe):
+                held = current.reindex(universe, fill_value=0.0).to_numpy() / current.sum()
+                fig.add_trace(go.Scatter(x=[optimizer.risk(held) * 100], y=[optimizer.expected(held) * 100], mode='markers', name='Portefeuille actuel', marker=dict(size=12, color='red', symbol='x')))
+            fig.update_layout(xaxis_title='Volatilité annualisée (%)', yaxis_title='Rendement annualisé (%)', template='plotly_white', height=400, margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+            col_weights, col_metrics = st.columns(2)
+            with col_weights:
+                st.markdown("**Pondérations (%)**")
+                st.dataframe(weights.round(2), use_container_width=True)
+            with col_metrics:
+                st.markdown("**Caractéristiques annualisées**")
+                st.dataframe(metrics.round(2), use_container_width=True)
+            st.caption(f"Covariance estimée sur {optimizer.count} séances, rétrécie à {optimizer.shrinkage * 100:.1f} % vers la variance moyenne (Ledoit-Wolf).")
+
+# Mesures de risque de toutes les actions, calculées une fois par version du classeur
+st.markdown("<div class='section-title'>🛡️ Mesures de risque</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    portfolio = st.session_state.get('portfolio')
+    col_confidence, col_scope = st.columns(2)
+    with col_confidence:
+        confidence = st.radio("Niveau de confiance (VaR, CVaR) :", [0.95, 0.99], format_func=lambda value: f"{value:.0%}", horizontal=True)
+    with col_scope:
+        own_only = st.checkbox("Actions du portefeuille uniquement", value=False, disabled=portfolio is None or not portfolio.transactions)
+    risks = risk_table(workbook, confidence)
+    if portfolio is not None and portfolio.transactions:
+        if own_only:
+            risks = risks.loc[[ticker for ticker in portfolio.held() if ticker in risks.index]]
+        # Portefeuille : rendements journaliers pondérés, hors apports et retraits
+        returns = portfolio.returns()[portfolio.start():, None]
+        row = pd.DataFrame(risk_metrics(returns, confidence), index=pd.Index(['Portefeuille'], name='Action'))
+        row.insert(0, 'Indice', '-')
+        row['Drawdown max %'] = max_drawdown(np.cumprod(1 + returns, axis=0)) * 100
+        risks = pd.concat([row, risks])
+
+    def highlight_selected(row):
+        return ['background-color: #e8f5e9;' if row.name in (action, 'Portefeuille') else '' for _ in row]
+
+    st.dataframe(
+        risks.style.apply(highlight_selected, axis=1).format(precision=2, na_rep='-'),
+        use_container_width=True,
+        height=min(38 * (len(risks) + 1), 600),
+    )
+    st.caption(f"Rendements journaliers depuis le {pd.Timestamp(START):%d/%m/%Y} ; VaR et CVaR en perte sur une séance. Bêta et corrélation par rapport au premier indice de l'action dans la feuille INDICES.")
+
+# Corrélations de toutes les actions, tenues à jour séance par séance
+st.markdown("<div class='section-title'>🔗 Corrélations du marché</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    periods = {"Tout l'historique": None, "3 mois": 63, "6 mois": 126, "1 an": 252}
+    col_period, col_order = st.columns(2)
+    with col_period:
+        period = st.radio("Période :", list(periods), horizontal=True)
+    with col_order:
+        clustered = st.checkbox("Regrouper les actions corrélées", value=True)
+    correlation = correlation_state(workbook).correlation(periods[period])
+    if clustered:
+        order = [correlation.index[i] for i in cluster_order(correlation.to_numpy())]
+        correlation = correlation.loc[order, order]
+    fig = px.imshow(correlation, color_continuous_scale='RdBu', zmin=-1, zmax=1, aspect='auto')
+    fig.update_layout(template='plotly_white', height=max(400, 14 * len(correlation)), margin=dict(l=10, r=10, t=10, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Actions les moins corrélées à l'action sélectionnée
+    if action in correlation.columns:
+        diversifiers = correlation[action].drop(action).dropna().sort_values().head(10)
+        st.markdown(f"**Meilleurs diversifiants pour {action}** ({period.lower()})")
+        st.dataframe(diversifiers.rename('Corrélation').round(2).to_frame().T, use_container_width=True)
@@ -0,0 +1,76 @@
+import streamlit as st
+from brvm.alerts import OPERATORS, PRESETS, AlertStore, evaluate
+
+# Configuration de la page
+st.set_page_config(page_title="Investor Dashboard", page_icon="🔔", layout="wide")
+st.markdown("<h1 style='text-align: center;'>🔔 Alertes 🔔</h1>", unsafe_allow_html=True)
+
+# Classeur chargé sur la page Data (feuilles lues une seule fois)
+workbook = st.session_state.get('workbook')
+if workbook is None:
+    st.error("Les données n'ont pas été chargées. Veuillez d'abord charger le fichier sur la page de données.")
+    st.stop()
+
+store = AlertStore()
+tickers = workbook.price_cube().tickers
+
+# Nouvelle règle : indicateur, opérateur, valeur ou autre indicateur
+st.markdown("#### Nouvelle règle")
+col1, col2, col3 = st.columns(3)
+with col1:
+    left = st.selectbox("Indicateur :", PRESETS, index=PRESETS.index('RSI(14)'), help="Paramètres modifiables dans la règle, ex. SMA(50)")
+    left = st.text_input("Indicateur (paramètres) :", value=left)
+with col2:
+    operator = st.selectbox("Condition :", OPERATORS)
+with col3:
+    kind = st.radio("Comparé à :", ["Valeur", "Indicateur"], horizontal=True)
+    right = str(st.number_input("Valeur :", value=30.0)) if kind == "Valeur" else st.text_input("Indicateur :", value='SMA(100)')
+scope = st.multiselect("Actions surveillées (toutes si vide) :", tickers)
+if st.button("Ajouter la règle"):
+    try:
+        store.add_rule(left, operator, right, scope)
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        st.success(f"Règle ajoutée : {left} {operator} {right}")
+
+# Règles en attente (nouvelles ou données plus récentes) évaluées en une passe sur tout le marché
+fired = evaluate(workbook, store)
+if fired:
+    st.info(f"{fired} nouvelle(s) alerte(s) déclenchée(s).")
+
+st.markdown("#### Règles")
+rules = store.rules()
+if rules.empty:
+    st.write("Aucune règle définie.")
+else:
+    st.dataframe(
+        rules[['id', 'Règle', 'tickers', 'last_date', 'error']].rename(columns={'tickers': 'Actions', 'last_date': 'Évaluée jusqu\'au', 'error': 'Erreur'}).set_index('id'),
+        use_container_width=True,
+    )
+    for rule in rules.dropna(subset=['error']).itertuples(index=False):
+        st.warning(f"Règle « {rule.Règle} » non évaluée : {rule.error}")
+    removed = st.multiselect("Règles à supprimer :", rules['id'].tolist(), format_func=lambda rule_id: rules.set_index('id').loc[rule_id, 'Règle'])
+    if removed and st.button("Supprimer"):
+        store.delete_rules(removed)
+        st.rerun()
+
+st.markdown("#### Alertes déclenchées")
+alerts = store.alerts()
+if alerts.empty:
+    st.write("Aucune alerte pour le moment.")
+else:
+    col1, col2 = st.columns(2)
+    with col1:
+        selected = st.multiselect("Action :", sorted(alerts['Action'].unique()))
+    with col2:
+        chosen_rules = st.multiselect("Règle :", sorted(alerts['Règle'].unique()))
+    if selected:
+        alerts = alerts[alerts['Action'].isin(selected)]
+    if chosen_rules:
+        alerts = alerts[alerts['Règle'].isin(chosen_rules)]
+    st.dataframe(alerts.style.format({'Date': '{:%d/%m/%Y}', 'Valeur': '{:.2f}'}, na_rep='-'), use_container_width=True, hide_index=True)
+    if st.button("Effacer les alertes"):
+        store.clear_alerts()
+        st.rerun()
+store.close()
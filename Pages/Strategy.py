@@ -1,13 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from ta.trend import SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
 import plotly.graph_objects as go
-from ta.volatility import BollingerBands
-from ta.trend import MACD
-from ta.momentum import ROCIndicator, StochRSIIndicator
-from ta.trend import CCIIndicator
+from brvm.backtest import FEE_RATE, RULES, SCORE_RULE, backtest
+from brvm.indicators import START, TickerIndicators
+from brvm.optimizer import DEFAULTS, SPACES, grid, sweep, walk_forward
+from brvm.signals import ticker_signals
 
 # Configuration de la page
 st.set_page_config(page_title="Investor Dashboard", page_icon="💰", layout="wide")
@@ -87,6 +85,9 @@ st.markdown("""
 
 st.markdown("<h1 style='text-align: center;'>💰Tableau de Bord de l'investisseur 💰</h1>", unsafe_allow_html=True)
 
+# Classeur chargé sur la page Data (feuilles lues une seule fois)
+workbook = st.session_state.get('workbook')
+
 # Zone de sélection du marché
 st.markdown("#### Sélectionnez le marché")
 market = st.selectbox("Marché:", ["BRVM"], index=0, help="Sélectionnez le marché pour afficher les données correspondantes.")
@@ -108,47 +109,19 @@ with col1:
     st.markdown("<div class='section-title'>📈 Analyse Technique</div>", unsafe_allow_html=True)
     if 'max_columns' in st.session_state and action:
         # Chargement et préparation des données
-        data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
+        data = workbook.cours()
         data = data[::-1]  # Inverser si nécessaire
-        data['Date'] = pd.to_datetime(data['Date'])
-        filtered_data = data[data['Date'].dt.year >= 2021]
-
-        ouverture_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='OUVERTURE')
-        ouverture_data['Date'] = pd.to_datetime(ouverture_data['Date'])
-
-        max_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MAX')
-        max_data['Date'] = pd.to_datetime(max_data['Date'])
-
-        min_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MIN')
-        min_data['Date'] = pd.to_datetime(min_data['Date'])
+        filtered_data = data[data['Date'] >= pd.Timestamp(START)]
 
         # Supprimer les valeurs nulles dans la colonne Date
         filtered_data.dropna(subset=['Date'], inplace=True)
-        ouverture_data.dropna(subset=['Date'], inplace=True)
-        max_data.dropna(subset=['Date'], inplace=True)
-        min_data.dropna(subset=['Date'], inplace=True)
-
-        # Aligner les données par date
-        merged_data = pd.merge(filtered_data, ouverture_data, on='Date', suffixes=('', '_open'))
-        merged_data = pd.merge(merged_data, max_data, on='Date', suffixes=('', '_max'))
-        merged_data = pd.merge(merged_data, min_data, on='Date', suffixes=('', '_min'))
-
-        # Renommer les colonnes pour plus de clarté
-        merged_data.rename(columns={
-            action: 'Close',
-            f'{action}_open': 'Open',
-            f'{action}_max': 'High',
-            f'{action}_min': 'Low'
-        }, inplace=True)
-
-        # Vérifier et nettoyer les données
-        valid_indices = (
-            (merged_data['High'] >= merged_data['Low']) &
-            (merged_data['Open'].between(merged_data['Low'], merged_data['High'])) &
-            (merged_data['Close'].between(merged_data['Low'], merged_data['High']))
-        )
 
-        valid_data = merged_data[valid_indices]
+        # Cours OHLC alignés par date et nettoyés (High >= Low, Open et Close entre Low et High),
+        # lus dans le cube de prix construit une seule fois par classeur
+        valid_data = workbook.price_cube().frame(action, start=START, valid_only=True)
+
+        # Indicateurs calculés une seule fois par action et par classeur, partagés entre onglets et pages
+        indicators = TickerIndicators(workbook, action)
 
     # Utilisation des onglets pour différents indicateurs
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["Cours", "Volume", "RSI", "MACD", "Moyennes Mobiles", "Bandes de Bollinger", "EMA", "ROC", "Momentum"])
@@ -179,8 +152,7 @@ with col1:
 
     with tab2:
         # Tracer le graphique du volume
-        volume_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='VOLUME')
-        volume_data['Date'] = pd.to_datetime(volume_data['Date'])
+        volume_data = workbook.volume()
         filtered_volume_data = volume_data[volume_data['Date'].dt.year >= 2018]
         fig = px.bar(filtered_volume_data, x='Date', y=action, color_discrete_sequence=['red'], labels={action: "Volume"}, height=400)
         fig.update_layout(margin=dict(l=10, r=10, t=10, b=10))  # Réduire les marges
@@ -188,7 +160,7 @@ with col1:
 
     with tab3:
         # Calculer le RSI pour la période de 14 jours
-        rsi = RSIIndicator(filtered_data[action], window=14).rsi()
+        rsi = indicators.rsi(14)
 
         # Tracer le RSI sur un nouveau graphique
         fig_rsi = px.line(filtered_data, x='Date', y=rsi)
@@ -206,10 +178,10 @@ with col1:
 
     with tab4:
         # Calculer le MACD
-        macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-        macd_line = macd_indicator.macd()
-        signal_line = macd_indicator.macd_signal()
-        histogram = macd_indicator.macd_diff()
+        macd_indicator = indicators.macd(12, 26, 9)
+        macd_line = macd_indicator['macd']
+        signal_line = macd_indicator['signal']
+        histogram = macd_indicator['diff']
 
         # Créer un nouveau graphique pour le MACD
         fig = go.Figure()
@@ -253,9 +225,9 @@ with col1:
 
     with tab5:
         # Calculer les Moyennes Mobiles
-        sma_7 = SMAIndicator(valid_data['Close'], window=7).sma_indicator()
-        sma_21 = SMAIndicator(valid_data['Close'], window=21).sma_indicator()
-        sma_100 = SMAIndicator(valid_data['Close'], window=100).sma_indicator()
+        sma_7 = indicators.sma(7, source='ohlc')
+        sma_21 = indicators.sma(21, source='ohlc')
+        sma_100 = indicators.sma(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles
         fig = go.Figure(data=[go.Candlestick(
@@ -299,10 +271,10 @@ with col1:
 
     with tab6:
         # Calculer les Bandes de Bollinger pour la fenêtre de 20 jours et 2 écarts-types
-        bb_indicator = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-        bb_high_band = bb_indicator.bollinger_hband()
-        bb_low_band = bb_indicator.bollinger_lband()
-        bb_mid_band = bb_indicator.bollinger_mavg()
+        bb_indicator = indicators.bollinger(20, 2)
+        bb_high_band = bb_indicator['hband']
+        bb_low_band = bb_indicator['lband']
+        bb_mid_band = bb_indicator['mavg']
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Bandes de Bollinger
         fig_bb = go.Figure(data=[go.Candlestick(
@@ -346,8 +318,8 @@ with col1:
 
     with tab7:
         # Calculer les Moyennes Mobiles Exponentielles (EMA)
-        ema_14 = EMAIndicator(valid_data['Close'], window=14).ema_indicator()
-        ema_100 = EMAIndicator(valid_data['Close'], window=100).ema_indicator()
+        ema_14 = indicators.ema(14, source='ohlc')
+        ema_100 = indicators.ema(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles Exponentielles
         fig = go.Figure(data=[go.Candlestick(
@@ -391,8 +363,7 @@ with col1:
 
     with tab8:
         # Calculer le ROC pour une période de 12 jours
-        roc_indicator = ROCIndicator(close=filtered_data[action], window=12)
-        roc = roc_indicator.roc()
+        roc = indicators.roc(12)
 
         # Tracer le ROC sur un nouveau graphique
         fig_roc = px.line(filtered_data, x='Date', y=roc)
@@ -407,8 +378,7 @@ with col1:
 
     with tab9:
         # Calculer le Momentum pour une période de 10 jours
-        momentum_indicator = SMAIndicator(filtered_data[action], window=10)  # Utilisation de SMA comme proxy pour le momentum
-        momentum = momentum_indicator.sma_indicator()
+        momentum = indicators.sma(10)  # Utilisation de SMA comme proxy pour le momentum
 
         # Tracer le Momentum sur un nouveau graphique
         fig_momentum = px.line(filtered_data, x='Date', y=momentum)
@@ -423,8 +393,8 @@ with col1:
 
 with col2:
     st.markdown("<div class='section-title'>📊 Analyse Fondamentale</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+    if 'workbook' in st.session_state and action:
+        indices_data = workbook.indices()
         
         if action in indices_data.columns:
             indices_list = indices_data[action].dropna().tolist()
@@ -435,7 +405,7 @@ with col2:
                 
                 with tab1:
                     # Comparaison de l'action avec les indices associés
-                    indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+                    indices_data = workbook.indices()
                     if action in indices_data.columns:
                         indices_list = indices_data[action].dropna().tolist()
                         
@@ -486,8 +456,7 @@ with col2:
                 for i, tab in enumerate(tabs):
                     with tab:
                         selected_index = indices_list[i]
-                        cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-                        cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+                        cours_data = workbook.cours()
                         
                         if selected_index in cours_data.columns:
                             valid_dates = cours_data[cours_data[selected_index].notna()]['Date']
@@ -518,11 +487,8 @@ with col2:
 with col3:     
     # Section Profil
     st.markdown("<div class='section-title'>🏢 Profil</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-        
-        # Ensure the first column is the index
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil()
         
         # Find the column for the selected action
         if action in profile_data.columns:
@@ -540,9 +506,8 @@ with col3:
     <div class='section-title' style='text-align: center; color: black; font-size: 20px;'>📋 Informations</div>
     """, unsafe_allow_html=True)
     
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil 1', header=0)
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil_1()
         
         if action in profile_data.columns:
             # Split the dataframe into two halves
@@ -570,107 +535,8 @@ indicateurs_tech_col, stats_cle_col, eval_methods_col = st.columns(3)
 with indicateurs_tech_col:
     st.markdown("<div class='section-title'>🧩 Indicateurs Techniques</div>", unsafe_allow_html=True)
 
-    # Création d'une liste pour contenir les signaux
-    signals = []
-
-    # Moyennes Mobiles
-    sma_7 = SMAIndicator(filtered_data[action], window=7).sma_indicator()
-    sma_21 = SMAIndicator(filtered_data[action], window=21).sma_indicator()
-    sma_100 = SMAIndicator(filtered_data[action], window=100).sma_indicator()
-    last_price = filtered_data[action].iloc[-1]
-        
-    # Signaux pour les moyennes mobiles
-    signals.extend([
-            {
-                'Nom': 'Moyenne Mobile (7)',
-                'Valeur': round(sma_7.iloc[-1],2),
-                'Action': 'Acheter' if sma_7.iloc[-1] < last_price else 'Vendre' if sma_7.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (21)',
-                'Valeur': round(sma_21.iloc[-1],2),
-                'Action': 'Acheter' if sma_21.iloc[-1] < last_price else 'Vendre' if sma_21.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (100)',
-                'Valeur': round(sma_100.iloc[-1],2),
-                'Action': 'Acheter' if sma_100.iloc[-1] < last_price else 'Vendre' if sma_100.iloc[-1] > last_price else 'Neutre'
-            }
-        ])
-
-    # RSI
-    rsi = RSIIndicator(filtered_data[action], window=14).rsi()
-    last_rsi = round(rsi.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Indice de force relative (14)',
-            'Valeur': last_rsi,
-            'Action': 'Acheter' if last_rsi < 30 else 'Vendre' if last_rsi > 70 else 'Neutre'
-        })
-
-    # MACD
-    macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-    macd_diff = round(macd_indicator.macd_diff().iloc[-1],2)
-    signals.append({
-            'Nom': 'MACD (12,26)',
-            'Valeur': macd_diff,
-            'Action': 'Acheter' if macd_diff > 0 else 'Vendre' if macd_diff < 0 else 'Neutre'
-        })
-
-
-    # Ajout du signal de Bandes de Bollinger
-    indicator_bb = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-    bb_upper = indicator_bb.bollinger_hband_indicator().iloc[-1]
-    bb_lower = indicator_bb.bollinger_lband_indicator().iloc[-1]
-        
-    # La logique de signal pour les Bandes de Bollinger peut être basée sur le croisement des prix avec les bandes
-    if filtered_data[action].iloc[-1] > bb_upper:
-            bb_action = 'Vendre'  # Prix au-dessus de la bande supérieure
-    elif filtered_data[action].iloc[-1] < bb_lower:
-            bb_action = 'Acheter'  # Prix en dessous de la bande inférieure
-    else:
-            bb_action = 'Neutre'
-        
-    signals.append({
-            'Nom': 'Bandes de Bollinger (20, 2)',
-            'Valeur': f"Upper: {bb_upper}, Lower: {bb_lower}",
-            'Action': bb_action
-        })
-        # EMA
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=14)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (14)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=100)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (100)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    # Momentum
-    momentum_indicator = SMAIndicator(filtered_data[action], window=10).sma_indicator()
-    last_momentum = round(momentum_indicator.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Momentum (10)',
-            'Valeur': last_momentum,
-            'Action': 'Acheter' if last_momentum > 0 else 'Vendre' if last_momentum < 0 else 'Neutre'
-        })
-
-    # Rate of Change (ROC)
-    roc_indicator = ROCIndicator(filtered_data[action], window=12)
-    last_roc = round(roc_indicator.roc().iloc[-1], 2)
-    signals.append({
-            'Nom': 'ROC (12)',
-            'Valeur': last_roc,
-            'Action': 'Acheter' if last_roc > 0 else 'Vendre' if last_roc < 0 else 'Neutre'
-        })
+    # Signaux à la dernière date : une tranche de la matrice historique des signaux
+    signals = ticker_signals(workbook, action)
 
     def display_signals(signals):
             # En-têtes des colonnes
@@ -702,9 +568,9 @@ with indicateurs_tech_col:
 
 with stats_cle_col:
     st.markdown("<div class='section-title'>🔍 Indicateurs fondatemtaux </div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
+    if 'workbook' in st.session_state and action:
         # Charger les données de la feuille correspondant à l'action sélectionnée
-        sheet_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name=action, header=None)
+        sheet_data = workbook.ticker_sheet(action)
         
         # Utiliser les colonnes D et E (indices 3 et 4) pour le pie chart
         pie_data = sheet_data.iloc[:, [3, 4]].dropna()
@@ -720,9 +586,8 @@ with stats_cle_col:
         st.plotly_chart(fig, use_container_width=True)
 
 
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil()
         if action in profile_data.columns:
             stats_for_action = profile_data[[action]].dropna().iloc[1:]
             col_label, col_value = st.columns([1, 1])
@@ -737,15 +602,13 @@ with stats_cle_col:
 
 with eval_methods_col:
     st.markdown("<div class='section-title'>📝 Méthodes d'évaluation</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        stats_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Statistique', header=0)
-        stats_data.set_index(stats_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        stats_data = workbook.statistique()
         if action in stats_data.columns:
             stats_data[action] = pd.to_numeric(stats_data[action], errors='coerce')
             eval_methods = stats_data.iloc[-4:][[action]].dropna()
             eval_signals = []
-            cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-            cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+            cours_data = workbook.cours()
             filtered_data = cours_data[cours_data['Date'].dt.year >= 2018]
             last_price = filtered_data[action].iloc[-1]
             for method_name, value in eval_methods[action].items():
@@ -766,3 +629,84 @@ with eval_methods_col:
                 )
         else:
             st.error(f"L'action {action} n'est pas trouvée dans la feuille 'Statistique'.")
+
+# Backtest des signaux : positions simulées sur l'historique pour toutes les actions à la fois
+st.markdown("<div class='section-title'>🧪 Backtest des signaux</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    col_rule, col_fee = st.columns(2)
+    with col_rule:
+        rule = st.selectbox("Règle :", RULES, index=RULES.index(SCORE_RULE), help="Acheter ouvre une position et Vendre la solde ; pour le score global, achat au-dessus de 60 et vente en dessous de 40.")
+    with col_fee:
+        fee = st.number_input("Frais par ordre (%) :", min_value=0.0, max_value=5.0, value=round(FEE_RATE * 100, 3), step=0.05, help="Commission SGI (TVA comprise), frais BRVM et DC/BR") / 100
+
+    # Calculé une fois par règle, niveau de frais et version du classeur
+    result = backtest(workbook, rule, fee)
+    summary = result.summary()
+
+    if action in summary.index:
+        j = result.tickers.index(action)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=result.dates, y=result.equity[:, j], mode='lines', name='Stratégie', line=dict(color='blue')))
+        fig.add_trace(go.Scatter(x=result.dates, y=result.benchmark[:, j], mode='lines', name='Achat-conservation', line=dict(color='gray')))
+        fig.update_layout(xaxis_title='Date', yaxis_title='Capital (base 1)', template='plotly_white', height=400, margin=dict(l=10, r=10, t=10, b=10))
+        st.plotly_chart(fig, use_container_width=True)
+
+        fig_drawdown = go.Figure(go.Scatter(x=result.dates, y=result.drawdown[:, j] * 100, fill='tozeroy', mode='lines', name='Drawdown', line=dict(color='red')))
+        fig_drawdown.update_layout(xaxis_title='Date', yaxis_title='Drawdown (%)', template='plotly_white', height=250, margin=dict(l=10, r=10, t=10, b=10))
+        st.plotly_chart(fig_drawdown, use_container_width=True)
+
+        metrics = summary.loc[action]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rendement", f"{metrics['Rendement %']:.2f} %", f"{metrics['Rendement %'] - metrics['Achat-conservation %']:.2f} % vs achat-conservation")
+        col2.metric("Sharpe", f"{metrics['Sharpe']:.2f}")
+        col3.metric("Drawdown max", f"{metrics['Drawdown max %']:.2f} %")
+        col4.metric("Transactions", int(metrics['Transactions']))
+    else:
+        st.error(f"L'action {action} n'est pas trouvée dans la feuille 'COURS'.")
+
+    st.markdown("**Toutes les actions**")
+    st.dataframe(summary.round(2), use_container_width=True)
+
+# Optimisation des paramètres des indicateurs (grille ou tirage aléatoire), par backtest
+st.markdown("<div class='section-title'>⚙️ Optimisation des paramètres</div>", unsafe_allow_html=True)
+if 'workbook' in st.session_state and action:
+    col_family, col_scope, col_mode = st.columns(3)
+    with col_family:
+        family = st.selectbox("Indicateur :", list(SPACES), help="Paramètres du tableau de bord : " + ", ".join(f"{name} {params}" for name, params in DEFAULTS.items()))
+    with col_scope:
+        scope = st.radio("Actions étudiées :", [f"{action} uniquement", "Tout le marché"], horizontal=True)
+    with col_mode:
+        mode = st.radio("Recherche :", ["Grille complète", "Tirage aléatoire"], horizontal=True)
+    count = st.slider("Nombre de combinaisons tirées :", 5, len(grid(family)), min(25, len(grid(family)))) if mode == "Tirage aléatoire" else None
+
+    # Mêmes frais que le backtest ci-dessus
+    sweep_args = (family, (action,) if scope != "Tout le marché" else None, count, fee)
+    if st.button("Lancer l'optimisation"):
+        st.session_state['sweep'] = sweep_args
+    if st.session_state.get('sweep') == sweep_args:
+        # Calculé une fois par version du classeur et par choix ci-dessus ; processus parallèles
+        with st.spinner("Backtest des combinaisons de paramètres..."):
+            ranked = sweep(workbook, family, tickers=sweep_args[1], count=count, fee=fee)
+        st.dataframe(ranked.round(2), use_container_width=True)
+
+    # Validation walk-forward : paramètres optimisés sur une fenêtre, jugés sur la suivante
+    st.markdown("**Validation walk-forward**")
+    col_in, col_out = st.columns(2)
+    with col_in:
+        in_years = st.slider("Fenêtre in-sample (années) :", 1, 5, 2)
+    with col_out:
+        out_months = st.slider("Fenêtre out-of-sample (mois) :", 1, 12, 6)
+    walk_args = sweep_args + (in_years, out_months)
+    if st.button("Lancer la validation walk-forward"):
+        st.session_state['walk_forward'] = walk_args
+    if st.session_state.get('walk_forward') == walk_args:
+        try:
+            with st.spinner("Optimisation sur chaque fenêtre in-sample..."):
+                validation = walk_forward(workbook, family, tickers=sweep_args[1], in_sample=in_years * 252, out_of_sample=out_months * 21, count=count, fee=fee)
+        except ValueError as error:
+            st.error(str(error))
+        else:
+            fig = go.Figure(go.Scatter(x=validation.dates, y=validation.equity.mean(axis=1), mode='lines', name='Out-of-sample', line=dict(color='blue')))
+            fig.update_layout(xaxis_title='Date', yaxis_title='Capital out-of-sample (base 1, moyenne des actions)', template='plotly_white', height=350, margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(validation.windows.round(2), use_container_width=True)
@@ -1,13 +1,11 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from ta.trend import SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
 import plotly.graph_objects as go
-from ta.volatility import BollingerBands
-from ta.trend import MACD
-from ta.momentum import ROCIndicator, StochRSIIndicator
-from ta.trend import CCIIndicator
+from brvm.indicators import START, TickerIndicators
+from brvm.signals import ticker_signals
+from brvm.sqlite_store import DB_PATH, PriceDatabase
 
 # Configuration de la page
 st.set_page_config(page_title="Investor Dashboard", page_icon="💰", layout="wide")
@@ -87,6 +85,9 @@ st.markdown("""
 
 st.markdown("<h1 style='text-align: center;'>💰Tableau de Bord de l'investisseur 💰</h1>", unsafe_allow_html=True)
 
+# Classeur chargé sur la page Data (feuilles lues une seule fois)
+workbook = st.session_state.get('workbook')
+
 # Zone de sélection du marché
 st.markdown("#### Sélectionnez le marché")
 market = st.selectbox("Marché:", ["BRVM"], index=0, help="Sélectionnez le marché pour afficher les données correspondantes.")
@@ -99,6 +100,37 @@ if 'max_columns' in st.session_state:
     action = st.selectbox("Action :", options, help="Sélectionnez le marché pour afficher les données correspondantes")
 else:
     st.error("Les noms des colonnes n'ont pas été chargés. Veuillez d'abord charger le fichier sur la page de données.")
+    # Sans classeur importé : historique enregistré dans la base locale depuis la page Data
+    if os.path.exists(DB_PATH):
+        database = PriceDatabase()
+        tickers = database.tickers()
+        if tickers:
+            st.markdown("<div class='section-title'>🗄️ Historique de la base locale</div>", unsafe_allow_html=True)
+            ticker = st.selectbox("Action enregistrée :", tickers)
+            history = database.prices(ticker, start=START).dropna(subset=['Close'])
+            fig = go.Figure(data=[go.Candlestick(
+                x=history['Date'],
+                open=history['Open'],
+                high=history['High'],
+                low=history['Low'],
+                close=history['Close'],
+                increasing_line_color='green',
+                decreasing_line_color='red'
+            )])
+            fig.update_layout(
+                xaxis_title='Date',
+                yaxis_title='Prix',
+                height=400,
+                margin=dict(l=10, r=10, t=10, b=10),
+                xaxis=dict(rangeslider=dict(visible=False)),
+                template='plotly_white'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            fig_volume = px.bar(history, x='Date', y='Volume', color_discrete_sequence=['red'], height=300)
+            fig_volume.update_layout(margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig_volume, use_container_width=True)
+        database.close()
+    st.stop()
 
 # Définition des proportions pour les colonnes : les trois colonnes sont de même taille
 col1, col2, col3 = st.columns([1, 1, 1])
@@ -108,47 +140,19 @@ with col1:
     st.markdown("<div class='section-title'>📈 Analyse Technique</div>", unsafe_allow_html=True)
     if 'max_columns' in st.session_state and action:
         # Chargement et préparation des données
-        data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
+        data = workbook.cours()
         data = data[::-1]  # Inverser si nécessaire
-        data['Date'] = pd.to_datetime(data['Date'])
-        filtered_data = data[data['Date'].dt.year >= 2021]
-
-        ouverture_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='OUVERTURE')
-        ouverture_data['Date'] = pd.to_datetime(ouverture_data['Date'])
-
-        max_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MAX')
-        max_data['Date'] = pd.to_datetime(max_data['Date'])
-
-        min_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='MIN')
-        min_data['Date'] = pd.to_datetime(min_data['Date'])
+        filtered_data = data[data['Date'] >= pd.Timestamp(START)]
 
         # Supprimer les valeurs nulles dans la colonne Date
         filtered_data.dropna(subset=['Date'], inplace=True)
-        ouverture_data.dropna(subset=['Date'], inplace=True)
-        max_data.dropna(subset=['Date'], inplace=True)
-        min_data.dropna(subset=['Date'], inplace=True)
-
-        # Aligner les données par date
-        merged_data = pd.merge(filtered_data, ouverture_data, on='Date', suffixes=('', '_open'))
-        merged_data = pd.merge(merged_data, max_data, on='Date', suffixes=('', '_max'))
-        merged_data = pd.merge(merged_data, min_data, on='Date', suffixes=('', '_min'))
-
-        # Renommer les colonnes pour plus de clarté
-        merged_data.rename(columns={
-            action: 'Close',
-            f'{action}_open': 'Open',
-            f'{action}_max': 'High',
-            f'{action}_min': 'Low'
-        }, inplace=True)
-
-        # Vérifier et nettoyer les données
-        valid_indices = (
-            (merged_data['High'] >= merged_data['Low']) &
-            (merged_data['Open'].between(merged_data['Low'], merged_data['High'])) &
-            (merged_data['Close'].between(merged_data['Low'], merged_data['High']))
-        )
 
-        valid_data = merged_data[valid_indices]
+        # Cours OHLC alignés par date et nettoyés (High >= Low, Open et Close entre Low et High),
+        # lus dans le cube de prix construit une seule fois par classeur
+        valid_data = workbook.price_cube().frame(action, start=START, valid_only=True)
+
+        # Indicateurs calculés une seule fois par action et par classeur, partagés entre onglets et pages
+        indicators = TickerIndicators(workbook, action)
 
     # Utilisation des onglets pour différents indicateurs
     tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["Cours", "Volume", "RSI", "MACD", "Moyennes Mobiles", "Bandes de Bollinger", "EMA", "ROC", "Momentum"])
@@ -179,8 +183,7 @@ with col1:
 
     with tab2:
         # Tracer le graphique du volume
-        volume_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='VOLUME')
-        volume_data['Date'] = pd.to_datetime(volume_data['Date'])
+        volume_data = workbook.volume()
         filtered_volume_data = volume_data[volume_data['Date'].dt.year >= 2018]
         fig = px.bar(filtered_volume_data, x='Date', y=action, color_discrete_sequence=['red'], labels={action: "Volume"}, height=400)
         fig.update_layout(margin=dict(l=10, r=10, t=10, b=10))  # Réduire les marges
@@ -188,7 +191,7 @@ with col1:
 
     with tab3:
         # Calculer le RSI pour la période de 14 jours
-        rsi = RSIIndicator(filtered_data[action], window=14).rsi()
+        rsi = indicators.rsi(14)
 
         # Tracer le RSI sur un nouveau graphique
         fig_rsi = px.line(filtered_data, x='Date', y=rsi)
@@ -206,10 +209,10 @@ with col1:
 
     with tab4:
         # Calculer le MACD
-        macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-        macd_line = macd_indicator.macd()
-        signal_line = macd_indicator.macd_signal()
-        histogram = macd_indicator.macd_diff()
+        macd_indicator = indicators.macd(12, 26, 9)
+        macd_line = macd_indicator['macd']
+        signal_line = macd_indicator['signal']
+        histogram = macd_indicator['diff']
 
         # Créer un nouveau graphique pour le MACD
         fig = go.Figure()
@@ -253,9 +256,9 @@ with col1:
 
     with tab5:
         # Calculer les Moyennes Mobiles
-        sma_7 = SMAIndicator(valid_data['Close'], window=7).sma_indicator()
-        sma_21 = SMAIndicator(valid_data['Close'], window=21).sma_indicator()
-        sma_100 = SMAIndicator(valid_data['Close'], window=100).sma_indicator()
+        sma_7 = indicators.sma(7, source='ohlc')
+        sma_21 = indicators.sma(21, source='ohlc')
+        sma_100 = indicators.sma(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles
         fig = go.Figure(data=[go.Candlestick(
@@ -299,10 +302,10 @@ with col1:
 
     with tab6:
         # Calculer les Bandes de Bollinger pour la fenêtre de 20 jours et 2 écarts-types
-        bb_indicator = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-        bb_high_band = bb_indicator.bollinger_hband()
-        bb_low_band = bb_indicator.bollinger_lband()
-        bb_mid_band = bb_indicator.bollinger_mavg()
+        bb_indicator = indicators.bollinger(20, 2)
+        bb_high_band = bb_indicator['hband']
+        bb_low_band = bb_indicator['lband']
+        bb_mid_band = bb_indicator['mavg']
     
         # Tracer le graphique de l'action sélectionnée en bougie avec les Bandes de Bollinger
         fig_bb = go.Figure(data=[go.Candlestick(
@@ -346,8 +349,8 @@ with col1:
 
     with tab7:
         # Calculer les Moyennes Mobiles Exponentielles (EMA)
-        ema_14 = EMAIndicator(valid_data['Close'], window=14).ema_indicator()
-        ema_100 = EMAIndicator(valid_data['Close'], window=100).ema_indicator()
+        ema_14 = indicators.ema(14, source='ohlc')
+        ema_100 = indicators.ema(100, source='ohlc')
 
         # Tracer le graphique de l'action sélectionnée en bougie avec les Moyennes Mobiles Exponentielles
         fig = go.Figure(data=[go.Candlestick(
@@ -391,8 +394,7 @@ with col1:
 
     with tab8:
         # Calculer le ROC pour une période de 12 jours
-        roc_indicator = ROCIndicator(close=filtered_data[action], window=12)
-        roc = roc_indicator.roc()
+        roc = indicators.roc(12)
 
         # Tracer le ROC sur un nouveau graphique
         fig_roc = px.line(filtered_data, x='Date', y=roc)
@@ -407,8 +409,7 @@ with col1:
 
     with tab9:
         # Calculer le Momentum pour une période de 10 jours
-        momentum_indicator = SMAIndicator(filtered_data[action], window=10)  # Utilisation de SMA comme proxy pour le momentum
-        momentum = momentum_indicator.sma_indicator()
+        momentum = indicators.sma(10)  # Utilisation de SMA comme proxy pour le momentum
 
         # Tracer le Momentum sur un nouveau graphique
         fig_momentum = px.line(filtered_data, x='Date', y=momentum)
@@ -423,8 +424,8 @@ with col1:
 
 with col2:
     st.markdown("<div class='section-title'>📊 Analyse Fondamentale</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+    if 'workbook' in st.session_state and action:
+        indices_data = workbook.indices()
         
         if action in indices_data.columns:
             indices_list = indices_data[action].dropna().tolist()
@@ -435,7 +436,7 @@ with col2:
                 
                 with tab1:
                     # Comparaison de l'action avec les indices associés
-                    indices_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='INDICES')
+                    indices_data = workbook.indices()
                     if action in indices_data.columns:
                         indices_list = indices_data[action].dropna().tolist()
                         
@@ -486,8 +487,7 @@ with col2:
                 for i, tab in enumerate(tabs):
                     with tab:
                         selected_index = indices_list[i]
-                        cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-                        cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+                        cours_data = workbook.cours()
                         
                         if selected_index in cours_data.columns:
                             valid_dates = cours_data[cours_data[selected_index].notna()]['Date']
@@ -518,11 +518,8 @@ with col2:
 with col3:     
     # Section Profil
     st.markdown("<div class='section-title'>🏢 Profil</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-        
-        # Ensure the first column is the index
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil()
         
         # Find the column for the selected action
         if action in profile_data.columns:
@@ -540,9 +537,8 @@ with col3:
     <div class='section-title' style='text-align: center; color: black; font-size: 20px;'>📋 Informations</div>
     """, unsafe_allow_html=True)
     
-    if 'uploaded_file' in st.session_state and action:
-        profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil 1', header=0)
-        profile_data.set_index(profile_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        profile_data = workbook.profil_1()
         
         if action in profile_data.columns:
             # Split the dataframe into two halves
@@ -570,107 +566,8 @@ indicateurs_tech_col, stats_cle_col, eval_methods_col = st.columns(3)
 with indicateurs_tech_col:
     st.markdown("<div class='section-title'>🧩 Indicateurs Techniques</div>", unsafe_allow_html=True)
 
-    # Création d'une liste pour contenir les signaux
-    signals = []
-
-    # Moyennes Mobiles
-    sma_7 = SMAIndicator(filtered_data[action], window=7).sma_indicator()
-    sma_21 = SMAIndicator(filtered_data[action], window=21).sma_indicator()
-    sma_100 = SMAIndicator(filtered_data[action], window=100).sma_indicator()
-    last_price = filtered_data[action].iloc[-1]
-        
-    # Signaux pour les moyennes mobiles
-    signals.extend([
-            {
-                'Nom': 'Moyenne Mobile (7)',
-                'Valeur': round(sma_7.iloc[-1],2),
-                'Action': 'Acheter' if sma_7.iloc[-1] < last_price else 'Vendre' if sma_7.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (21)',
-                'Valeur': round(sma_21.iloc[-1],2),
-                'Action': 'Acheter' if sma_21.iloc[-1] < last_price else 'Vendre' if sma_21.iloc[-1] > last_price else 'Neutre'
-            },
-            {
-                'Nom': 'Moyenne Mobile (100)',
-                'Valeur': round(sma_100.iloc[-1],2),
-                'Action': 'Acheter' if sma_100.iloc[-1] < last_price else 'Vendre' if sma_100.iloc[-1] > last_price else 'Neutre'
-            }
-        ])
-
-    # RSI
-    rsi = RSIIndicator(filtered_data[action], window=14).rsi()
-    last_rsi = round(rsi.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Indice de force relative (14)',
-            'Valeur': last_rsi,
-            'Action': 'Acheter' if last_rsi < 30 else 'Vendre' if last_rsi > 70 else 'Neutre'
-        })
-
-    # MACD
-    macd_indicator = MACD(close=filtered_data[action], window_slow=26, window_fast=12, window_sign=9)
-    macd_diff = round(macd_indicator.macd_diff().iloc[-1],2)
-    signals.append({
-            'Nom': 'MACD (12,26)',
-            'Valeur': macd_diff,
-            'Action': 'Acheter' if macd_diff > 0 else 'Vendre' if macd_diff < 0 else 'Neutre'
-        })
-
-
-    # Ajout du signal de Bandes de Bollinger
-    indicator_bb = BollingerBands(close=filtered_data[action], window=20, window_dev=2)
-    bb_upper = indicator_bb.bollinger_hband_indicator().iloc[-1]
-    bb_lower = indicator_bb.bollinger_lband_indicator().iloc[-1]
-        
-    # La logique de signal pour les Bandes de Bollinger peut être basée sur le croisement des prix avec les bandes
-    if filtered_data[action].iloc[-1] > bb_upper:
-            bb_action = 'Vendre'  # Prix au-dessus de la bande supérieure
-    elif filtered_data[action].iloc[-1] < bb_lower:
-            bb_action = 'Acheter'  # Prix en dessous de la bande inférieure
-    else:
-            bb_action = 'Neutre'
-        
-    signals.append({
-            'Nom': 'Bandes de Bollinger (20, 2)',
-            'Valeur': f"Upper: {bb_upper}, Lower: {bb_lower}",
-            'Action': bb_action
-        })
-        # EMA
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=14)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (14)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    ema_indicator = EMAIndicator(close=filtered_data[action], window=100)
-    ema = ema_indicator.ema_indicator()
-    last_ema = round(ema.iloc[-1], 2)
-    signals.append({
-            'Nom': 'EMA (100)',
-            'Valeur': last_ema,
-            'Action': 'Acheter' if last_price > last_ema else 'Vendre' if last_price < last_ema else 'Neutre'
-        })
-
-    # Momentum
-    momentum_indicator = SMAIndicator(filtered_data[action], window=10).sma_indicator()
-    last_momentum = round(momentum_indicator.iloc[-1], 2)
-    signals.append({
-            'Nom': 'Momentum (10)',
-            'Valeur': last_momentum,
-            'Action': 'Acheter' if last_momentum > 0 else 'Vendre' if last_momentum < 0 else 'Neutre'
-        })
-
-    # Rate of Change (ROC)
-    roc_indicator = ROCIndicator(filtered_data[action], window=12)
-    last_roc = round(roc_indicator.roc().iloc[-1], 2)
-    signals.append({
-            'Nom': 'ROC (12)',
-            'Valeur': last_roc,
-            'Action': 'Acheter' if last_roc > 0 else 'Vendre' if last_roc < 0 else 'Neutre'
-        })
+    # Signaux à la dernière date : une tranche de la matrice historique des signaux
+    signals = ticker_signals(workbook, action)
 
     def display_signals(signals):
             # En-têtes des colonnes
@@ -721,9 +618,9 @@ with stats_cle_col:
         return val
 
     with tab1:
-        if 'uploaded_file' in st.session_state and action:
+        if 'workbook' in st.session_state and action:
             # Charger les données de la feuille correspondante à l'action sélectionnée
-            sheet_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name=action, header=None)
+            sheet_data = workbook.ticker_sheet(action)
 
             # Fonction pour convertir les valeurs en flottants
             def to_float(val):
@@ -760,9 +657,9 @@ with stats_cle_col:
             st.write(styled_table.to_html(escape=False), unsafe_allow_html=True)
         
     with tab2:
-        if 'uploaded_file' in st.session_state and action:
+        if 'workbook' in st.session_state and action:
             # Charger les données de la feuille correspondant à l'action sélectionnée
-            sheet_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name=action, header=None)
+            sheet_data = workbook.ticker_sheet(action)
             
             # Utiliser les colonnes D et E (indices 3 et 4) pour le pie chart
             pie_data = sheet_data.iloc[:, [3, 4]].dropna()
@@ -780,9 +677,8 @@ with stats_cle_col:
         
         
     with tab3:
-        if 'uploaded_file' in st.session_state and action:
-            profile_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Profil', header=0)
-            profile_data.set_index(profile_data.columns[0], inplace=True)
+        if 'workbook' in st.session_state and action:
+            profile_data = workbook.profil()
             if action in profile_data.columns:
                 stats_for_action = profile_data[[action]].dropna().iloc[1:]
                 col_label, col_value = st.columns([1, 1])
@@ -798,15 +694,13 @@ with stats_cle_col:
             
 with eval_methods_col:
     st.markdown("<div class='section-title'>📝 Méthodes d'évaluation</div>", unsafe_allow_html=True)
-    if 'uploaded_file' in st.session_state and action:
-        stats_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='Statistique', header=0)
-        stats_data.set_index(stats_data.columns[0], inplace=True)
+    if 'workbook' in st.session_state and action:
+        stats_data = workbook.statistique()
         if action in stats_data.columns:
             stats_data[action] = pd.to_numeric(stats_data[action], errors='coerce')
             eval_methods = stats_data.iloc[-4:][[action]].dropna()
             eval_signals = []
-            cours_data = pd.read_excel(st.session_state['uploaded_file'], sheet_name='COURS')
-            cours_data['Date'] = pd.to_datetime(cours_data['Date'])
+            cours_data = workbook.cours()
             filtered_data = cours_data[cours_data['Date'].dt.year >= 2018]
             last_price = filtered_data[action].iloc[-1]
             for method_name, value in eval_methods[action].items():
@@ -0,0 +1,2 @@
+# Outils partagés par les pages du tableau de bord (chargement du classeur, calculs)
+from brvm.workbook import WorkbookStore, content_hash, get_workbook
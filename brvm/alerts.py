@@ -0,0 +1,263 @@
+# Alertes sur les indicateurs : règles définies par l'utilisateur, évaluées pour toutes les
+# actions en une passe sur les matrices de MarketIndicators à chaque nouvelle version des
+# données ; règles et alertes déclenchées conservées dans une base SQLite locale
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from brvm.indicators import MarketIndicators, indicator_cache
+from brvm.signals import score_matrix
+
+ALERTS_PATH = os.environ.get('BRVM_ALERTS_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'alerts.sqlite'))
+
+# Opérandes : nom -> paramètres par défaut ; les paramètres s'écrivent entre parenthèses, ex. RSI(14)
+OPERANDS = {
+    'Cours': (),
+    'SMA': (20,),
+    'EMA': (14,),
+    'RSI': (14,),
+    'ROC': (12,),
+    'MACD': (12, 26, 9),
+    'Bollinger haute': (20, 2),
+    'Bollinger basse': (20, 2),
+    'Score global': (),
+}
+PRESETS = ['Cours', 'SMA(7)', 'SMA(21)', 'SMA(100)', 'EMA(14)', 'EMA(100)', 'RSI(14)', 'ROC(12)',
+           'MACD(12,26,9)', 'Bollinger haute(20,2)', 'Bollinger basse(20,2)', 'Score global']
+ABOVE, BELOW, CROSSES_ABOVE, CROSSES_BELOW = '>', '<', 'croise au-dessus de', 'croise en dessous de'
+OPERATORS = [ABOVE, BELOW, CROSSES_ABOVE, CROSSES_BELOW]
+MAX_WINDOW = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    left TEXT NOT NULL,
+    operator TEXT NOT NULL,
+    right TEXT NOT NULL,
+    tickers TEXT NOT NULL DEFAULT '',
+    last_date TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    rule_id INTEGER NOT NULL,
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL,
+    workbook TEXT,
+    PRIMARY KEY (rule_id, ticker, date)
+) WITHOUT ROWID;
+"""
+
+
+def _window(name, value):
+    # Fenêtre d'indicateur : entier entre 1 et MAX_WINDOW séances
+    if isinstance(value, float) or not 1 <= value <= MAX_WINDOW:
+        raise ValueError(f"{name} : fenêtre entière entre 1 et {MAX_WINDOW} attendue")
+    return value
+
+
+def parse_operand(spec):
+    """'RSI(14)' -> ('RSI', (14,)), 'Cours' -> ('Cours', ()), '30' -> (None, 30.0) ; ValueError sinon.
+
+    Les paramètres sont des fenêtres entières (1 à MAX_WINDOW séances), sauf l'écart de
+    Bollinger, nombre positif ; la période rapide du MACD précède la lente.
+    """
+    spec = str(spec).strip()
+    try:
+        value = float(spec)
+    except ValueError:
+        pass
+    else:
+        if not np.isfinite(value):
+            raise ValueError(f"Valeur invalide : {spec}")
+        return None, value
+    match = re.fullmatch(r'(?P<name>[^()]+?)\s*(\((?P<params>[^()]*)\))?', spec)
+    if match is None or match['name'] not in OPERANDS:
+        raise ValueError(f"Opérande inconnu : {spec}")
+    name, defaults = match['name'], OPERANDS[match['name']]
+    try:
+        params = tuple(float(value) if '.' in value else int(value) for value in re.split(r'\s*,\s*', match['params'].strip())) \
+            if match['params'] else defaults
+    except ValueError:
+        raise ValueError(f"Paramètres invalides : {spec}") from None
+    if len(params) != len(defaults):
+        raise ValueError(f"{name} attend {len(defaults)} paramètre(s)")
+    if name in ('Bollinger haute', 'Bollinger basse'):
+        if not 0 < params[1] <= 10:
+            raise ValueError(f"{name} : écart entre 0 et 10 attendu")
+        return name, (_window(name, params[0]), params[1])
+    params = tuple(_window(name, value) for value in params)
+    if name == 'MACD' and params[0] >= params[1]:
+        raise ValueError("MACD : la période rapide doit être inférieure à la lente")
+    return name, params
+
+
+def rule_name(left, operator, right):
+    return f"{left} {operator} {right}"
+
+
+def _operand(workbook, market, spec, cache):
+    # Matrice (dates, actions) alignée sur MarketIndicators, ou scalaire pour une valeur
+    name, params = parse_operand(spec)
+    if name is None:
+        return params
+    if name == 'Cours':
+        return market.close()
+    if name == 'SMA':
+        return market.sma(*params)
+    if name == 'EMA':
+        return market.ema(*params)
+    if name == 'RSI':
+        return market.rsi(*params)
+    if name == 'ROC':
+        return market.roc(*params)
+    if name == 'MACD':
+        return market.macd(*params)['diff']
+    if name in ('Bollinger haute', 'Bollinger basse'):
+        return market.bollinger(*params)['hband' if name == 'Bollinger haute' else 'lband']
+    return score_matrix(workbook, cache).to_numpy()
+
+
+def condition(left, operator, right, rows):
+    """Déclenchement (len(rows), actions) de left operator right aux lignes rows (indices croissants).
+
+    Les croisements comparent la ligne à la précédente : au-dessus (ou en dessous) à cette
+    date, et pas à la date précédente.
+    """
+    shape = np.shape(left) if np.ndim(left) else np.shape(right)
+    left, right = np.broadcast_to(left, shape), np.broadcast_to(right, shape)
+    with np.errstate(invalid='ignore'):
+        if operator == ABOVE:
+            return left[rows] > right[rows]
+        if operator == BELOW:
+            return left[rows] < right[rows]
+        previous = np.maximum(rows - 1, 0)
+        if operator == CROSSES_ABOVE:
+            fired = (left[rows] > right[rows]) & (left[previous] <= right[previous])
+        elif operator == CROSSES_BELOW:
+            fired = (left[rows] < right[rows]) & (left[previous] >= right[previous])
+        else:
+            raise ValueError(f"Opérateur inconnu : {operator}")
+    return fired & (rows > 0)[:, None]
+
+
+class AlertStore:
+    """Règles et alertes déclenchées, dans une base SQLite locale partagée par les sessions."""
+
+    def __init__(self, path=ALERTS_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+        # Bases créées avant la colonne error (motif de la dernière évaluation impossible)
+        if 'error' not in [row[1] for row in self.connection.execute('PRAGMA table_info(rules)')]:
+            with self.connection:
+                self.connection.execute('ALTER TABLE rules ADD COLUMN error TEXT')
+
+    def add_rule(self, left, operator, right, tickers=()):
+        # Vérifie les opérandes avant enregistrement ; la règle sera évaluée à la dernière date
+        if parse_operand(left)[0] is None and parse_operand(right)[0] is None:
+            raise ValueError("Une règle doit porter sur au moins un indicateur")
+        if operator not in OPERATORS:
+            raise ValueError(f"Opérateur inconnu : {operator}")
+        with self.connection:
+            cursor = self.connection.execute('INSERT INTO rules (left, operator, right, tickers) VALUES (?, ?, ?, ?)',
+                                             (str(left).strip(), operator, str(right).strip(), ','.join(tickers)))
+        return cursor.lastrowid
+
+    def delete_rules(self, ids):
+        with self.connection:
+            self.connection.executemany('DELETE FROM alerts WHERE rule_id = ?', [(int(i),) for i in ids])
+            self.connection.executemany('DELETE FROM rules WHERE id = ?', [(int(i),) for i in ids])
+
+    def rules(self):
+        data = pd.read_sql_query('SELECT id, left, operator, right, tickers, last_date, error FROM rules ORDER BY id', self.connection)
+        data.insert(1, 'Règle', [rule_name(*row) for row in data[['left', 'operator', 'right']].itertuples(index=False)])
+        return data
+
+    def alerts(self, limit=1000):
+        # Dernières alertes déclenchées, les plus récentes d'abord
+        query = ('SELECT a.date AS Date, a.ticker AS Action, r.left, r.operator, r.right, a.value AS Valeur '
+                 'FROM alerts a JOIN rules r ON r.id = a.rule_id ORDER BY a.date DESC, a.ticker LIMIT ?')
+        data = pd.read_sql_query(query, self.connection, params=(limit,))
+        data.insert(2, 'Règle', [rule_name(*row) for row in data[['left', 'operator', 'right']].itertuples(index=False)])
+        data['Date'] = pd.to_datetime(data['Date'], format='%Y-%m-%d')
+        return data.drop(columns=['left', 'operator', 'right'])
+
+    def clear_alerts(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM alerts')
+
+    def record(self, rule_id, records, last_date):
+        # Alertes d'une règle (déjà enregistrées : ignorées) et dernière date évaluée ; nombre ajouté
+        with self.connection:
+            added = self.connection.executemany('INSERT OR IGNORE INTO alerts VALUES (?, ?, ?, ?, ?)', records).rowcount
+            self.connection.execute('UPDATE rules SET last_date = ?, error = NULL WHERE id = ?', (last_date, rule_id))
+        return max(added, 0)
+
+    def record_error(self, rule_id, message):
+        # Règle non évaluable : motif affiché sur la page Alertes, dernière date inchangée
+        with self.connection:
+            self.connection.execute('UPDATE rules SET error = ? WHERE id = ?', (message, rule_id))
+
+    def close(self):
+        self.connection.close()
+
+
+def evaluate(workbook, store, cache=None):
+    """Évalue les règles en attente sur toutes les actions ; renvoie le nombre d'alertes ajoutées.
+
+    Une règle est en attente quand les données vont au-delà de sa dernière date évaluée ;
+    une règle nouvelle n'est évaluée qu'à la dernière date. Chaque opérande (matrice de
+    MarketIndicators, en cache par version du classeur) est lu une seule fois pour toutes
+    les règles : rafraîchir une page sans nouvelles données ne coûte qu'une requête. Sans
+    règle, rien n'est calculé. Une règle invalide est ignorée et son motif enregistré
+    (colonne error de rules).
+    """
+    rules = store.rules()
+    if rules.empty:
+        return 0
+    cache = cache if cache is not None else indicator_cache()
+    market = MarketIndicators(workbook, cache=cache)
+    if not len(market.dates):
+        return 0
+    last = market.dates[-1].strftime('%Y-%m-%d')
+    pending = rules[rules['last_date'].isna() | (rules['last_date'] < last)]
+    if pending.empty:
+        return 0
+    operands = {}
+    count = 0
+    for rule in pending.itertuples(index=False):
+        try:
+            records = _fired(workbook, market, rule, operands, cache)
+        except (KeyError, ValueError) as error:
+            # Règle invalide (enregistrée avant validation des paramètres, opérande ou opérateur
+            # inconnu) : motif enregistré, les autres règles sont évaluées
+            store.record_error(int(rule.id), str(error.args[0]) if error.args else type(error).__name__)
+            continue
+        count += store.record(int(rule.id), records, last)
+    return count
+
+
+def _fired(workbook, market, rule, operands, cache):
+    # Alertes (rule_id, action, date, valeur, classeur) d'une règle depuis sa dernière date évaluée
+    for spec in (rule.left, rule.right):
+        if spec not in operands:
+            operands[spec] = _operand(workbook, market, spec, cache)
+    start = len(market.dates) - 1 if pd.isna(rule.last_date) else market.dates.searchsorted(pd.Timestamp(rule.last_date), side='right')
+    rows = np.arange(start, len(market.dates))
+    fired = condition(operands[rule.left], rule.operator, operands[rule.right], rows)
+    if rule.tickers:
+        columns = {ticker: j for j, ticker in enumerate(market.tickers)}
+        selected = np.zeros(len(market.tickers), dtype=bool)
+        selected[[columns[ticker] for ticker in rule.tickers.split(',') if ticker in columns]] = True
+        fired &= selected
+    t, j = np.nonzero(fired)
+    left = operands[rule.left]
+    values = left[rows[t], j] if np.ndim(left) else np.full(len(t), left)
+    dates = market.dates[rows[t]].strftime('%Y-%m-%d')
+    return [(int(rule.id), market.tickers[column], date, None if np.isnan(value) else float(value), workbook.key)
+            for column, date, value in zip(j, dates, values)]
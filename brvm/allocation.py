@@ -0,0 +1,243 @@
+# Allocation d'un univers d'actions : covariance rétrécie (Ledoit-Wolf) estimée sur les
+# rendements de la feuille COURS, frontière efficiente, variance minimale et parité de risque
+import numpy as np
+import pandas as pd
+
+from brvm.backtest import PERIODS_PER_YEAR, forward_fill
+from brvm.indicators import indicator_cache
+
+FRONTIER_POINTS = 25
+MIN_VARIANCE, MAX_SHARPE, RISK_PARITY = 'Variance minimale', 'Sharpe maximal', 'Parité de risque'
+
+
+def _returns(filled):
+    # Rendements logarithmiques entre lignes de cours prolongés, séances où toutes les actions sont cotées
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(filled), axis=0)
+    return returns[np.isfinite(returns).all(axis=1)]
+
+
+class MomentStats:
+    """Statistiques suffisantes des rendements journaliers d'un univers, prolongeables.
+
+    count, total (somme des rendements), cross (somme des produits croisés), weighted (somme
+    de ||r||² r) et fourth (somme de ||r||⁴) suffisent à la covariance et à l'intensité de
+    rétrécissement de Ledoit-Wolf ; une nouvelle séance coûte O(actions²). last : derniers
+    cours prolongés, à la date date.
+    """
+
+    def __init__(self, date, last, count, total, cross, weighted, fourth):
+        self.date = date
+        self.last = last
+        self.count = count
+        self.total = total
+        self.cross = cross
+        self.weighted = weighted
+        self.fourth = fourth
+
+    @staticmethod
+    def _sums(returns):
+        norms = (returns * returns).sum(axis=1)
+        return len(returns), returns.sum(axis=0), returns.T @ returns, norms @ returns, float(norms @ norms)
+
+    @classmethod
+    def from_prices(cls, dates, close):
+        filled = forward_fill(close)
+        return cls(dates[-1], filled[-1], *cls._sums(_returns(filled)))
+
+    def extended(self, dates, close):
+        # Nouvel objet prolongé des lignes postérieures à date (celui-ci est partagé en cache)
+        rows = np.flatnonzero(dates > self.date)
+        if not len(rows):
+            return self
+        filled = forward_fill(np.concatenate([self.last[None, :], np.asarray(close, dtype=float)[rows]]))
+        count, total, cross, weighted, fourth = self._sums(_returns(filled))
+        return MomentStats(dates[rows[-1]], filled[-1], self.count + count, self.total + total,
+                           self.cross + cross, self.weighted + weighted, self.fourth + fourth)
+
+    def covariance(self):
+        # Covariance empirique (divisée par count) et moyenne
+        mean = self.total / self.count
+        return self.cross / self.count - np.outer(mean, mean), mean
+
+    def shrunk(self):
+        """Covariance de Ledoit-Wolf (cible : variance moyenne × identité), intensité et moyenne."""
+        if self.count < 2:
+            raise ValueError("Historique de cours insuffisant pour estimer la covariance")
+        sample, mean = self.covariance()
+        size = len(mean)
+        target = np.trace(sample) / size
+        distance = np.sum((sample - target * np.eye(size)) ** 2)
+        # Somme des ||x||⁴ des rendements centrés, développée sur les sommes non centrées
+        norm = mean @ mean
+        centered = (self.fourth + 4 * mean @ self.cross @ mean - 4 * mean @ self.weighted
+                    + 2 * norm * np.trace(self.cross) - 3 * self.count * norm * norm)
+        spread = max(centered / self.count - np.sum(sample ** 2), 0.0) / self.count
+        shrinkage = min(spread, distance) / distance if distance > 0 else 0.0
+        return shrinkage * target * np.eye(size) + (1 - shrinkage) * sample, shrinkage, mean
+
+
+def _active_set(covariance, linear, cap, weights):
+    """Minimise ½ wᵀΣw + linearᵀw sous somme = 1 et 0 <= w <= cap, depuis weights réalisable.
+
+    Méthode primale des contraintes actives : à chaque pas, problème avec égalités sur les
+    actions libres (bornes actives fixées), puis ajout de la borne bloquante ou retrait de la
+    borne au multiplicateur négatif.
+    """
+    size = len(weights)
+    weights = weights.copy()
+    bounds = {i: weights[i] <= 1e-12 for i in range(size) if weights[i] <= 1e-12 or weights[i] >= cap - 1e-12}
+    for _ in range(10 * size + 50):
+        gradient = covariance @ weights + linear
+        free = np.array([i for i in range(size) if i not in bounds], dtype=int)
+        direction = np.zeros(size)
+        if len(free):
+            system = np.zeros((len(free) + 1, len(free) + 1))
+            system[:-1, :-1] = covariance[np.ix_(free, free)]
+            system[:-1, -1] = system[-1, :-1] = 1.0
+            solution = np.linalg.solve(system, np.concatenate([-gradient[free], [0.0]]))
+            direction[free] = solution[:-1]
+        if np.abs(direction).max() < 1e-12:
+            if not bounds or not len(free):
+                return weights
+            level = gradient[free].mean()
+            # Multiplicateurs des bornes actives : positifs à l'optimum
+            multipliers = {i: gradient[i] - level if lower else level - gradient[i] for i, lower in bounds.items()}
+            worst = min(multipliers, key=multipliers.get)
+            if multipliers[worst] >= -1e-12:
+                return weights
+            del bounds[worst]
+            continue
+        step, blocking = 1.0, None
+        for i in free:
+            if direction[i] < -1e-15 and -weights[i] / direction[i] < step:
+                step, blocking = -weights[i] / direction[i], (i, True)
+            elif direction[i] > 1e-15 and (cap - weights[i]) / direction[i] < step:
+                step, blocking = (cap - weights[i]) / direction[i], (i, False)
+        weights = weights + step * direction
+        if blocking is not None:
+            i, lower = blocking
+            weights[i] = 0.0 if lower else cap
+            bounds[i] = lower
+    return weights
+
+
+class Allocation:
+    """Optimisations d'un univers sur sa covariance rétrécie, annualisée.
+
+    La décomposition spectrale de la covariance est calculée une fois et sert à toutes les
+    contraintes essayées ensuite (pondérations entre 0 et cap, somme 1) : solution analytique
+    quand aucune borne n'est atteinte, sinon méthode des contraintes actives.
+    """
+
+    def __init__(self, tickers, mean, covariance, shrinkage, count):
+        self.tickers = list(tickers)
+        self.mean = mean * PERIODS_PER_YEAR
+        self.covariance = covariance * PERIODS_PER_YEAR
+        self.shrinkage = shrinkage
+        self.count = count
+        self.eigenvalues, self.eigenvectors = np.linalg.eigh(self.covariance)
+
+    @classmethod
+    def from_stats(cls, tickers, stats):
+        covariance, shrinkage, mean = stats.shrunk()
+        return cls(tickers, mean, covariance, shrinkage, stats.count)
+
+    def risk(self, weights):
+        return float(np.sqrt(max(weights @ self.covariance @ weights, 0.0)))
+
+    def expected(self, weights):
+        return float(self.mean @ weights)
+
+    def risk_contributions(self, weights):
+        marginal = self.covariance @ weights
+        return weights * marginal / (weights @ marginal)
+
+    def _solve(self, values):
+        # Σ⁻¹ values par la décomposition spectrale
+        return self.eigenvectors @ ((self.eigenvectors.T @ values) / self.eigenvalues)
+
+    def mean_variance(self, appetite=0.0, cap=1.0, start=None):
+        """Minimise ½ wᵀΣw - appetite · μᵀw (appetite = 0 : variance minimale), 0 <= w <= cap."""
+        size = len(self.tickers)
+        if cap * size < 1 - 1e-12:
+            raise ValueError(f"Poids maximal trop faible pour {size} actions")
+        # Sans borne atteinte, la solution analytique suffit : w = Σ⁻¹(appetite · μ + ν · 1)
+        ones, drift = self._solve(np.ones(size)), self._solve(appetite * self.mean)
+        weights = drift + (1 - drift.sum()) / ones.sum() * ones
+        if weights.min() >= 0 and weights.max() <= cap:
+            return weights
+        start = np.full(size, 1.0 / size) if start is None else start
+        return _active_set(self.covariance, -appetite * self.mean, cap, start)
+
+    def minimum_variance(self, cap=1.0):
+        return self.mean_variance(0.0, cap)
+
+    def frontier(self, cap=1.0, points=FRONTIER_POINTS):
+        # Portefeuilles efficients, de la variance minimale au rendement maximal
+        spread = max(np.ptp(self.mean), 1e-12)
+        appetites = np.concatenate([[0.0], np.geomspace(1e-3, 1e2, points - 1) * self.eigenvalues[-1] / spread])
+        weights, rows = None, []
+        for appetite in appetites:
+            weights = self.mean_variance(appetite, cap, weights)
+            rows.append(weights)
+        rows = np.array(rows)
+        table = pd.DataFrame(rows, columns=self.tickers)
+        table.insert(0, 'Volatilité %', [self.risk(row) * 100 for row in rows])
+        table.insert(0, 'Rendement %', [self.expected(row) * 100 for row in rows])
+        return table.drop_duplicates(subset=['Rendement %', 'Volatilité %']).reset_index(drop=True)
+
+    def max_sharpe(self, cap=1.0, points=FRONTIER_POINTS):
+        # Point de la frontière au meilleur rapport rendement / volatilité (sans taux sans risque)
+        frontier = self.frontier(cap, points)
+        best = (frontier['Rendement %'] / frontier['Volatilité %']).idxmax()
+        return frontier.loc[best, self.tickers].to_numpy(dtype=float)
+
+    def risk_parity(self):
+        """Contributions au risque égales : Newton sur ½ yᵀΣy - Σ log y, puis w = y / Σy."""
+        y = 1 / np.sqrt(np.maximum(np.diag(self.covariance), 1e-18))
+        for _ in range(100):
+            gradient = self.covariance @ y - 1 / y
+            direction = np.linalg.solve(self.covariance + np.diag(1 / (y * y)), gradient)
+            scale = 1.0
+            while np.any(y - scale * direction <= 0):
+                scale /= 2
+            y = y - scale * direction
+            if np.abs(gradient).max() * np.abs(y).max() < 1e-10:
+                break
+        return y / y.sum()
+
+    def portfolios(self, cap=1.0):
+        # Pondérations des trois portefeuilles types et leurs caractéristiques
+        weights = {MIN_VARIANCE: self.minimum_variance(cap), MAX_SHARPE: self.max_sharpe(cap), RISK_PARITY: self.risk_parity()}
+        table = pd.DataFrame({name: values * 100 for name, values in weights.items()}, index=pd.Index(self.tickers, name='Action'))
+        metrics = pd.DataFrame({name: {'Rendement %': self.expected(values) * 100,
+                                       'Volatilité %': self.risk(values) * 100,
+                                       'Sharpe': self.expected(values) / self.risk(values) if self.risk(values) > 0 else np.nan}
+                                for name, values in weights.items()})
+        return table, metrics
+
+
+def moment_stats(workbook, tickers, cache=None):
+    # Statistiques de l'univers pour cette version du classeur ; prolongées depuis la version
+    # précédente quand elle est en cache et que seules des séances ont été ajoutées
+    cache = cache if cache is not None else indicator_cache()
+    tickers = tuple(tickers)
+
+    def compute():
+        cube = workbook.price_cube()
+        close = cube.field('Close')[:, [cube.columns[ticker] for ticker in tickers]]
+        previous = workbook.previous_key()
+        stats = cache.peek((previous, None, 'moments', (tickers,))) if previous else None
+        if stats is not None and stats.date in cube.dates:
+            return stats.extended(cube.dates, close)
+        return MomentStats.from_prices(cube.dates, close)
+    return cache.get((workbook.key, None, 'moments', (tickers,)), compute)
+
+
+def allocation(workbook, tickers, cache=None):
+    # Covariance rétrécie et sa décomposition, une fois par version du classeur et par univers
+    cache = cache if cache is not None else indicator_cache()
+    tickers = tuple(tickers)
+    return cache.get((workbook.key, None, 'allocation', (tickers,)),
+                     lambda: Allocation.from_stats(tickers, moment_stats(workbook, tickers, cache)))
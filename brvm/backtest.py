@@ -0,0 +1,121 @@
+# Backtest vectorisé des signaux du tableau de bord : positions, courbe de capital, drawdown
+# et rotation pour toutes les actions à la fois (matrices dates × actions)
+import os
+
+import numpy as np
+import pandas as pd
+
+from brvm.indicators import MarketIndicators, indicator_cache
+from brvm.signals import BUY, SELL, SIGNALS, signal_matrix
+
+# Frais par ordre (achat ou vente), en fraction du montant : commission SGI, BRVM,
+# dépositaire central (DC/BR) et TVA sur la commission ; BRVM_FEES remplace le total
+BROKER_FEE = 0.006
+EXCHANGE_FEE = 0.0015
+DEPOSITORY_FEE = 0.001
+VAT = 0.18
+FEE_RATE = float(os.environ.get('BRVM_FEES', BROKER_FEE * (1 + VAT) + EXCHANGE_FEE + DEPOSITORY_FEE))
+PERIODS_PER_YEAR = 252
+SCORE_RULE = 'Score global'
+RULES = SIGNALS + [SCORE_RULE]
+
+
+def forward_fill(values):
+    # Dernière valeur non NaN le long des dates (NaN avant la première)
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = np.take_along_axis(values, index, axis=0)
+    filled[np.cumsum(valid, axis=0) == 0] = np.nan
+    return filled
+
+
+def positions_from_states(states):
+    # Acheter ouvre une position, Vendre la solde, Neutre conserve la position en cours
+    states = np.asarray(states)
+    decided = np.where(states == BUY, 1.0, np.where(states == SELL, 0.0, np.nan))
+    return np.nan_to_num(forward_fill(decided))
+
+
+def score_states(scores, buy=60, sell=40):
+    # Recommandation de « Mon portefeuille » : Acheter au-dessus de 60, Vendre en dessous de 40
+    return np.where(scores > buy, BUY, np.where(scores < sell, SELL, 0)).astype(np.int8)
+
+
+class BacktestResult:
+    """Résultat d'un backtest : matrices (dates, actions), dates et actions alignées sur les cours.
+
+    held : exposition (0 à 1) pendant chaque séance, décidée à la clôture précédente ;
+    returns : rendement de la stratégie net de frais ; equity : capital (base 1) ;
+    drawdown : recul depuis le plus haut ; turnover : part du capital échangée ;
+    benchmark : capital d'un achat conservé sur toute la période.
+    """
+
+    def __init__(self, dates, tickers, held, returns, turnover, asset_returns):
+        self.dates = dates
+        self.tickers = list(tickers) if tickers is not None else list(range(held.shape[1]))
+        self.held = held
+        self.returns = returns
+        self.turnover = turnover
+        self.equity = np.cumprod(1 + returns, axis=0)
+        self.drawdown = self.equity / np.maximum.accumulate(self.equity, axis=0) - 1
+        self.benchmark = np.cumprod(1 + asset_returns, axis=0)
+
+    def sharpe(self):
+        # Ratio de Sharpe annualisé (sans taux sans risque) par action
+        volatility = self.returns.std(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(volatility > 0, self.returns.mean(axis=0) / volatility * np.sqrt(PERIODS_PER_YEAR), np.nan)
+
+    def summary(self):
+        # Une ligne par action, triée par rendement total décroissant
+        years = max(len(self.dates) / PERIODS_PER_YEAR, 1 / PERIODS_PER_YEAR)
+        table = pd.DataFrame({
+            'Rendement %': (self.equity[-1] - 1) * 100,
+            'Rendement annualisé %': (np.power(np.maximum(self.equity[-1], 0), 1 / years) - 1) * 100,
+            'Volatilité %': self.returns.std(axis=0) * np.sqrt(PERIODS_PER_YEAR) * 100,
+            'Sharpe': self.sharpe(),
+            'Drawdown max %': self.drawdown.min(axis=0) * 100,
+            'Transactions': (self.turnover > 0).sum(axis=0),
+            'Rotation annuelle': self.turnover.sum(axis=0) / years,
+            'Exposition %': self.held.mean(axis=0) * 100,
+            'Achat-conservation %': (self.benchmark[-1] - 1) * 100,
+        }, index=pd.Index(self.tickers, name='Action'))
+        return table.sort_values('Rendement %', ascending=False, kind='stable')
+
+
+def run(close, positions, fee=FEE_RATE, dates=None, tickers=None):
+    """Simule des positions cibles (0 à 1, décidées à la clôture) sur des cours (dates, actions).
+
+    La position décidée à la date t est prise au cours de clôture de t et porte sur la séance
+    t + 1 ; une séance sans cours ne permet pas de traiter (position inchangée, rendement nul).
+    Chaque variation d'exposition paie fee sur le montant échangé.
+    """
+    close = np.asarray(close, dtype=float)
+    positions = np.where(np.isnan(close), np.nan, positions)
+    # Avant la première cotation : aucune position
+    positions = np.nan_to_num(forward_fill(positions))
+    filled = forward_fill(close)
+    asset_returns = np.zeros(close.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns[1:] = filled[1:] / filled[:-1] - 1
+    asset_returns = np.nan_to_num(asset_returns, nan=0.0, posinf=0.0, neginf=0.0)
+    held = np.zeros(close.shape)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    returns = held * asset_returns - turnover * fee
+    return BacktestResult(dates, tickers, held, returns, turnover, asset_returns)
+
+
+def backtest(workbook, rule, fee=FEE_RATE, cache=None):
+    # Backtest d'une règle (un des SIGNALS ou SCORE_RULE) sur toutes les actions, mis en cache
+    # par version du classeur
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        market = MarketIndicators(workbook, cache=cache)
+        matrix = signal_matrix(workbook, cache)
+        states = score_states(matrix.scores()) if rule == SCORE_RULE else matrix.states[:, :, SIGNALS.index(rule)]
+        return run(market.close(), positions_from_states(states), fee, market.dates, market.tickers)
+    return cache.get((workbook.key, None, 'backtest', (rule, fee)), compute)
@@ -0,0 +1,157 @@
+# Corrélations et covariances de toutes les colonnes de la feuille COURS, tenues à jour par
+# statistiques suffisantes par paire : une nouvelle séance coûte O(actions²)
+import numpy as np
+import pandas as pd
+
+from brvm.backtest import PERIODS_PER_YEAR, forward_fill
+from brvm.indicators import indicator_cache
+
+WINDOWS = (63, 126, 252)
+MIN_PERIODS = 20
+
+
+def _returns(filled):
+    # Rendements simples entre lignes de cours prolongés ; NaN avant la première cotation
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return filled[1:] / filled[:-1] - 1
+
+
+class PairStats:
+    """Sommes par paire (i, j) sur les séances où les deux rendements existent.
+
+    count[i, j] : nombre de séances ; total[i, j] : somme des rendements de i ; squares[i, j] :
+    somme de leurs carrés ; cross[i, j] : somme des produits des rendements de i et de j.
+    """
+
+    def __init__(self, size):
+        self.count = np.zeros((size, size))
+        self.total = np.zeros((size, size))
+        self.squares = np.zeros((size, size))
+        self.cross = np.zeros((size, size))
+
+    def add(self, returns, sign=1.0):
+        # Ajoute (sign = 1) ou retire (sign = -1) des lignes de rendements (séances, actions)
+        observed = (~np.isnan(returns)).astype(float)
+        values = np.where(observed > 0, returns, 0.0)
+        self.count += sign * (observed.T @ observed)
+        self.total += sign * (values.T @ observed)
+        self.squares += sign * ((values * values).T @ observed)
+        self.cross += sign * (values.T @ values)
+        return self
+
+    def copy(self):
+        stats = PairStats(0)
+        stats.count, stats.total, stats.squares, stats.cross = self.count.copy(), self.total.copy(), self.squares.copy(), self.cross.copy()
+        return stats
+
+    def covariance(self, min_periods=MIN_PERIODS):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = (self.cross - self.total * self.total.T / self.count) / (self.count - 1)
+        return np.where(self.count >= max(min_periods, 2), covariance, np.nan)
+
+    def correlation(self, min_periods=MIN_PERIODS):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            centered = self.cross - self.total * self.total.T / self.count
+            spread = self.squares - self.total * self.total / self.count
+            correlation = np.clip(centered / np.sqrt(spread * spread.T), -1.0, 1.0)
+        return np.where(self.count >= max(min_periods, 2), correlation, np.nan)
+
+
+class CorrelationState:
+    """Statistiques par paire sur tout l'historique et sur les fenêtres glissantes WINDOWS.
+
+    extended() ajoute de nouvelles séances : chaque ligne est ajoutée aux sommes, et la ligne
+    qui sort de chaque fenêtre en est retirée (les max(WINDOWS) derniers rendements sont
+    conservés pour cela).
+    """
+
+    def __init__(self, dates, tickers, last, full, windows, recent):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.last = last
+        self.full = full
+        self.windows = windows
+        self.recent = recent
+
+    @classmethod
+    def from_prices(cls, dates, tickers, close):
+        filled = forward_fill(close)
+        returns = _returns(filled)
+        windows = {window: PairStats(len(tickers)).add(returns[-window:]) for window in WINDOWS}
+        return cls(dates, tickers, filled[-1], PairStats(len(tickers)).add(returns), windows, returns[-max(WINDOWS):])
+
+    def extended(self, dates, tickers, close):
+        # Nouvel état prolongé des séances postérieures à la dernière connue (celui-ci est
+        # partagé en cache) ; None si les actions ont changé
+        if list(tickers) != self.tickers:
+            return None
+        rows = np.flatnonzero(dates > self.dates[-1])
+        if not len(rows):
+            return self
+        filled = forward_fill(np.concatenate([self.last[None, :], np.asarray(close, dtype=float)[rows]]))
+        returns = _returns(filled)
+        recent = np.concatenate([self.recent, returns])
+        windows = {}
+        for window, stats in self.windows.items():
+            # Séances qui sortent de la fenêtre : celles qui la précédaient avant l'ajout
+            leaving = recent[max(len(recent) - len(returns) - window, 0):max(len(recent) - window, 0)]
+            windows[window] = stats.copy().add(returns).add(leaving, -1.0)
+        return CorrelationState(self.dates.append(dates[rows]), self.tickers, filled[-1], self.full.copy().add(returns),
+                                windows, recent[-max(WINDOWS):])
+
+    def _stats(self, window):
+        if window is None:
+            return self.full
+        if window not in self.windows:
+            raise KeyError(f"Fenêtre {window} non suivie")
+        return self.windows[window]
+
+    def correlation(self, window=None, min_periods=MIN_PERIODS):
+        # DataFrame actions × actions, sur tout l'historique (window = None) ou une fenêtre de WINDOWS
+        return pd.DataFrame(self._stats(window).correlation(min_periods), index=self.tickers, columns=self.tickers)
+
+    def covariance(self, window=None, min_periods=MIN_PERIODS):
+        # Covariance annualisée des rendements journaliers
+        return pd.DataFrame(self._stats(window).covariance(min_periods) * PERIODS_PER_YEAR, index=self.tickers, columns=self.tickers)
+
+
+def cluster_order(correlation):
+    """Ordre des actions par classification hiérarchique (lien moyen, distance √((1 - ρ) / 2)).
+
+    Les corrélations inconnues comptent comme nulles ; les groupes fusionnés restent contigus.
+    """
+    correlation = np.nan_to_num(np.asarray(correlation, dtype=float))
+    distance = np.sqrt(np.clip((1 - correlation) / 2, 0.0, 1.0))
+    clusters = [[i] for i in range(len(distance))]
+    between = distance.copy()
+    np.fill_diagonal(between, np.inf)
+    sizes = np.ones(len(distance))
+    active = np.ones(len(distance), dtype=bool)
+    for _ in range(len(distance) - 1):
+        masked = np.where(active[:, None] & active[None, :], between, np.inf)
+        i, j = np.unravel_index(np.argmin(masked), masked.shape)
+        i, j = min(i, j), max(i, j)
+        # Lien moyen : distance du groupe fusionné = moyenne pondérée par les tailles
+        merged = (sizes[i] * between[i] + sizes[j] * between[j]) / (sizes[i] + sizes[j])
+        between[i], between[:, i] = merged, merged
+        between[i, i] = np.inf
+        clusters[i] = clusters[i] + clusters[j]
+        sizes[i] += sizes[j]
+        active[j] = False
+    return clusters[0] if len(clusters) else []
+
+
+def correlation_state(workbook, cache=None):
+    # État des corrélations pour cette version du classeur ; prolongé depuis la version
+    # précédente quand elle est en cache et que seules des séances ont été ajoutées
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        cube = workbook.price_cube()
+        close = cube.field('Close')
+        previous = workbook.previous_key()
+        state = cache.peek((previous, None, 'correlation', ())) if previous else None
+        if state is not None and state.dates[-1] in cube.dates:
+            state = state.extended(cube.dates, cube.tickers, close)
+        return state if state is not None else CorrelationState.from_prices(cube.dates, cube.tickers, close)
+    return cache.get((workbook.key, None, 'correlation', ()), compute)
@@ -0,0 +1,48 @@
+# Import en masse des exports CSV par action (format de DANGSUG.csv) :
+# séparateur ';', dates jj/mm/aaaa, lignes de la plus récente à la plus ancienne,
+# 'Variation %' en texte ('-7.69%')
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+CSV_COLUMNS = ['Date', 'Close', 'Open', 'High', 'Low', 'Volume', 'Variation %']
+CSV_DTYPES = {'Close': 'float64', 'Open': 'float64', 'High': 'float64', 'Low': 'float64', 'Volume': 'float64', 'Variation %': 'string'}
+# Champ du CSV -> feuille de cours du classeur
+SHEET_FIELDS = {'COURS': 'Close', 'OUVERTURE': 'Open', 'MAX': 'High', 'MIN': 'Low', 'VOLUME': 'Volume'}
+
+
+def ticker_from_path(path):
+    # 'DANGSUG.csv', 'DANGSUG - modifie.csv' -> 'DANGSUG'
+    return os.path.splitext(os.path.basename(path))[0].split(' ')[0]
+
+
+def read_ticker_csv(path):
+    data = pd.read_csv(path, sep=';', encoding='utf-8-sig', usecols=CSV_COLUMNS, dtype=CSV_DTYPES)
+    data['Date'] = pd.to_datetime(data['Date'], format='%d/%m/%Y')
+    data['Variation %'] = pd.to_numeric(data['Variation %'].str.rstrip('%'), errors='coerce').astype('float64')
+    # Ordre chronologique croissant, comme le cube de prix
+    return data.drop_duplicates('Date').iloc[::-1].reset_index(drop=True)
+
+
+def _read(path):
+    return ticker_from_path(path), read_ticker_csv(path)
+
+
+def import_directory(directory, max_workers=None):
+    # Un fichier par processus ; à nom d'action égal, le dernier fichier (ordre alphabétique) l'emporte
+    paths = sorted(glob.glob(os.path.join(directory, '*.csv')))
+    if len(paths) < 2:
+        return dict(_read(path) for path in paths)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(_read, paths))
+
+
+def to_price_sheets(frames):
+    # {action: DataFrame CSV} -> feuilles larges 'Date' + une colonne par action, comme COURS, MAX...
+    sheets = {}
+    for sheet_name, field in SHEET_FIELDS.items():
+        wide = pd.concat({ticker: data.set_index('Date')[field] for ticker, data in frames.items()}, axis=1, sort=True)
+        sheets[sheet_name] = wide.sort_index().rename_axis('Date').reset_index()
+    return sheets
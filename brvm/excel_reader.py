@@ -0,0 +1,165 @@
+# Lecture en flux des feuilles d'un classeur .xlsm (openpyxl en mode lecture seule)
+import datetime
+import io
+import posixpath
+import zipfile
+from collections import Counter
+from xml.etree import ElementTree
+
+import openpyxl
+import pandas as pd
+
+CHUNK_ROWS = 5000
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+def _column_names(header_row):
+    # Mêmes noms que pd.read_excel : 'Unnamed: i' pour les cellules vides, suffixe '.n' pour les doublons
+    names = [f'Unnamed: {i}' if value is None else value for i, value in enumerate(header_row)]
+    seen = Counter()
+    for i, name in enumerate(names):
+        if seen[name]:
+            names[i] = f'{name}.{seen[name]}'
+        seen[name] += 1
+    return names
+
+
+def sheet_fingerprints(raw):
+    # Empreinte de chaque feuille lue dans l'annuaire du zip (CRC32 et taille de la partie XML),
+    # sans décompression. La table des chaînes partagées entre dans chaque empreinte :
+    # une feuille dont le XML n'a pas changé peut sinon désigner d'autres chaînes.
+    with zipfile.ZipFile(io.BytesIO(raw)) as archive:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        relations = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        targets = {relation.get('Id'): relation.get('Target') for relation in relations}
+        names = set(archive.namelist())
+        strings = archive.getinfo('xl/sharedStrings.xml').CRC if 'xl/sharedStrings.xml' in names else 0
+        fingerprints = {}
+        for sheet in workbook.iter(f'{MAIN_NS}sheet'):
+            target = targets.get(sheet.get(f'{REL_NS}id'), '')
+            path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+            if path in names:
+                info = archive.getinfo(path)
+                fingerprints[sheet.get('name')] = f'{info.CRC:08x}-{info.file_size}-{strings:08x}'
+    return fingerprints
+
+
+def _as_date(value):
+    # openpyxl renvoie déjà des datetime ; les autres valeurs passent par pandas
+    if isinstance(value, datetime.datetime):
+        return value
+    value = pd.to_datetime(value, errors='coerce')
+    return value if pd.isna(value) else value.to_pydatetime()
+
+
+def _trim(row):
+    # Cellules vides en fin de ligne ignorées (dimensions de feuille souvent surévaluées)
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return row[:end]
+
+
+def _records(rows, names):
+    # Lignes brutes -> DataFrame aux colonnes names (cellules manquantes : NaN)
+    data = pd.DataFrame.from_records(rows).reindex(columns=range(len(names)))
+    data.columns = names
+    return data.infer_objects()
+
+
+def _same_rows(data, previous):
+    # Mêmes valeurs cellule à cellule (NaN égaux, 703 == 703.0), quels que soient les dtypes
+    if data.shape != previous.shape:
+        return False
+    for column in previous.columns:
+        left, right = data[column].to_numpy(dtype=object), previous[column].to_numpy(dtype=object)
+        if not ((left == right) | (pd.isna(left) & pd.isna(right))).all():
+            return False
+    return True
+
+
+class SheetReader:
+    """Classeur ouvert en lecture seule : ni styles de cellule, ni VBA, ni liens externes.
+
+    Seules les feuilles demandées sont décodées, ligne par ligne, par paquets
+    de CHUNK_ROWS lignes.
+    """
+
+    def __init__(self, raw):
+        self._workbook = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True, keep_vba=False, keep_links=False)
+        self.sheet_names = self._workbook.sheetnames
+
+    def iter_chunks(self, sheet_name, chunk_size=CHUNK_ROWS):
+        chunk = []
+        for row in self._workbook[sheet_name].iter_rows(values_only=True):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def read(self, sheet_name, header=0):
+        names = None
+        frames = []
+        for chunk in self.iter_chunks(sheet_name):
+            rows = [_trim(row) for row in chunk]
+            if header is not None and names is None:
+                names, rows = rows[0], rows[1:]
+            if rows:
+                frames.append(pd.DataFrame.from_records(rows))
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        # Comme pd.read_excel : les lignes vides en fin de feuille sont ignorées
+        filled = data.notna().any(axis=1).to_numpy().nonzero()[0]
+        data = data.iloc[:filled[-1] + 1 if len(filled) else 0]
+        width = max(data.shape[1], len(names) if names is not None else 0)
+        data = data.reindex(columns=range(width))
+        for column in data.columns[data.isna().all().to_numpy()]:
+            data[column] = data[column].astype(float)
+        if names is not None:
+            data.columns = _column_names(list(names) + [None] * (width - len(names)))
+        return data.infer_objects()
+
+    def read_appended(self, sheet_name, previous):
+        """Feuille 'Date' + colonnes complétée par les seules nouvelles dates.
+
+        previous est la version déjà chargée de la feuille. Les nouvelles dates doivent
+        former un bloc en tête (feuille triée par date décroissante) ou en fin de feuille ;
+        les autres lignes sont comparées à previous, si bien qu'un cours historique corrigé
+        n'est jamais remplacé par l'ancien. Renvoie (feuille, nombre de lignes ajoutées), ou
+        None si la feuille ne se présente pas comme un simple ajout de dates (en-tête
+        modifié, ligne connue différente, dates intercalées...) : il faut alors la relire
+        entièrement.
+        """
+        rows = self._workbook[sheet_name].iter_rows(values_only=True)
+        names = _column_names(list(_trim(next(rows, ()))))
+        if names != list(previous.columns) or 'Date' not in names:
+            return None
+        position = names.index('Date')
+        last_date = pd.to_datetime(previous['Date'], errors='coerce').max()
+        if pd.isna(last_date):
+            return None
+        last_date = last_date.to_pydatetime()
+        rows = [_trim(row) for row in rows]
+        # Comme read() : les lignes vides en fin de feuille sont ignorées
+        while rows and not rows[-1]:
+            rows.pop()
+        if any(len(row) > len(names) for row in rows):
+            return None
+        dates = [_as_date(row[position]) if len(row) > position else pd.NaT for row in rows]
+        added = [i for i, date in enumerate(dates) if not pd.isna(date) and date > last_date]
+        newest_first = added == list(range(len(added)))
+        if not newest_first and added != list(range(len(rows) - len(added), len(rows))):
+            return None
+        known = rows[len(added):] if newest_first else rows[:len(rows) - len(added)]
+        if not _same_rows(_records(known, names), previous):
+            return None
+        new_rows = _records(rows[:len(added)] if newest_first else rows[len(rows) - len(added):], names)
+        parts = [new_rows, previous] if newest_first else [previous, new_rows]
+        # Sans nouvelle date, new_rows est vide : il n'entre pas dans le calcul des dtypes
+        data = pd.concat([part for part in parts if not part.empty], ignore_index=True)
+        return data.infer_objects(), len(added)
+
+    def close(self):
+        self._workbook.close()
@@ -0,0 +1,244 @@
+# État des indicateurs du tableau de bord à la dernière date, mis à jour en temps constant
+# à chaque nouvelle séance : sommes glissantes, moyennes exponentielles, lissage de Wilder
+import numpy as np
+import pandas as pd
+
+from brvm import kernels
+
+SMA_WINDOWS = (7, 10, 20, 21, 100)
+EMA_WINDOWS = (12, 14, 26, 100)
+MACD_PARAMS = (12, 26, 9)
+RSI_WINDOW = 14
+ROC_WINDOW = 12
+BOLLINGER_PARAMS = (20, 2)
+HISTORY = max(SMA_WINDOWS + (ROC_WINDOW + 1,))
+
+
+class _Ewm:
+    # Récurrence de pandas ewm(adjust=False, ignore_na=False), une valeur par action
+    def __init__(self, alpha, min_periods, weighted, old_weight, count):
+        self.alpha = alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = weighted
+        self.old_weight = old_weight
+        self.count = count
+
+    @classmethod
+    def from_history(cls, values, alpha, min_periods):
+        observed = ~np.isnan(values)
+        weighted = kernels.ewm(values, alpha, 1)[-1]
+        # Poids de la dernière moyenne : réduit à chaque séance sans cours depuis la dernière observation
+        idle = np.where(observed.any(axis=0), observed[::-1].argmax(axis=0), 0)
+        old_weight = np.where(np.isnan(weighted), 1.0, (1 - alpha) ** idle)
+        return cls(alpha, min_periods, weighted, old_weight, observed.sum(axis=0))
+
+    def append(self, value):
+        observed = ~np.isnan(value)
+        self.count = self.count + observed
+        started = ~np.isnan(self.weighted)
+        old_weight = np.where(started, self.old_weight * (1 - self.alpha), self.old_weight)
+        update = started & observed & (self.weighted != value)
+        with np.errstate(invalid='ignore'):
+            mixed = (old_weight * self.weighted + self.alpha * value) / (old_weight + self.alpha)
+        weighted = np.where(update, mixed, self.weighted)
+        self.weighted = np.where(~started & observed, value, weighted)
+        self.old_weight = np.where(started & observed, 1.0, old_weight)
+        return self.value()
+
+    def value(self):
+        return np.where(self.count >= self.min_periods, self.weighted, np.nan)
+
+    def arrays(self, prefix):
+        return {f'{prefix}.weighted': self.weighted, f'{prefix}.old_weight': self.old_weight, f'{prefix}.count': self.count}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix, alpha, min_periods):
+        return cls(alpha, min_periods, arrays[f'{prefix}.weighted'], arrays[f'{prefix}.old_weight'], arrays[f'{prefix}.count'])
+
+
+class IndicatorState:
+    """Indicateurs de toutes les actions à la dernière date connue, prolongés séance par séance.
+
+    append() ajoute une ligne de clôtures (une par action) en temps constant : fenêtre
+    circulaire des HISTORY derniers cours, sommes glissantes, moyennes exponentielles
+    (EMA, MACD et sa ligne de signal, lissage de Wilder du RSI). Les accesseurs ont la forme
+    de ceux de MarketIndicators et renvoient une ligne (1, actions) ; seuls les paramètres
+    du tableau de bord sont disponibles.
+    """
+
+    def __init__(self, tickers, date, arrays):
+        self.tickers = list(tickers)
+        self.dates = pd.DatetimeIndex([] if pd.isna(date) else [date])
+        self._arrays = arrays
+        self._ewm = {f'ema{window}': _Ewm.from_arrays(arrays, f'ema{window}', 2.0 / (window + 1), window) for window in EMA_WINDOWS}
+        self._ewm['signal'] = _Ewm.from_arrays(arrays, 'signal', 2.0 / (MACD_PARAMS[2] + 1), MACD_PARAMS[2])
+        self._ewm['up'] = _Ewm.from_arrays(arrays, 'up', 1.0 / RSI_WINDOW, RSI_WINDOW)
+        self._ewm['down'] = _Ewm.from_arrays(arrays, 'down', 1.0 / RSI_WINDOW, RSI_WINDOW)
+        self._refresh()
+
+    @classmethod
+    def empty(cls, tickers):
+        # État sans aucune séance (dates vide), prolongeable par append()
+        size = len(tickers)
+        arrays = {'seen': np.array(0), 'position': np.array(0), 'history': np.full((HISTORY, size), np.nan),
+                  'squares': np.zeros(size), 'run': np.zeros(size)}
+        for window in SMA_WINDOWS:
+            arrays[f'sum{window}'], arrays[f'missing{window}'] = np.zeros(size), np.zeros(size, dtype=int)
+        for name in [f'ema{window}' for window in EMA_WINDOWS] + ['signal', 'up', 'down']:
+            arrays.update({f'{name}.weighted': np.full(size, np.nan), f'{name}.old_weight': np.ones(size), f'{name}.count': np.zeros(size, dtype=int)})
+        return cls(tickers, pd.NaT, arrays)
+
+    @classmethod
+    def from_history(cls, dates, tickers, close):
+        # close : matrice dates × actions (dates croissantes), comme MarketIndicators.close()
+        close = np.asarray(close, dtype=float)
+        if not len(close):
+            return cls.empty(tickers)
+        history = np.full((HISTORY, close.shape[1]), np.nan)
+        recent = close[-HISTORY:]
+        history[HISTORY - len(recent):] = recent
+        arrays = {'seen': np.array(len(close)), 'position': np.array(0), 'history': history}
+        for window in SMA_WINDOWS:
+            last = close[-window:]
+            arrays[f'sum{window}'] = np.nansum(last, axis=0)
+            arrays[f'missing{window}'] = np.isnan(last).sum(axis=0)
+        last = close[-BOLLINGER_PARAMS[0]:]
+        arrays['squares'] = np.nansum(last * last, axis=0)
+        changed = np.ones(close.shape)
+        np.not_equal(close[1:], close[:-1], out=changed[1:])
+        # Nombre de séances consécutives au même cours, dernière comprise
+        arrays['run'] = np.where(changed.any(axis=0), changed[::-1].argmax(axis=0) + 1, len(close)).astype(float)
+        arrays['run'][np.isnan(close[-1])] = 0
+
+        states = {f'ema{window}': _Ewm.from_history(close, 2.0 / (window + 1), window) for window in EMA_WINDOWS}
+        fast, slow, sign = MACD_PARAMS
+        line = kernels.ema(close, fast) - kernels.ema(close, slow)
+        states['signal'] = _Ewm.from_history(line, 2.0 / (sign + 1), sign)
+        diff = np.full(close.shape, np.nan)
+        diff[1:] = close[1:] - close[:-1]
+        with np.errstate(invalid='ignore'):
+            states['up'] = _Ewm.from_history(np.where(diff > 0, diff, 0.0), 1.0 / RSI_WINDOW, RSI_WINDOW)
+            states['down'] = _Ewm.from_history(np.where(diff < 0, -diff, 0.0), 1.0 / RSI_WINDOW, RSI_WINDOW)
+        for name, state in states.items():
+            arrays.update(state.arrays(name))
+        return cls(tickers, dates[-1], arrays)
+
+    def _past(self, lag):
+        # Cours d'il y a lag séances (lag >= 1) dans la fenêtre circulaire
+        return self._arrays['history'][(self._arrays['position'] - lag) % HISTORY]
+
+    def append(self, date, close):
+        close = np.asarray(close, dtype=float)
+        arrays = self._arrays
+        seen = int(arrays['seen'])
+        previous = self._past(1)
+        observed = ~np.isnan(close)
+        value = np.where(observed, close, 0.0)
+        for window in SMA_WINDOWS:
+            if seen >= window:
+                leaving = self._past(window)
+                arrays[f'sum{window}'] = arrays[f'sum{window}'] - np.where(np.isnan(leaving), 0.0, leaving)
+                arrays[f'missing{window}'] = arrays[f'missing{window}'] - np.isnan(leaving)
+            arrays[f'sum{window}'] = arrays[f'sum{window}'] + value
+            arrays[f'missing{window}'] = arrays[f'missing{window}'] + ~observed
+        window = BOLLINGER_PARAMS[0]
+        if seen >= window:
+            leaving = self._past(window)
+            arrays['squares'] = arrays['squares'] - np.where(np.isnan(leaving), 0.0, leaving * leaving)
+        arrays['squares'] = arrays['squares'] + value * value
+        arrays['run'] = np.where(observed, np.where(close == previous, arrays['run'] + 1, 1.0), 0.0)
+
+        for window in EMA_WINDOWS:
+            self._ewm[f'ema{window}'].append(close)
+        fast, slow, _ = MACD_PARAMS
+        self._ewm['signal'].append(self._ewm[f'ema{fast}'].value() - self._ewm[f'ema{slow}'].value())
+        diff = close - previous
+        with np.errstate(invalid='ignore'):
+            self._ewm['up'].append(np.where(diff > 0, diff, 0.0))
+            self._ewm['down'].append(np.where(diff < 0, -diff, 0.0))
+
+        arrays['history'][int(arrays['position'])] = close
+        arrays['position'] = np.array((int(arrays['position']) + 1) % HISTORY)
+        arrays['seen'] = np.array(seen + 1)
+        self.dates = pd.DatetimeIndex([date])
+        self._refresh()
+
+    def _refresh(self):
+        for name, state in self._ewm.items():
+            self._arrays.update(state.arrays(name))
+
+    def extended(self, dates, tickers, close):
+        # Ajoute les lignes postérieures à la dernière date connue ; None si les actions ont changé
+        if list(tickers) != self.tickers:
+            return None
+        for i in np.flatnonzero(dates > self.dates[-1]) if len(self.dates) else range(len(dates)):
+            self.append(dates[i], close[i])
+        return self
+
+    def copy(self):
+        return IndicatorState.from_arrays({name: np.array(values) for name, values in self.arrays().items()})
+
+    def arrays(self):
+        # Tableaux à enregistrer (voir from_arrays)
+        return dict(self._arrays, tickers=np.array(self.tickers, dtype=str), date=np.array(self.dates[-1].to_datetime64() if len(self.dates) else np.datetime64('NaT', 'ns')))
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        arrays = dict(arrays)
+        tickers, date = arrays.pop('tickers'), pd.Timestamp(arrays.pop('date')[()])
+        arrays['history'] = np.array(arrays['history'])
+        return cls(tickers.tolist(), date, arrays)
+
+    # Accesseurs au format de MarketIndicators, pour la dernière date seulement
+    def close(self):
+        return self._past(1)[None, :]
+
+    def sma(self, window):
+        if window not in SMA_WINDOWS:
+            raise KeyError(f"Moyenne mobile {window} non suivie")
+        mean = self._arrays[f'sum{window}'] / window
+        mean[(self._arrays[f'missing{window}'] > 0) | (self._arrays['seen'] < window)] = np.nan
+        # Fenêtre sans variation : le cours exact, comme pandas
+        flat = self._arrays['run'] >= window
+        mean[flat] = self._past(1)[flat]
+        return mean[None, :]
+
+    def ema(self, window):
+        if window not in EMA_WINDOWS:
+            raise KeyError(f"EMA {window} non suivie")
+        return self._ewm[f'ema{window}'].value()[None, :]
+
+    def rsi(self, window=RSI_WINDOW):
+        if window != RSI_WINDOW:
+            raise KeyError(f"RSI {window} non suivi")
+        up, down = self._ewm['up'].value(), self._ewm['down'].value()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))[None, :]
+
+    def roc(self, window=ROC_WINDOW):
+        if window != ROC_WINDOW:
+            raise KeyError(f"ROC {window} non suivi")
+        previous = self._past(window + 1) if self._arrays['seen'] > window else np.full(len(self.tickers), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return ((self._past(1) - previous) / previous * 100)[None, :]
+
+    def macd(self, fast=12, slow=26, sign=9):
+        if (fast, slow, sign) != MACD_PARAMS:
+            raise KeyError(f"MACD {(fast, slow, sign)} non suivi")
+        line = self._ewm[f'ema{fast}'].value() - self._ewm[f'ema{slow}'].value()
+        signal = self._ewm['signal'].value()
+        return {'macd': line[None, :], 'signal': signal[None, :], 'diff': (line - signal)[None, :]}
+
+    def bollinger(self, window=20, window_dev=2):
+        if (window, window_dev) != BOLLINGER_PARAMS:
+            raise KeyError(f"Bandes de Bollinger {(window, window_dev)} non suivies")
+        price = self._past(1)
+        mavg = self.sma(window)[0]
+        variance = self._arrays['squares'] / window - mavg * mavg
+        deviation = window_dev * np.sqrt(np.maximum(variance, 0.0))
+        deviation[self._arrays['run'] >= window] = 0.0
+        hband, lband = mavg + deviation, mavg - deviation
+        with np.errstate(invalid='ignore'):
+            return {'hband': hband[None, :], 'lband': lband[None, :], 'mavg': mavg[None, :],
+                    'hband_indicator': (price > hband).astype(float)[None, :],
+                    'lband_indicator': (price < lband).astype(float)[None, :]}
@@ -0,0 +1,168 @@
+# Moteur d'indicateurs techniques partagé par toutes les pages : chaque série
+# (classeur, action, source, indicateur, paramètres) n'est calculée qu'une fois.
+# MarketIndicators calcule les mêmes indicateurs pour tout le marché d'un coup.
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from ta.momentum import ROCIndicator, RSIIndicator
+from ta.trend import MACD, EMAIndicator, SMAIndicator
+from ta.volatility import BollingerBands
+
+from brvm import kernels
+
+MAX_ENTRIES = int(os.environ.get('BRVM_INDICATOR_CACHE_ENTRIES', '4096'))
+START = '2021-01-01'
+
+
+class IndicatorCache:
+    # Mémoïsation bornée (LRU), commune aux sessions ; la clé contient l'empreinte du classeur
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, key):
+        # Valeur en cache ou None, sans calcul
+        with self._lock:
+            return self._entries.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = IndicatorCache()
+
+
+def indicator_cache():
+    return _cache
+
+
+class TickerIndicators:
+    """Indicateurs d'une action, lus dans le cache partagé ou calculés avec ta.
+
+    Deux séries de clôture servent de base, comme sur les pages :
+    - 'cours' : colonne de la feuille COURS depuis START (ordre de la feuille inversé) ;
+    - 'ohlc' : clôtures du cube de prix depuis START dont l'OHLC est cohérent.
+    Les séries renvoyées sont partagées : ne pas les modifier.
+    """
+
+    def __init__(self, workbook, action, cache=None):
+        self.workbook = workbook
+        self.action = action
+        self._cache = cache if cache is not None else _cache
+
+    def _get(self, name, params, compute):
+        return self._cache.get((self.workbook.key, self.action, name, params), compute)
+
+    def frame(self, source='cours'):
+        # Données dont la série est extraite : 'Date' + valeurs (lignes et index identiques aux pages)
+        def compute():
+            if source == 'ohlc':
+                return self.workbook.price_cube().frame(self.action, start=START, valid_only=True)
+            data = self.workbook.cours()[::-1]
+            data = data[data['Date'] >= pd.Timestamp(START)]
+            return data.dropna(subset=['Date'])[['Date', self.action]]
+        return self._get('frame', (source,), compute)
+
+    def close(self, source='cours'):
+        return self._get('close', (source,), lambda: self.frame(source)['Close' if source == 'ohlc' else self.action])
+
+    def sma(self, window, source='cours'):
+        return self._get('sma', (window, source), lambda: SMAIndicator(self.close(source), window=window).sma_indicator())
+
+    def ema(self, window, source='cours'):
+        return self._get('ema', (window, source), lambda: EMAIndicator(close=self.close(source), window=window).ema_indicator())
+
+    def rsi(self, window=14, source='cours'):
+        return self._get('rsi', (window, source), lambda: RSIIndicator(self.close(source), window=window).rsi())
+
+    def roc(self, window=12, source='cours'):
+        return self._get('roc', (window, source), lambda: ROCIndicator(close=self.close(source), window=window).roc())
+
+    def macd(self, fast=12, slow=26, sign=9, source='cours'):
+        # DataFrame macd / signal / diff
+        def compute():
+            indicator = MACD(close=self.close(source), window_slow=slow, window_fast=fast, window_sign=sign)
+            return pd.DataFrame({'macd': indicator.macd(), 'signal': indicator.macd_signal(), 'diff': indicator.macd_diff()})
+        return self._get('macd', (fast, slow, sign, source), compute)
+
+    def bollinger(self, window=20, window_dev=2, source='cours'):
+        # DataFrame hband / lband / mavg et indicateurs de franchissement hband_indicator / lband_indicator
+        def compute():
+            indicator = BollingerBands(close=self.close(source), window=window, window_dev=window_dev)
+            return pd.DataFrame({'hband': indicator.bollinger_hband(), 'lband': indicator.bollinger_lband(),
+                                 'mavg': indicator.bollinger_mavg(),
+                                 'hband_indicator': indicator.bollinger_hband_indicator(),
+                                 'lband_indicator': indicator.bollinger_lband_indicator()})
+        return self._get('bollinger', (window, window_dev, source), compute)
+
+
+class MarketIndicators:
+    """Mêmes indicateurs pour toutes les actions du classeur en un seul calcul (brvm.kernels).
+
+    Les clôtures sont celles du cube de prix depuis START : matrice dates × actions,
+    dates croissantes (self.dates) et colonnes dans l'ordre de self.tickers.
+    Chaque méthode renvoie une matrice de même forme (ou un dict de matrices pour
+    macd et bollinger, avec les noms de TickerIndicators), partagée : ne pas la modifier.
+    """
+
+    def __init__(self, workbook, start=START, cache=None):
+        self.workbook = workbook
+        self.start = start
+        self._cache = cache if cache is not None else _cache
+        cube = workbook.price_cube()
+        self.dates = cube.dates[cube.dates.searchsorted(pd.Timestamp(start)):]
+        self.tickers = cube.tickers
+
+    def _get(self, name, params, compute):
+        def frozen():
+            value = compute()
+            for array in value.values() if isinstance(value, dict) else [value]:
+                array.flags.writeable = False
+            return value
+        return self._cache.get((self.workbook.key, None, name, params + (self.start,)), frozen)
+
+    def close(self):
+        return self._get('close', (), lambda: np.array(self.workbook.price_cube().field('Close', self.start)))
+
+    def sma(self, window):
+        return self._get('sma', (window,), lambda: kernels.sma(self.close(), window))
+
+    def ema(self, window):
+        return self._get('ema', (window,), lambda: kernels.ema(self.close(), window))
+
+    def rsi(self, window=14):
+        return self._get('rsi', (window,), lambda: kernels.rsi(self.close(), window))
+
+    def roc(self, window=12):
+        return self._get('roc', (window,), lambda: kernels.roc(self.close(), window))
+
+    def macd(self, fast=12, slow=26, sign=9):
+        return self._get('macd', (fast, slow, sign), lambda: dict(
+            zip(['macd', 'signal', 'diff'], kernels.macd(self.close(), fast, slow, sign))))
+
+    def bollinger(self, window=20, window_dev=2):
+        return self._get('bollinger', (window, window_dev), lambda: dict(
+            zip(['hband', 'lband', 'mavg', 'hband_indicator', 'lband_indicator'],
+                kernels.bollinger(self.close(), window, window_dev))))
+
+    def frame(self, values):
+        # Matrice -> DataFrame indexé par date, une colonne par action
+        return pd.DataFrame(values, index=self.dates, columns=self.tickers)
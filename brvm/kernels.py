@@ -0,0 +1,159 @@
+# Indicateurs techniques calculés pour toutes les actions à la fois sur une matrice
+# dates × actions (axe 0 = temps). Résultats identiques à ceux de ta, colonne par colonne :
+# moyennes glissantes par sommes cumulées, EMA et lissage de Wilder en une seule passe récursive.
+import numpy as np
+import pandas as pd
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=float)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _shifted_difference(cumulative, window):
+    # cumulative[t] - cumulative[t - window], NaN pour les window - 1 premières lignes
+    result = np.empty(cumulative.shape)
+    result[:window - 1] = np.nan
+    if len(cumulative) >= window:
+        result[window - 1] = cumulative[window - 1]
+        np.subtract(cumulative[window:], cumulative[:-window], out=result[window:])
+    return result
+
+
+def rolling_sum(values, window):
+    # Somme glissante ; NaN dès qu'une valeur de la fenêtre manque (min_periods=window de pandas)
+    values = _as_2d(values)
+    missing = np.isnan(values)
+    if not missing.any():
+        return _shifted_difference(np.cumsum(values, axis=0), window)
+    sums = _shifted_difference(np.cumsum(np.where(missing, 0.0, values), axis=0), window)
+    gaps = _shifted_difference(np.cumsum(missing, axis=0, dtype=float), window)
+    sums[gaps != 0] = np.nan
+    return sums
+
+
+def sma(values, window):
+    values = _as_2d(values)
+    mean = rolling_sum(values, window) / window
+    # Sur une fenêtre sans variation (fréquent pour les titres peu liquides), pandas renvoie
+    # exactement le cours ; les sommes cumulées laissent un résidu qui fausserait les comparaisons
+    flat = _flat(values, window)
+    mean[flat] = values[flat]
+    return mean
+
+
+def rolling_std(values, window, mean=None):
+    # Écart-type glissant de population (ddof=0), comme BollingerBands de ta
+    values = _as_2d(values)
+    if mean is None:
+        mean = sma(values, window)
+    variance = rolling_sum(values * values, window) / window - mean * mean
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def _flat(values, window):
+    # Fenêtres où le cours n'a pas bougé
+    changed = np.ones(values.shape)
+    np.not_equal(values[1:], values[:-1], out=changed[1:])
+    return rolling_sum(changed, window - 1) == 0 if window > 1 else ~np.isnan(values)
+
+
+def _recursive_filter(values, alpha, block=32):
+    # y[t] = (1 - alpha) * y[t - 1] + alpha * x[t] avec y[-1] = x[0], par blocs de dates :
+    # un produit matriciel par bloc, seule la retenue d'un bloc au suivant reste séquentielle
+    length, width = values.shape
+    decay = 1.0 - alpha
+    blocks = -(-length // block)
+    padded = np.zeros((blocks * block, width))
+    padded[:length] = values
+    steps = np.arange(block)
+    lags = np.subtract.outer(steps, steps)
+    kernel = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    result = kernel @ padded.reshape(blocks, block, width)
+    carry = (decay ** (steps + 1))[:, None]
+    previous = values[:1]  # Ligne initiale, vide sans aucune date
+    for chunk in result:
+        chunk += carry * previous
+        previous = chunk[-1]
+    return result.reshape(-1, width)[:length]
+
+
+def ewm(values, alpha, min_periods):
+    # Moyenne exponentielle adjust=False, ignore_na=False de pandas. Les colonnes sans trou
+    # entre leur première et leur dernière cotation passent par le filtre récursif ; les autres,
+    # dont le poids dépend de la longueur de chaque trou, restent confiées à pandas.
+    values = _as_2d(values)
+    min_periods = max(min_periods, 1)
+    observed = ~np.isnan(values)
+    if observed.all():
+        result = _recursive_filter(values, alpha)
+        result[:min_periods - 1] = np.nan
+        return result
+
+    counts = observed.sum(axis=0)
+    first = observed.argmax(axis=0)
+    last = len(values) - 1 - observed[::-1].argmax(axis=0)
+    gapped = (counts > 0) & (counts != last - first + 1)
+    ragged = np.flatnonzero(~gapped & ((first > 0) | (last < len(values) - 1) | (counts == 0)))
+
+    filled = values.copy()
+    filled[:, gapped] = 0.0
+    for column in ragged:
+        start, stop = first[column], last[column] + 1
+        filled[:start, column] = values[start, column] if counts[column] else 0.0
+        filled[stop:, column] = values[stop - 1, column] if counts[column] else 0.0
+    result = _recursive_filter(filled, alpha)
+    result[:min_periods - 1] = np.nan
+    for column in ragged:
+        start, stop = first[column], last[column] + 1
+        result[:start + min_periods - 1, column] = np.nan
+        result[stop:, column] = result[stop - 1, column] if counts[column] >= min_periods else np.nan
+    if gapped.any():
+        result[:, gapped] = pd.DataFrame(values[:, gapped]).ewm(
+            alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+    return result
+
+
+def ema(values, window):
+    return ewm(values, 2.0 / (window + 1), window)
+
+
+def rsi(values, window=14):
+    values = _as_2d(values)
+    diff = np.empty(values.shape)
+    diff[:1] = np.nan
+    np.subtract(values[1:], values[:-1], out=diff[1:])
+    with np.errstate(invalid='ignore'):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+    # Hausses et baisses lissées ensemble (lissage de Wilder, alpha = 1 / window)
+    smoothed = ewm(np.hstack([up, down]), 1.0 / window, window)
+    up, down = smoothed[:, :values.shape[1]], smoothed[:, values.shape[1]:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+
+
+def macd(values, fast=12, slow=26, sign=9):
+    # (macd, signal, diff)
+    line = ema(values, fast) - ema(values, slow)
+    signal = ema(line, sign)
+    return line, signal, line - signal
+
+
+def bollinger(values, window=20, window_dev=2):
+    # (hband, lband, mavg, hband_indicator, lband_indicator)
+    values = _as_2d(values)
+    mavg = sma(values, window)
+    deviation = window_dev * rolling_std(values, window, mavg)
+    deviation[_flat(values, window)] = 0.0  # Écart-type exactement nul, comme pandas
+    hband, lband = mavg + deviation, mavg - deviation
+    with np.errstate(invalid='ignore'):
+        return hband, lband, mavg, (values > hband).astype(float), (values < lband).astype(float)
+
+
+def roc(values, window=12):
+    values = _as_2d(values)
+    previous = np.full(values.shape, np.nan)
+    previous[window:] = values[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - previous) / previous * 100
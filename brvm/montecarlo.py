@@ -0,0 +1,132 @@
+# Projections Monte Carlo d'un portefeuille : trajectoires de rendements corrélés tirées par
+# blocs (chemins × jours × actions) d'après la covariance des cours ou par rééchantillonnage
+# des séances historiques, dans un budget mémoire fixe
+import os
+
+import numpy as np
+import pandas as pd
+
+from brvm.backtest import PERIODS_PER_YEAR, forward_fill
+from brvm.indicators import indicator_cache
+
+MEMORY_BUDGET = int(os.environ.get('BRVM_MONTECARLO_MB', '256')) * 2 ** 20
+LOOKBACK = 2 * PERIODS_PER_YEAR
+PERCENTILES = (5, 25, 50, 75, 95)
+POINTS = 50
+COVARIANCE, BOOTSTRAP = 'Covariance', 'Bootstrap historique'
+METHODS = [COVARIANCE, BOOTSTRAP]
+
+
+def log_returns(close, lookback=LOOKBACK):
+    # Rendements logarithmiques des lookback dernières séances où toutes les actions sont cotées
+    # (cours prolongés sur les séances sans échange : rendement nul)
+    filled = forward_fill(close)[-(lookback + 1):]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(filled), axis=0)
+    return returns[~np.isnan(returns).any(axis=1)]
+
+
+def chunk_size(days, assets, budget=MEMORY_BUDGET):
+    # Chemins par bloc tenant dans budget ; par chemin et par jour : deux tenseurs float32 par
+    # action (tirages et leur produit par la racine de covariance), la valeur et son plus haut
+    # en float32, les indices int64 des séances tirées (bootstrap)
+    return max(1, budget // (days * (2 * assets * 4 + 2 * 4 + 8)))
+
+
+class Projection:
+    """Distribution simulée de la valeur d'un portefeuille sur days séances.
+
+    bands : percentiles de la valeur (PERCENTILES) à POINTS échéances régulières ;
+    final : valeurs simulées à l'horizon ; drawdowns : drawdown maximal de chaque trajectoire.
+    """
+
+    def __init__(self, initial, steps, bands, final, drawdowns):
+        self.initial = initial
+        self.bands = pd.DataFrame(bands, index=pd.Index(steps, name='Séance'), columns=[f'P{q}' for q in PERCENTILES])
+        self.final = final
+        self.drawdowns = drawdowns
+
+    def probability_of_loss(self):
+        return float((self.final < self.initial).mean())
+
+    def expected_drawdown(self):
+        return float(self.drawdowns.mean())
+
+    def summary(self):
+        final = np.percentile(self.final, PERCENTILES)
+        return pd.Series({
+            'Valeur initiale': self.initial,
+            **{f'Valeur finale P{q}': value for q, value in zip(PERCENTILES, final)},
+            'Rendement médian %': (final[PERCENTILES.index(50)] / self.initial - 1) * 100,
+            'Probabilité de perte %': self.probability_of_loss() * 100,
+            'Drawdown moyen %': self.expected_drawdown() * 100,
+        })
+
+
+def simulate(returns, values, days=PERIODS_PER_YEAR, paths=10000, method=COVARIANCE, seed=0, budget=MEMORY_BUDGET):
+    """Projette un portefeuille (values : montant par action) conservé sans rééquilibrage.
+
+    returns : rendements logarithmiques historiques (séances, actions). COVARIANCE tire des
+    rendements gaussiens de même moyenne et covariance, BOOTSTRAP tire des séances entières
+    (la corrélation du jour est conservée). Les trajectoires sont tirées par blocs de
+    chunk_size() chemins, en float32 ; seules les valeurs aux échéances et les drawdowns sont
+    gardés.
+    """
+    returns = np.asarray(returns, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if not values.size:
+        raise ValueError("Aucune ligne détenue à projeter")
+    if len(returns) < 2:
+        raise ValueError("Historique de cours insuffisant pour la simulation")
+    rng = np.random.default_rng(seed)
+    mean = returns.mean(axis=0).astype(np.float32)
+    history = returns.astype(np.float32)
+    weights = values.astype(np.float32)
+    if method == COVARIANCE:
+        # Racine de la covariance par décomposition spectrale (matrice éventuellement singulière)
+        eigenvalues, eigenvectors = np.linalg.eigh(np.atleast_2d(np.cov(returns, rowvar=False)))
+        root = (eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))).T.astype(np.float32)
+    elif method != BOOTSTRAP:
+        raise ValueError(f"Méthode inconnue : {method}")
+    steps = np.unique(np.linspace(0, days - 1, min(POINTS, days)).round().astype(int))
+    sampled = np.empty((paths, len(steps)))
+    drawdowns = np.empty(paths)
+    size = chunk_size(days, len(values), budget)
+    for first in range(0, paths, size):
+        count = min(size, paths - first)
+        if method == COVARIANCE:
+            draws = rng.standard_normal((count, days, len(values)), dtype=np.float32) @ root
+            draws += mean
+        else:
+            draws = history[rng.integers(0, len(returns), (count, days))]
+        np.cumsum(draws, axis=1, out=draws)
+        np.exp(draws, out=draws)
+        path = draws @ weights
+        del draws
+        sampled[first:first + count] = path[:, steps]
+        # Drawdown maximal en place : 1 - min(valeur / plus haut), le plus haut partant de la valeur initiale
+        peak = np.maximum.accumulate(path, axis=1)
+        np.maximum(peak, np.float32(values.sum()), out=peak)
+        np.divide(path, peak, out=peak)
+        drawdowns[first:first + count] = 1 - peak.min(axis=1)
+    bands = np.percentile(sampled, PERCENTILES, axis=0).T
+    return Projection(float(values.sum()), steps + 1, bands, sampled[:, -1], drawdowns)
+
+
+def project(workbook, values, days=PERIODS_PER_YEAR, paths=10000, method=COVARIANCE, seed=0, cache=None):
+    # Projection d'un portefeuille {action: montant} sur les cours du classeur, mise en cache par
+    # version du classeur et par paramètres
+    cache = cache if cache is not None else indicator_cache()
+    tickers = tuple(values)
+    amounts = tuple(float(values[ticker]) for ticker in tickers)
+
+    def history():
+        cube = workbook.price_cube()
+        returns = log_returns(cube.field('Close')[:, [cube.columns[ticker] for ticker in tickers]])
+        returns.flags.writeable = False
+        return returns
+
+    def compute():
+        returns = cache.get((workbook.key, None, 'log_returns', (tickers, LOOKBACK)), history)
+        return simulate(returns, amounts, days, paths, method, seed)
+    return cache.get((workbook.key, None, 'montecarlo', (tickers, amounts, days, paths, method, seed)), compute)
@@ -0,0 +1,317 @@
+# Recherche des paramètres d'indicateurs (grille ou tirage aléatoire) par backtest, répartie
+# sur plusieurs processus ; les calculs communs (sommes cumulées, lissages) ne sont faits qu'une fois
+import itertools
+import os
+import random
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from brvm import kernels
+from brvm.backtest import FEE_RATE, PERIODS_PER_YEAR, positions_from_states, run
+from brvm.indicators import MarketIndicators, indicator_cache
+from brvm.signals import BUY, NEUTRAL, SELL
+
+# Familles de règles et valeurs essayées pour chaque paramètre
+SPACES = {
+    'Moyenne mobile': {'window': [5, 7, 10, 14, 21, 30, 50, 75, 100, 150, 200]},
+    'Croisement de moyennes': {'fast': [5, 7, 10, 14, 21, 30], 'slow': [21, 50, 75, 100, 150, 200]},
+    'RSI': {'window': [7, 9, 14, 21, 28], 'lower': [20, 25, 30, 35, 40], 'upper': [60, 65, 70, 75, 80]},
+    'MACD': {'fast': [8, 10, 12, 15], 'slow': [21, 26, 30, 40], 'sign': [5, 7, 9, 12]},
+    'Bandes de Bollinger': {'window': [10, 15, 20, 30, 40], 'window_dev': [1.5, 2.0, 2.5, 3.0]},
+    'EMA': {'window': [5, 7, 10, 14, 21, 30, 50, 75, 100, 150, 200]},
+    'ROC': {'window': [3, 5, 8, 12, 16, 21, 30, 50]},
+}
+# Paramètres du tableau de bord, pour comparaison
+DEFAULTS = {
+    'Moyenne mobile': {'window': 21},
+    'Croisement de moyennes': {'fast': 7, 'slow': 21},
+    'RSI': {'window': 14, 'lower': 30, 'upper': 70},
+    'MACD': {'fast': 12, 'slow': 26, 'sign': 9},
+    'Bandes de Bollinger': {'window': 20, 'window_dev': 2.0},
+    'EMA': {'window': 14},
+    'ROC': {'window': 12},
+}
+MAX_WORKERS = int(os.environ.get('BRVM_OPTIMIZER_WORKERS', '0')) or None
+# En dessous, le coût de lancement des processus dépasse le gain
+MIN_PARALLEL = 16
+
+
+def _valid(family, params):
+    if family in ('Croisement de moyennes', 'MACD'):
+        return params['fast'] < params['slow']
+    return True
+
+
+def grid(family):
+    # Toutes les combinaisons de SPACES[family]
+    names = list(SPACES[family])
+    combos = (dict(zip(names, values)) for values in itertools.product(*SPACES[family].values()))
+    return [params for params in combos if _valid(family, params)]
+
+
+def sample(family, count, seed=0):
+    # count combinaisons distinctes tirées au hasard dans la grille
+    candidates = grid(family)
+    return random.Random(seed).sample(candidates, min(count, len(candidates)))
+
+
+class SharedBlocks:
+    """Calculs réutilisés par tous les jeux de paramètres d'une recherche.
+
+    Les sommes cumulées des cours, de leurs carrés et des cours manquants sont calculées une
+    fois : chaque moyenne ou écart-type glissant n'est plus qu'une différence. Les séries
+    lissées (EMA, RSI) sont mémorisées par fenêtre.
+    """
+
+    def __init__(self, close):
+        self.close = np.asarray(close, dtype=float)
+        missing = np.isnan(self.close)
+        values = np.where(missing, 0.0, self.close)
+        self._sums = np.cumsum(values, axis=0)
+        self._squares = np.cumsum(values * values, axis=0)
+        self._gaps = np.cumsum(missing, axis=0, dtype=float)
+        # Nombre de séances consécutives au même cours (fenêtres sans variation : moyenne exacte)
+        changed = np.ones(self.close.shape, dtype=bool)
+        np.not_equal(self.close[1:], self.close[:-1], out=changed[1:])
+        rows = np.arange(len(self.close))[:, None]
+        self._run = rows - np.maximum.accumulate(np.where(changed, rows, 0), axis=0) + 1
+        self._memo = {}
+
+    def _memoized(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _window(self, cumulative, window):
+        result = kernels._shifted_difference(cumulative, window)
+        result[kernels._shifted_difference(self._gaps, window) != 0] = np.nan
+        return result
+
+    def sma(self, window):
+        def compute():
+            mean = self._window(self._sums, window) / window
+            flat = self._run >= window
+            mean[flat] = self.close[flat]
+            return mean
+        return self._memoized(('sma', window), compute)
+
+    def std(self, window):
+        def compute():
+            mean = self.sma(window)
+            variance = self._window(self._squares, window) / window - mean * mean
+            deviation = np.sqrt(np.maximum(variance, 0.0))
+            deviation[self._run >= window] = 0.0
+            return deviation
+        return self._memoized(('std', window), compute)
+
+    def ema(self, window):
+        return self._memoized(('ema', window), lambda: kernels.ema(self.close, window))
+
+    def rsi(self, window):
+        return self._memoized(('rsi', window), lambda: kernels.rsi(self.close, window))
+
+    def roc(self, window):
+        return self._memoized(('roc', window), lambda: kernels.roc(self.close, window))
+
+
+def _state(buy, sell):
+    return np.where(buy, BUY, np.where(sell, SELL, NEUTRAL)).astype(np.int8)
+
+
+def rule_states(blocks, family, params):
+    # États Acheter / Neutre / Vendre (dates, actions) d'une règle paramétrée
+    price = blocks.close
+    with np.errstate(invalid='ignore'):
+        if family == 'Moyenne mobile':
+            sma = blocks.sma(params['window'])
+            return _state(sma < price, sma > price)
+        if family == 'Croisement de moyennes':
+            fast, slow = blocks.sma(params['fast']), blocks.sma(params['slow'])
+            return _state(fast > slow, fast < slow)
+        if family == 'RSI':
+            rsi = blocks.rsi(params['window'])
+            return _state(rsi < params['lower'], rsi > params['upper'])
+        if family == 'MACD':
+            line = blocks.ema(params['fast']) - blocks.ema(params['slow'])
+            diff = line - kernels.ema(line, params['sign'])
+            return _state(diff > 0, diff < 0)
+        if family == 'Bandes de Bollinger':
+            mean, deviation = blocks.sma(params['window']), params['window_dev'] * blocks.std(params['window'])
+            return _state(price < mean - deviation, price > mean + deviation)
+        if family == 'EMA':
+            ema = blocks.ema(params['window'])
+            return _state(price > ema, price < ema)
+        if family == 'ROC':
+            roc = blocks.roc(params['window'])
+            return _state(roc > 0, roc < 0)
+    raise KeyError(family)
+
+
+def evaluate(blocks, family, params, fee=FEE_RATE):
+    # Performance d'un jeu de paramètres, moyenne sur les actions étudiées
+    result = run(blocks.close, positions_from_states(rule_states(blocks, family, params)), fee)
+    sharpe = result.sharpe()
+    return {
+        'Sharpe': np.nanmean(sharpe) if np.isfinite(sharpe).any() else np.nan,
+        'Rendement %': np.mean(result.equity[-1] - 1) * 100,
+        'Drawdown max %': np.mean(result.drawdown.min(axis=0)) * 100,
+        'Transactions': int((result.turnover > 0).sum()),
+    }
+
+
+# Données du processus de calcul, transmises une seule fois par processus
+_worker_blocks = None
+
+
+def _init_worker(close):
+    global _worker_blocks
+    _worker_blocks = SharedBlocks(close)
+
+
+def _evaluate_chunk(score, family, chunk, fee, args):
+    return [score(_worker_blocks, family, params, fee, *args) for params in chunk]
+
+
+def _chunks(items, count):
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def evaluate_all(close, family, candidates, fee=FEE_RATE, max_workers=MAX_WORKERS, score=evaluate, args=()):
+    # score(blocks, family, params, fee, *args) pour chaque jeu de candidates, dans l'ordre ;
+    # processus parallèles au-delà de MIN_PARALLEL
+    if len(candidates) < MIN_PARALLEL or (max_workers or os.cpu_count() or 1) < 2:
+        blocks = SharedBlocks(close)
+        return [score(blocks, family, params, fee, *args) for params in candidates]
+    workers = max_workers or os.cpu_count()
+    # Chaque processus reçoit ses paquets de paramètres et garde ses blocs d'un paquet à l'autre
+    chunks = _chunks(candidates, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(np.asarray(close),)) as pool:
+        results = pool.map(_evaluate_chunk, *zip(*[(score, family, chunk, fee, args) for chunk in chunks]))
+        return [metrics for chunk in results for metrics in chunk]
+
+
+def ranking(family, candidates, performances):
+    # Tableau trié par Sharpe décroissant ; la ligne des paramètres du tableau de bord est signalée
+    table = pd.DataFrame([dict(params, **metrics) for params, metrics in zip(candidates, performances)])
+    table.insert(len(SPACES[family]), 'Tableau de bord', [params == DEFAULTS[family] for params in candidates])
+    return table.sort_values(['Sharpe', 'Rendement %'], ascending=False, kind='stable', na_position='last').reset_index(drop=True)
+
+
+def sweep(workbook, family, tickers=None, count=None, seed=0, fee=FEE_RATE, cache=None):
+    """Classement des paramètres de family, mis en cache par version du classeur.
+
+    tickers : actions étudiées (toutes par défaut) ; count : nombre de combinaisons tirées
+    au hasard (None : grille complète).
+    """
+    cache = cache if cache is not None else indicator_cache()
+    tickers = tuple(tickers) if tickers is not None else None
+
+    def compute():
+        market = MarketIndicators(workbook, cache=cache)
+        close = market.close()
+        if tickers is not None:
+            close = close[:, [market.tickers.index(ticker) for ticker in tickers]]
+        candidates = grid(family) if count is None else sample(family, count, seed)
+        if DEFAULTS[family] not in candidates:
+            candidates.append(DEFAULTS[family])
+        return ranking(family, candidates, evaluate_all(close, family, candidates, fee))
+    return cache.get((workbook.key, None, 'sweep', (family, tickers, count, seed, fee)), compute)
+
+
+def walk_forward_windows(length, in_sample, out_of_sample):
+    # (début in-sample, début out-of-sample, fin) ; chaque fenêtre avance de out_of_sample séances
+    return [(start, start + in_sample, min(start + in_sample + out_of_sample, length))
+            for start in range(0, length - in_sample, out_of_sample)]
+
+
+def window_sharpe(returns, bounds):
+    # Sharpe de chaque intervalle [début, fin) de bounds, par action : (intervalles, actions).
+    # Sommes cumulées des rendements et de leurs carrés : chaque fenêtre coûte une différence
+    zeros = np.zeros((1, returns.shape[1]))
+    sums = np.concatenate([zeros, np.cumsum(returns, axis=0)])
+    squares = np.concatenate([zeros, np.cumsum(returns * returns, axis=0)])
+    start, stop = np.array(bounds, dtype=int).T
+    length = (stop - start)[:, None]
+    mean = (sums[stop] - sums[start]) / length
+    variance = np.maximum((squares[stop] - squares[start]) / length - mean * mean, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(variance > 1e-18, mean / np.sqrt(variance) * np.sqrt(PERIODS_PER_YEAR), np.nan)
+
+
+def _window_scores(blocks, family, params, fee, bounds):
+    result = run(blocks.close, positions_from_states(rule_states(blocks, family, params)), fee)
+    return window_sharpe(result.returns, bounds)
+
+
+class WalkForwardResult:
+    """Validation walk-forward : paramètres choisis sur chaque fenêtre in-sample, jugés sur la suivante.
+
+    windows : une ligne par fenêtre (dates, paramètres retenus, Sharpe in-sample et out-of-sample,
+    rendement out-of-sample) ; dates / equity : capital (base 1) des périodes out-of-sample
+    enchaînées, par action (colonnes tickers).
+    """
+
+    def __init__(self, windows, dates, tickers, returns):
+        self.windows = windows
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.returns = returns
+        self.equity = np.cumprod(1 + returns, axis=0)
+
+
+def walk_forward(workbook, family, tickers=None, in_sample=504, out_of_sample=126, count=None, seed=0,
+                 fee=FEE_RATE, max_workers=MAX_WORKERS, cache=None):
+    """Walk-forward sur tout l'historique du cube de prix, mis en cache par version du classeur.
+
+    Les indicateurs n'utilisant que le passé, chaque jeu de paramètres est simulé une seule
+    fois sur tout l'historique ; le Sharpe de chaque fenêtre s'en déduit par différence de
+    sommes cumulées. Les jeux de paramètres sont répartis entre les processus, chacun
+    renvoyant ses scores pour toutes les fenêtres. Le choix in-sample maximise le Sharpe
+    moyen des actions étudiées.
+    """
+    cache = cache if cache is not None else indicator_cache()
+    tickers = tuple(tickers) if tickers is not None else None
+
+    def compute():
+        cube = workbook.price_cube()
+        columns = [cube.columns[ticker] for ticker in tickers] if tickers is not None else slice(None)
+        close = np.array(cube.field('Close')[:, columns])
+        bounds = walk_forward_windows(len(close), in_sample, out_of_sample)
+        if not bounds:
+            raise ValueError(f"Historique trop court : {len(close)} séances pour {in_sample} séances in-sample")
+        candidates = grid(family) if count is None else sample(family, count, seed)
+        in_bounds = [(start, middle) for start, middle, _ in bounds]
+        out_bounds = [(middle, stop) for _, middle, stop in bounds]
+        scores = np.stack(evaluate_all(close, family, candidates, fee, max_workers, _window_scores, (in_bounds + out_bounds,)))
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            pooled = np.nanmean(scores, axis=2)  # (candidats, fenêtres in + out)
+        pooled_in, pooled_out = pooled[:, :len(bounds)], pooled[:, len(bounds):]
+        chosen = [int(np.argmax(np.nan_to_num(pooled_in[:, k], nan=-np.inf))) for k in range(len(bounds))]
+
+        # Rendements out-of-sample des paramètres retenus, fenêtre après fenêtre
+        blocks = SharedBlocks(close)
+        simulated = {}
+        returns = np.zeros((len(close) - bounds[0][1], close.shape[1]))
+        rows = []
+        for k, ((start, middle, stop), best) in enumerate(zip(bounds, chosen)):
+            if best not in simulated:
+                simulated[best] = run(close, positions_from_states(rule_states(blocks, family, candidates[best])), fee)
+            window_returns = simulated[best].returns[middle:stop].copy()
+            if k:
+                # Changement de paramètres : ajustement des positions au début de la fenêtre
+                previous = simulated[chosen[k - 1]]
+                window_returns[0] -= np.abs(simulated[best].held[middle] - previous.held[middle]) * fee
+            returns[middle - bounds[0][1]:stop - bounds[0][1]] = window_returns
+            rows.append(dict(candidates[best], **{
+                'Début in-sample': cube.dates[start], 'Début out-of-sample': cube.dates[middle], 'Fin': cube.dates[stop - 1],
+                'Sharpe in-sample': pooled_in[best, k], 'Sharpe out-of-sample': pooled_out[best, k],
+                'Rendement out-of-sample %': np.mean(np.prod(1 + window_returns, axis=0) - 1) * 100,
+            }))
+        windows = pd.DataFrame(rows)
+        return WalkForwardResult(windows, cube.dates[bounds[0][1]:], tickers or cube.tickers, returns)
+    return cache.get((workbook.key, None, 'walk_forward', (family, tickers, in_sample, out_of_sample, count, seed, fee)), compute)
@@ -0,0 +1,208 @@
+# Cache disque des classeurs importés : une feuille = un fichier Parquet,
+# un dossier par classeur (nommé d'après son empreinte SHA-256)
+import datetime
+import json
+import numbers
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+CACHE_DIR = os.environ.get('BRVM_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'workbooks'))
+MAX_CACHE_BYTES = int(os.environ.get('BRVM_CACHE_MAX_MB', '512')) * 1024 * 1024
+MANIFEST = 'manifest.json'
+# Version du format : les classeurs écrits par une version antérieure sont relus depuis Excel
+FORMAT_VERSION = 2
+
+
+def _json_label(label):
+    return label if isinstance(label, (str, int, float)) or label is None else str(label)
+
+
+def _kind(value):
+    # Type d'une cellule d'une colonne 'object' (None : cellule vide)
+    if isinstance(value, str):
+        return 'str'
+    if pd.isna(value):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        return 'int'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    if isinstance(value, datetime.datetime):
+        return 'datetime'
+    if isinstance(value, datetime.time):
+        return 'time'
+    return 'other'
+
+
+# Type de stockage de chaque partie d'une colonne mixte (texte pour les types inattendus)
+PART_DTYPES = {'str': object, 'bool': 'boolean', 'int': 'Int64', 'float': 'float64', 'datetime': 'datetime64[ns]', 'time': object}
+
+
+def arrow_safe(data):
+    """Colonnes renommées '0', '1', ... (Parquet exige des noms textuels et des colonnes homogènes).
+
+    Une colonne 'object' mélangeant textes, nombres, dates, ... est répartie en une colonne
+    par type de cellule ('3.int', '3.str', ...) ; from_arrow_safe la reconstitue à l'identique.
+    """
+    columns = {}
+    for i in range(data.shape[1]):
+        values = data.iloc[:, i]
+        if values.dtype == object:
+            try:
+                pa.array(values, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                kinds = values.map(_kind)
+                for kind in kinds.dropna().unique():
+                    part = values.where(kinds == kind)
+                    columns[f'{i}.{kind}'] = part.astype(str).where(kinds == kind) if kind == 'other' else part.astype(PART_DTYPES[kind])
+                continue
+        columns[str(i)] = values
+    return pd.DataFrame(columns, index=data.index)
+
+
+def from_arrow_safe(data, labels):
+    # Inverse de arrow_safe : colonnes mixtes recomposées, noms d'origine
+    columns = {}
+    for name in data.columns:
+        i, _, kind = name.partition('.')
+        if not kind:
+            columns[int(i)] = data[name]
+            continue
+        part = data[name]
+        present = part.notna().to_numpy()
+        values = columns.setdefault(int(i), pd.Series(np.nan, index=data.index, dtype=object))
+        # Dates rendues en datetime.datetime, comme les lit pd.read_excel
+        values[present] = np.asarray(part[present].array.to_pydatetime() if kind == 'datetime' else part[present].astype(object), dtype=object)
+    data = pd.DataFrame({i: columns[i] for i in sorted(columns)}, index=data.index)
+    data.columns = labels
+    return data
+
+
+class ParquetCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _manifest(self, key):
+        path = os.path.join(self._path(key), MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != FORMAT_VERSION:
+            return None
+        os.utime(path)  # Dernier accès, pour l'éviction LRU
+        return manifest
+
+    def sheet_names(self, key):
+        manifest = self._manifest(key)
+        return None if manifest is None else [sheet['name'] for sheet in manifest['sheets']]
+
+    def fingerprints(self, key):
+        manifest = self._manifest(key)
+        return None if manifest is None else {sheet['name']: sheet.get('fingerprint') for sheet in manifest['sheets']}
+
+    def closest(self, fingerprints, exclude=None):
+        # Classeur en cache partageant le plus de feuilles identiques (version précédente du même fichier)
+        best, best_shared = None, 0
+        for key in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if key == exclude or key.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(self._path(key), MANIFEST), encoding='utf-8') as handle:
+                    manifest = json.load(handle)
+                sheets = manifest['sheets']
+            except (OSError, ValueError, KeyError):
+                continue
+            if manifest.get('version') != FORMAT_VERSION:
+                continue
+            shared = sum(1 for sheet in sheets if sheet.get('fingerprint') is not None and fingerprints.get(sheet['name']) == sheet['fingerprint'])
+            if shared > best_shared:
+                best, best_shared = key, shared
+        return best
+
+    def read(self, key, sheet_name):
+        manifest = self._manifest(key)
+        if manifest is None:
+            return None
+        for i, sheet in enumerate(manifest['sheets']):
+            if sheet['name'] == sheet_name:
+                return from_arrow_safe(pd.read_parquet(os.path.join(self._path(key), f'{i}.parquet')), sheet['columns'])
+        return None
+
+    def write(self, key, sheets, fingerprints=None):
+        # sheets : paires (nom, DataFrame), éventuellement produites une à une
+        fingerprints = fingerprints or {}
+        # Écriture dans un dossier temporaire puis renommage : un lecteur
+        # concurrent ne voit jamais un classeur à moitié écrit
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            manifest = {'version': FORMAT_VERSION, 'sheets': []}
+            for i, (sheet_name, data) in enumerate(sheets):
+                arrow_safe(data).to_parquet(os.path.join(staging, f'{i}.parquet'), index=False)
+                manifest['sheets'].append({'name': sheet_name, 'columns': [_json_label(c) for c in data.columns],
+                                           'fingerprint': fingerprints.get(sheet_name)})
+            with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as handle:
+                json.dump(manifest, handle)
+            if os.path.isdir(self._path(key)):
+                shutil.rmtree(self._path(key), ignore_errors=True)
+            os.replace(staging, self._path(key))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def read_arrays(self, key, name):
+        # Tableaux NumPy enregistrés à côté des feuilles (état des indicateurs, ...)
+        try:
+            with np.load(os.path.join(self._path(key), f'{name}.npz')) as data:
+                return dict(data)
+        except (OSError, ValueError):
+            return None
+
+    def write_arrays(self, key, name, arrays):
+        # Uniquement dans un classeur déjà en cache ; remplacement atomique du fichier
+        path = self._path(key)
+        if not os.path.isfile(os.path.join(path, MANIFEST)):
+            return False
+        handle, staging = tempfile.mkstemp(dir=path, prefix='.tmp-', suffix='.npz')
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                np.savez(output, **arrays)
+            os.replace(staging, os.path.join(path, f'{name}.npz'))
+        except OSError:
+            if os.path.exists(staging):
+                os.remove(staging)
+            return False
+        return True
+
+    def evict(self, keep=None):
+        # Supprime les classeurs les moins récemment utilisés au-delà de la taille maximale
+        entries = []
+        for key in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            path = self._path(key)
+            manifest = os.path.join(path, MANIFEST)
+            if key.startswith('.') or not os.path.isfile(manifest):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((os.path.getmtime(manifest), key, size))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
@@ -0,0 +1,179 @@
+# Portefeuille multi-lignes valorisé chaque séance sur la matrice des cours (COURS) du cube :
+# quantités, montants investis et valeurs tenus en matrices dates × actions, mis à jour par
+# tranches à chaque nouvelle transaction ou nouvelle séance
+import numpy as np
+import pandas as pd
+
+from brvm.backtest import forward_fill
+
+TRANSACTION_COLUMNS = ['Date', 'Action', 'Quantité', 'Prix', 'Frais']
+
+
+def transactions(frame):
+    """Lignes complètes d'un tableau de transactions -> tuples (date, action, quantité, prix, frais).
+
+    Quantité positive pour un achat, négative pour une vente ; Prix vide = cours de clôture
+    de la séance, Frais vide = 0. Les lignes sans date, action ou quantité sont ignorées.
+    """
+    frame = pd.DataFrame(frame).reindex(columns=TRANSACTION_COLUMNS)
+    dates = pd.to_datetime(frame['Date'], errors='coerce')
+    quantities = pd.to_numeric(frame['Quantité'], errors='coerce')
+    prices = pd.to_numeric(frame['Prix'], errors='coerce')
+    fees = pd.to_numeric(frame['Frais'], errors='coerce').fillna(0.0)
+    complete = dates.notna() & frame['Action'].notna() & quantities.fillna(0).ne(0)
+    return [(pd.Timestamp(dates[i]), str(frame['Action'][i]), float(quantities[i]),
+             None if pd.isna(prices[i]) else float(prices[i]), float(fees[i]))
+            for i in frame.index[complete]]
+
+
+class Portfolio:
+    """Valorisation quotidienne d'un portefeuille sur toutes les dates du cube.
+
+    Matrices (dates, actions) tenues à jour : prices (clôtures prolongées sur les séances sans
+    cours), quantities (titres détenus en fin de séance), invested (montant net investi :
+    achats + frais - ventes), bought (montant cumulé des achats) et value ; total est la
+    valeur du portefeuille par date. add() ne met à jour que la colonne de l'action à partir
+    de la date de la transaction, extend() n'ajoute que les nouvelles séances.
+    """
+
+    def __init__(self, dates, tickers, close):
+        close = np.asarray(close, dtype=float)
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.columns = {ticker: j for j, ticker in enumerate(self.tickers)}
+        self.close = close
+        self.prices = forward_fill(close)
+        self.quantities = np.zeros(close.shape)
+        self.invested = np.zeros(close.shape)
+        self.bought = np.zeros(close.shape)
+        self.value = np.zeros(close.shape)
+        self.total = np.zeros(len(close))
+        self.transactions = []
+
+    @classmethod
+    def from_cube(cls, cube):
+        return cls(cube.dates, cube.tickers, cube.field('Close'))
+
+    def add(self, date, ticker, quantity, price=None, fee=0.0):
+        # Transaction exécutée à la première séance >= date ; prix par défaut : la clôture
+        if ticker not in self.columns:
+            raise KeyError(f"L'action {ticker} n'est pas dans la feuille COURS")
+        t = self.dates.searchsorted(pd.Timestamp(date))
+        if t >= len(self.dates):
+            raise ValueError(f"Transaction du {pd.Timestamp(date):%d/%m/%Y} postérieure à la dernière séance")
+        j = self.columns[ticker]
+        executed = self.prices[t, j] if price is None else price
+        if np.isnan(executed):
+            raise ValueError(f"Aucun cours pour {ticker} au {self.dates[t]:%d/%m/%Y} : indiquez le prix")
+        cash = quantity * executed + fee
+        self.quantities[t:, j] += quantity
+        self.invested[t:, j] += cash
+        if quantity > 0:
+            self.bought[t:, j] += cash
+        value = self.quantities[t:, j] * np.nan_to_num(self.prices[t:, j])
+        self.total[t:] += value - self.value[t:, j]
+        self.value[t:, j] = value
+        self.transactions.append((pd.Timestamp(date), ticker, quantity, price, fee))
+        return self
+
+    def extend(self, dates, close):
+        # Nouvelles séances (postérieures à la dernière) : positions inchangées, cours prolongés
+        close = np.asarray(close, dtype=float)
+        if not len(dates):
+            return self
+        prices = forward_fill(np.concatenate([self.prices[-1:], close]))[1:]
+        rows = len(close)
+        quantities = np.repeat(self.quantities[-1:], rows, axis=0)
+        value = quantities * np.nan_to_num(prices)
+        self.dates = self.dates.append(dates)
+        self.close = np.concatenate([self.close, close])
+        self.prices = np.concatenate([self.prices, prices])
+        self.quantities = np.concatenate([self.quantities, quantities])
+        self.invested = np.concatenate([self.invested, np.repeat(self.invested[-1:], rows, axis=0)])
+        self.bought = np.concatenate([self.bought, np.repeat(self.bought[-1:], rows, axis=0)])
+        self.value = np.concatenate([self.value, value])
+        self.total = np.concatenate([self.total, value.sum(axis=1)])
+        return self
+
+    def synced(self, cube, rows):
+        """Portefeuille à jour pour ce cube et ces transactions (voir transactions()).
+
+        Réutilise ce portefeuille quand le cube ne fait qu'ajouter des séances et que les
+        transactions déjà passées sont toujours en tête de liste ; sinon tout est recalculé.
+        """
+        close = cube.field('Close')
+        known = len(self.dates)
+        same_history = (cube.tickers == self.tickers and len(cube.dates) >= known
+                        and cube.dates[known - 1] == self.dates[-1]
+                        and np.array_equal(close[:known], self.close, equal_nan=True))
+        if not same_history or rows[:len(self.transactions)] != self.transactions:
+            return Portfolio.from_cube(cube).add_all(rows)
+        self.extend(cube.dates[known:], close[known:])
+        return self.add_all(rows[len(self.transactions):])
+
+    def add_all(self, rows):
+        for row in rows:
+            self.add(*row)
+        return self
+
+    def held(self):
+        # Actions ayant fait l'objet d'au moins une transaction, dans l'ordre du classeur
+        return [ticker for ticker in self.tickers if any(row[1] == ticker for row in self.transactions)]
+
+    def pnl(self):
+        # Plus-value cumulée (latente + réalisée, nette de frais) par action et par date
+        return self.value - self.invested
+
+    def daily_pnl(self):
+        return np.diff(self.pnl(), axis=0, prepend=0.0)
+
+    def _base(self):
+        # Capital engagé pour la séance : valeur de la veille + apports nets du jour
+        previous = np.concatenate([[0.0], self.total[:-1]])
+        flows = np.diff(self.invested.sum(axis=1), prepend=0.0)
+        return previous + np.maximum(flows, 0.0)
+
+    def weights(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.total[:, None] != 0, self.value / self.total[:, None], 0.0)
+
+    def contribution(self):
+        # Part du rendement du jour apportée par chaque action (la somme donne returns())
+        base = self._base()[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(base > 0, self.daily_pnl() / base, 0.0)
+
+    def returns(self):
+        return self.contribution().sum(axis=1)
+
+    def start(self):
+        # Première séance détenue (0 sans transaction)
+        return self.dates.searchsorted(min(row[0] for row in self.transactions)) if self.transactions else 0
+
+    def history(self):
+        # Valeur, montant investi et plus-value du portefeuille depuis la première transaction
+        i = self.start()
+        return pd.DataFrame({
+            'Valeur': self.total[i:],
+            'Investi': self.invested[i:].sum(axis=1),
+            'P&L': self.pnl()[i:].sum(axis=1),
+            'Rendement %': (np.cumprod(1 + self.returns()[i:]) - 1) * 100,
+        }, index=pd.Index(self.dates[i:], name='Date'))
+
+    def summary(self):
+        # Une ligne par action détenue (ou soldée) à la dernière séance
+        columns = [self.columns[ticker] for ticker in self.held()]
+        pnl = self.pnl()[-1, columns]
+        bought = self.bought[-1, columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table = pd.DataFrame({
+                'Quantité': self.quantities[-1, columns],
+                'Cours': self.prices[-1, columns],
+                'Valeur': self.value[-1, columns],
+                'Poids %': self.weights()[-1, columns] * 100,
+                'Investi net': self.invested[-1, columns],
+                'P&L': pnl,
+                'P&L %': np.where(bought > 0, pnl / bought * 100, np.nan),
+                'Contribution %': self.contribution()[self.start():, columns].sum(axis=0) * 100,
+            }, index=pd.Index(self.held(), name='Action'))
+        return table.sort_values('Valeur', ascending=False, kind='stable')
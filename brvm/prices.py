@@ -0,0 +1,75 @@
+# Cube de prix aligné : dates × actions × champs (Open, High, Low, Close, Volume)
+import numpy as np
+import pandas as pd
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(FIELDS))
+
+
+def _aligned(data, dates, tickers):
+    # Feuille 'Date' + colonnes -> matrice float alignée sur les dates et actions du cube
+    data = data.dropna(subset=['Date']).drop_duplicates('Date', keep='last').set_index('Date')
+    return data.reindex(index=dates, columns=tickers).to_numpy(dtype=float)
+
+
+class PriceCube:
+    """Cours OHLCV de toutes les actions, construits une fois par classeur.
+
+    values[t, j, f] : date t (index trié), action j, champ f (voir FIELDS).
+    La sélection d'une action est une vue sur le tableau, sans jointure.
+    """
+
+    def __init__(self, dates, tickers, values):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.columns = {ticker: j for j, ticker in enumerate(self.tickers)}
+        self.values = values
+        self.values.flags.writeable = False
+        high, low = values[:, :, HIGH], values[:, :, LOW]
+        # Même contrôle de cohérence que les pages : Low <= Open, Close <= High
+        with np.errstate(invalid='ignore'):
+            self.valid = (high >= low) & (values[:, :, OPEN] >= low) & (values[:, :, OPEN] <= high) \
+                & (values[:, :, CLOSE] >= low) & (values[:, :, CLOSE] <= high)
+
+    @classmethod
+    def from_sheets(cls, cours, ouverture, maxi, mini, volume):
+        cours = cours.dropna(subset=['Date']).drop_duplicates('Date', keep='last')
+        dates = pd.DatetimeIndex(cours['Date']).sort_values()
+        tickers = [column for column in cours.columns if column != 'Date']
+        values = np.stack([_aligned(sheet, dates, tickers) for sheet in (ouverture, maxi, mini, cours, volume)], axis=-1)
+        return cls(dates, tickers, values)
+
+    def extended(self, cours, ouverture, maxi, mini, volume):
+        # Nouveau cube = ce cube + les dates postérieures à la dernière connue.
+        # Seules les nouvelles lignes sont alignées ; None si les actions ont changé.
+        cours = cours.dropna(subset=['Date']).drop_duplicates('Date', keep='last')
+        if [column for column in cours.columns if column != 'Date'] != self.tickers:
+            return None
+        dates = pd.DatetimeIndex(cours['Date'])
+        dates = dates[dates > self.dates[-1]].sort_values()
+        if not len(dates):
+            return self
+        rows = np.stack([_aligned(sheet, dates, self.tickers) for sheet in (ouverture, maxi, mini, cours, volume)], axis=-1)
+        return PriceCube(self.dates.append(dates), self.tickers, np.concatenate([self.values, rows]))
+
+    def __contains__(self, ticker):
+        return ticker in self.columns
+
+    def _start(self, start):
+        return 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+
+    def ticker(self, ticker, start=None):
+        # Vue (dates, champs) sur le cube pour une action
+        return self.values[self._start(start):, self.columns[ticker], :]
+
+    def field(self, field, start=None):
+        # Vue (dates, actions) d'un champ pour tout le marché
+        return self.values[self._start(start):, :, FIELDS.index(field)]
+
+    def frame(self, ticker, start=None, valid_only=False):
+        i = self._start(start)
+        data = pd.DataFrame(self.ticker(ticker, start), columns=FIELDS)
+        data.insert(0, 'Date', self.dates[i:])
+        if valid_only:
+            data = data[self.valid[i:, self.columns[ticker]]]
+        return data
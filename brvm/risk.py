@@ -0,0 +1,111 @@
+# Mesures de risque de toutes les actions à la fois : volatilité, VaR et CVaR historiques et
+# paramétriques, drawdown maximal, bêta et corrélation avec l'indice de la feuille INDICES
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from brvm.backtest import PERIODS_PER_YEAR, forward_fill
+from brvm.indicators import MarketIndicators, indicator_cache
+
+CONFIDENCE = 0.95
+
+
+def benchmarks(indices, tickers):
+    # Action -> premier indice de sa colonne INDICES présent parmi les colonnes de cours
+    available = set(tickers)
+    mapping = {}
+    for ticker in tickers:
+        if ticker in indices.columns:
+            listed = [str(name) for name in indices[ticker].dropna() if str(name) in available and str(name) != ticker]
+            if listed:
+                mapping[ticker] = listed[0]
+    return mapping
+
+
+def daily_returns(close):
+    # Rendements simples sur cours prolongés ; NaN avant la première cotation
+    filled = forward_fill(close)
+    returns = np.full(filled.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = filled[1:] / filled[:-1] - 1
+    return returns
+
+
+def max_drawdown(close):
+    # Plus forte baisse depuis un plus haut, par colonne (négative)
+    filled = forward_fill(close)
+    with np.errstate(invalid='ignore'):
+        drawdown = filled / np.fmax.accumulate(filled, axis=0) - 1
+    return np.nanmin(np.where(np.isnan(drawdown), np.inf, drawdown), axis=0, initial=0.0)
+
+
+def risk_metrics(returns, confidence=CONFIDENCE):
+    """VaR et CVaR (pertes positives, sur une séance), volatilité annualisée, par colonne.
+
+    Historiques : quantile et moyenne des pires séances observées ; paramétriques : loi
+    normale de même moyenne et écart-type. Les NaN (avant cotation) sont ignorés.
+    """
+    level = 1 - confidence
+    observed = ~np.isnan(returns)
+    count = observed.sum(axis=0)
+    usable = count > 1
+    filled = np.where(observed, returns, 0.0)
+    mean = np.divide(filled.sum(axis=0), count, out=np.full(count.shape, np.nan), where=usable)
+    deviation = np.sqrt(np.divide(np.where(observed, (returns - mean) ** 2, 0.0).sum(axis=0), count - 1,
+                                  out=np.full(count.shape, np.nan), where=usable))
+    quantile = np.full(count.shape, np.nan)
+    tail = np.full(count.shape, np.nan)
+    if usable.any():
+        quantile[usable] = np.nanquantile(returns[:, usable], level, axis=0)
+        worst = observed & (returns <= quantile)
+        tail[usable] = (np.where(worst, returns, 0.0).sum(axis=0) / np.maximum(worst.sum(axis=0), 1))[usable]
+    z = NormalDist().inv_cdf(level)
+    return {
+        'Volatilité %': deviation * np.sqrt(PERIODS_PER_YEAR) * 100,
+        'VaR historique %': -quantile * 100,
+        'CVaR historique %': -tail * 100,
+        'VaR paramétrique %': -(mean + z * deviation) * 100,
+        'CVaR paramétrique %': -(mean - deviation * NormalDist().pdf(z) / level) * 100,
+    }
+
+
+def beta_correlation(returns, benchmark):
+    # Bêta et corrélation colonne à colonne, sur les séances où les deux rendements existent
+    both = ~np.isnan(returns) & ~np.isnan(benchmark)
+    count = both.sum(axis=0)
+    x, y = np.where(both, returns, 0.0), np.where(both, benchmark, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x, mean_y = x.sum(axis=0) / count, y.sum(axis=0) / count
+        dx, dy = np.where(both, x - mean_x, 0.0), np.where(both, y - mean_y, 0.0)
+        covariance, variance_x, variance_y = (dx * dy).sum(axis=0), (dx * dx).sum(axis=0), (dy * dy).sum(axis=0)
+        beta = np.where(count > 1, covariance / variance_y, np.nan)
+        correlation = np.where(count > 1, covariance / np.sqrt(variance_x * variance_y), np.nan)
+    return beta, correlation
+
+
+def risk_table(workbook, confidence=CONFIDENCE, cache=None):
+    """Tableau de risque de toutes les actions depuis START, une ligne par action.
+
+    Calculé une fois par version du classeur et par niveau de confiance ; partagé : ne pas
+    le modifier.
+    """
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        market = MarketIndicators(workbook, cache=cache)
+        close = market.close()
+        returns = daily_returns(close)
+        mapping = benchmarks(workbook.indices(), market.tickers)
+        columns = {ticker: j for j, ticker in enumerate(market.tickers)}
+        # Rendements de l'indice associé à chaque action (NaN sans indice)
+        index = np.array([columns.get(mapping.get(ticker), -1) for ticker in market.tickers])
+        benchmark = np.where(index >= 0, returns[:, index], np.nan)
+        beta, correlation = beta_correlation(returns, benchmark)
+        table = pd.DataFrame(risk_metrics(returns, confidence), index=pd.Index(market.tickers, name='Action'))
+        table.insert(0, 'Indice', [mapping.get(ticker, '-') for ticker in market.tickers])
+        table['Drawdown max %'] = max_drawdown(close) * 100
+        table['Bêta'] = beta
+        table['Corrélation'] = correlation
+        return table
+    return cache.get((workbook.key, None, 'risk', (confidence,)), compute)
@@ -0,0 +1,36 @@
+# Tableau du marché à la dernière date : signaux et score global de toutes les actions
+import numpy as np
+import pandas as pd
+
+from brvm.indicators import indicator_cache
+from brvm.signals import ACTIONS, BUY, SELL, SIGNALS, global_score, recommendation, signal_states
+
+
+def screen(workbook, cache=None):
+    """Tableau du marché à la dernière date : une ligne par action, trié par score décroissant.
+
+    Calculé une fois par version du classeur à partir de l'état incrémental des indicateurs
+    (une nouvelle séance ne coûte qu'une mise à jour) et partagé : ne pas le modifier.
+    """
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        market = workbook.indicator_state()
+        states = signal_states(market)[-1]
+        score = global_score(states)
+        table = pd.DataFrame({
+            'Cours': market.close()[-1],
+            'Score': np.round(score, 1),
+            'Recommandation': [recommendation(value) for value in score],
+            'Achats': (states == BUY).sum(axis=1),
+            'Ventes': (states == SELL).sum(axis=1),
+            'RSI': np.round(market.rsi(14)[-1], 2),
+            'ROC %': np.round(market.roc(12)[-1], 2),
+        }, index=pd.Index(market.tickers, name='Action'))
+        for j, name in enumerate(SIGNALS):
+            table[name] = [ACTIONS[state] for state in states[:, j]]
+        if not len(market.dates):
+            # Aucune séance depuis START : pas de dernière date, tableau vide
+            table = table.iloc[:0]
+        return table.sort_values('Score', ascending=False, kind='stable')
+    return cache.get((workbook.key, None, 'screen', ()), compute)
@@ -0,0 +1,76 @@
+# Cache commun à toutes les sessions du serveur, adressé par contenu (empreinte SHA-256) :
+# N analystes qui importent le même classeur partagent un seul jeu de feuilles et de calculs
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+MAX_SHARED_BYTES = int(os.environ.get('BRVM_SHARED_CACHE_MB', '1024')) * 1024 * 1024
+
+
+class SharedCache:
+    """Entrées comptées par référence, évincées (LRU) au-delà de max_bytes.
+
+    Seules les entrées qui ne sont plus référencées par aucune session peuvent
+    être évincées ; la taille de chaque entrée est réévaluée à chaque contrôle,
+    les classeurs grossissant au fil des feuilles lues.
+    """
+
+    def __init__(self, max_bytes=MAX_SHARED_BYTES, sizeof=lambda value: value.nbytes()):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # clé -> [valeur, nombre de références]
+        self._lock = threading.Lock()
+
+    def acquire(self, key, factory):
+        # Valeur partagée pour key (créée par factory au premier appel), référence comptée
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+        # Création hors verrou : les autres sessions ne sont pas bloquées pendant la lecture
+        value = factory()
+        with self._lock:
+            entry = self._entries.setdefault(key, [value, 0])
+            entry[1] += 1
+            self._entries.move_to_end(key)
+            self._evict()
+            return entry[0]
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = max(entry[1] - 1, 0)
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def nbytes(self):
+        with self._lock:
+            return sum(self._sizeof(value) for value, _ in self._entries.values())
+
+    def _evict(self):
+        total = sum(self._sizeof(value) for value, _ in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            value, references = self._entries[key]
+            if references == 0:
+                total -= self._sizeof(value)
+                del self._entries[key]
+
+
+class SessionHandle:
+    # Référence d'une session sur une entrée ; libérée explicitement ou à la disparition de la session
+    def __init__(self, cache, key):
+        self.key = key
+        self._finalizer = weakref.finalize(self, cache.release, key)
+
+    def release(self):
+        self._finalizer()
@@ -0,0 +1,133 @@
+# Signaux du bloc « Indicateurs Techniques » des pages (Acheter / Neutre / Vendre) pour
+# toutes les actions et toutes les dates, et score global de « Mon portefeuille »
+import numpy as np
+import pandas as pd
+
+from brvm.indicators import MarketIndicators, indicator_cache
+
+SIGNALS = ['Moyenne Mobile (7)', 'Moyenne Mobile (21)', 'Moyenne Mobile (100)',
+           'Indice de force relative (14)', 'MACD (12,26)', 'Bandes de Bollinger (20, 2)',
+           'EMA (14)', 'EMA (100)', 'Momentum (10)', 'ROC (12)']
+BUY, NEUTRAL, SELL = 1, 0, -1
+ACTIONS = {BUY: 'Acheter', NEUTRAL: 'Neutre', SELL: 'Vendre'}
+
+
+def _state(buy, sell):
+    # Même priorité que les if / elif des pages : l'achat l'emporte, NaN -> Neutre
+    return np.where(buy, BUY, np.where(sell, SELL, NEUTRAL)).astype(np.int8)
+
+
+def signal_states(market, rows=slice(-1, None)):
+    """États (Acheter = 1, Neutre = 0, Vendre = -1) des SIGNALS, forme (dates, actions, signaux).
+
+    market : MarketIndicators, ou IndicatorState pour la dernière date seulement.
+    rows sélectionne les dates (par défaut la dernière). Les valeurs arrondies à 2 décimales
+    sur les pages avant comparaison le sont aussi ici, et les bandes de Bollinger comparent
+    le cours aux indicateurs de franchissement (0 / 1), comme sur les pages.
+    """
+    price = market.close()[rows]
+    bollinger = market.bollinger(20, 2)
+    upper, lower = bollinger['hband_indicator'][rows], bollinger['lband_indicator'][rows]
+    rsi = np.round(market.rsi(14)[rows], 2)
+    macd = np.round(market.macd(12, 26, 9)['diff'][rows], 2)
+    momentum = np.round(market.sma(10)[rows], 2)
+    roc = np.round(market.roc(12)[rows], 2)
+    with np.errstate(invalid='ignore'):
+        states = [_state(sma < price, sma > price) for sma in (market.sma(window)[rows] for window in (7, 21, 100))]
+        states += [
+            _state(rsi < 30, rsi > 70),
+            _state(macd > 0, macd < 0),
+            _state((price < lower) & ~(price > upper), price > upper),
+        ]
+        states += [_state(price > ema, price < ema) for ema in (np.round(market.ema(window)[rows], 2) for window in (14, 100))]
+        states += [_state(momentum > 0, momentum < 0), _state(roc > 0, roc < 0)]
+    return np.stack(states, axis=-1)
+
+
+def global_score(states):
+    # calculate_global_score de « Mon portefeuille » sur le dernier axe (0 à 100)
+    count = states.shape[-1]
+    return (states.sum(axis=-1, dtype=float) + count) / (2 * count) * 100
+
+
+def recommendation(score):
+    return 'Acheter' if score > 60 else 'Vendre' if score < 40 else 'Neutre'
+
+
+class SignalMatrix:
+    """États des SIGNALS pour chaque date × action × signal, en int8 (BUY / NEUTRAL / SELL).
+
+    dates et tickers sont ceux de MarketIndicators ; la dernière ligne correspond au tableau
+    affiché par les pages. Objet partagé en lecture seule.
+    """
+
+    def __init__(self, dates, tickers, states):
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.columns = {ticker: j for j, ticker in enumerate(self.tickers)}
+        self.states = states
+        self.states.flags.writeable = False
+
+    def ticker(self, ticker):
+        # Vue (dates, signaux) pour une action
+        return self.states[:, self.columns[ticker], :]
+
+    def scores(self):
+        # Score global (0 à 100) de chaque action à chaque date
+        return global_score(self.states)
+
+
+def signal_matrix(workbook, cache=None):
+    # Calculée une fois par version du classeur, à partir des indicateurs de tout le marché
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        market = MarketIndicators(workbook, cache=cache)
+        return SignalMatrix(market.dates, market.tickers, signal_states(market, rows=slice(None)))
+    return cache.get((workbook.key, None, 'signals', ()), compute)
+
+
+def score_matrix(workbook, cache=None):
+    # Score global de chaque date × action (0 à 100), NaN sans cours ce jour-là (avant la
+    # cotation notamment), une fois par version du classeur ; DataFrame partagé : ne pas le modifier
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        matrix = signal_matrix(workbook, cache)
+        close = MarketIndicators(workbook, cache=cache).close()
+        return pd.DataFrame(np.where(np.isnan(close), np.nan, matrix.scores()), index=matrix.dates, columns=matrix.tickers)
+    return cache.get((workbook.key, None, 'scores', ()), compute)
+
+
+def weekly_scores(workbook, weeks=12, cache=None):
+    # Score de fin de semaine des weeks dernières semaines : actions × semaines, partagé
+    cache = cache if cache is not None else indicator_cache()
+
+    def compute():
+        scores = score_matrix(workbook, cache)
+        weekly = scores.groupby(scores.index.to_period('W')).tail(1).iloc[-weeks:]
+        weekly.index = pd.Index(weekly.index.strftime('%d/%m/%Y'), name='Semaine')
+        return weekly.T
+    return cache.get((workbook.key, None, 'weekly_scores', (weeks,)), compute)
+
+
+def ticker_signals(workbook, action, cache=None):
+    # Liste des signaux de la page (Nom, Valeur, Action) à la dernière date : une tranche de la matrice
+    cache = cache if cache is not None else indicator_cache()
+    market = MarketIndicators(workbook, cache=cache)
+    states = signal_matrix(workbook, cache).ticker(action)[-1]
+    j = market.tickers.index(action)
+    bollinger = market.bollinger(20, 2)
+    values = [market.sma(window)[-1, j] for window in (7, 21, 100)] + [
+        market.rsi(14)[-1, j],
+        market.macd(12, 26, 9)['diff'][-1, j],
+        None,
+        market.ema(14)[-1, j],
+        market.ema(100)[-1, j],
+        market.sma(10)[-1, j],
+        market.roc(12)[-1, j],
+    ]
+    values = [round(value, 2) if value is not None else None for value in values]
+    values[SIGNALS.index('Bandes de Bollinger (20, 2)')] = \
+        f"Upper: {bollinger['hband_indicator'][-1, j]}, Lower: {bollinger['lband_indicator'][-1, j]}"
+    return [{'Nom': name, 'Valeur': value, 'Action': ACTIONS[int(state)]} for name, value, state in zip(SIGNALS, values, states)]
@@ -0,0 +1,135 @@
+# Instantané du classeur : feuilles lues et données dérivées dans un seul zip non compressé
+# (Arrow IPC pour les feuilles, .npy pour les tableaux), relu par projection mémoire
+import hashlib
+import io
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from brvm.parquet_cache import CACHE_DIR, arrow_safe, from_arrow_safe
+from brvm.prices import PriceCube
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(CACHE_DIR), 'snapshots')
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 2
+
+
+def snapshot_manifest(raw):
+    # Un .xlsm est aussi un zip : l'instantané se reconnaît à son manifeste (None sinon)
+    try:
+        with zipfile.ZipFile(io.BytesIO(raw)) as archive:
+            return json.loads(archive.read(MANIFEST)) if MANIFEST in archive.namelist() else None
+    except zipfile.BadZipFile:
+        return None
+
+
+def _arrow_bytes(data):
+    table = pa.Table.from_pandas(arrow_safe(data), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _npy_bytes(values):
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(values), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def export_snapshot(workbook):
+    # Toutes les feuilles, puis les tableaux dérivés (cube de prix) déjà calculés
+    cube = workbook.price_cube()
+    manifest = {'version': FORMAT_VERSION, 'key': workbook.key, 'source_key': workbook.source_key,
+                'fingerprints': workbook.fingerprints, 'sheets': [],
+                'cube': {'tickers': cube.tickers, 'dates': 'cube_dates.npy', 'values': 'cube_values.npy'}}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for i, name in enumerate(workbook.sheet_names):
+            data = workbook.raw_sheet(name)
+            archive.writestr(f'sheets/{i}.arrow', _arrow_bytes(data))
+            manifest['sheets'].append({'name': name, 'columns': [column if isinstance(column, (str, int, float)) else str(column) for column in data.columns]})
+        archive.writestr('cube_dates.npy', _npy_bytes(cube.dates.values))
+        archive.writestr('cube_values.npy', _npy_bytes(cube.values))
+        archive.writestr(MANIFEST, json.dumps(manifest))
+    return buffer.getvalue()
+
+
+class Snapshot:
+    """Instantané ouvert par projection mémoire, utilisable comme cache d'un WorkbookStore.
+
+    Les feuilles sont décodées à la demande depuis le fichier projeté et le
+    cube de prix est un np.memmap : rien n'est copié au chargement.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = {}
+        with zipfile.ZipFile(path) as archive, open(path, 'rb') as handle:
+            self.manifest = json.loads(archive.read(MANIFEST))
+            for info in archive.infolist():
+                handle.seek(info.header_offset)
+                name_length, extra_length = struct.unpack('<HH', handle.read(30)[26:30])
+                self._offsets[info.filename] = (info.header_offset + 30 + name_length + extra_length, info.file_size)
+        self.key = self.manifest['key']
+        self._map = pa.memory_map(path, 'r')
+
+    @classmethod
+    def from_bytes(cls, raw, directory=SNAPSHOT_DIR):
+        # Le fichier importé est écrit une fois sur disque pour pouvoir être projeté en mémoire
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{hashlib.sha256(raw).hexdigest()}.zip')
+        if not os.path.exists(path):
+            staging = f'{path}.{os.getpid()}.tmp'
+            with open(staging, 'wb') as handle:
+                handle.write(raw)
+            os.replace(staging, path)
+        return cls(path)
+
+    def sheet_names(self, key):
+        return [sheet['name'] for sheet in self.manifest['sheets']] if key == self.key else None
+
+    def fingerprints(self, key):
+        return self.manifest.get('fingerprints') or {}
+
+    def read(self, key, sheet_name):
+        for i, sheet in enumerate(self.manifest['sheets']):
+            if key == self.key and sheet['name'] == sheet_name:
+                offset, size = self._offsets[f'sheets/{i}.arrow']
+                table = pa.ipc.open_file(self._map.read_at(size, offset)).read_all()
+                return from_arrow_safe(table.to_pandas(), sheet['columns'])
+        return None
+
+    def write(self, key, sheets, fingerprints=None):
+        # Lecture seule : un instantané n'est jamais réécrit
+        pass
+
+    def closest(self, fingerprints, exclude=None):
+        return None
+
+    def read_arrays(self, key, name):
+        return None
+
+    def write_arrays(self, key, name, arrays):
+        return False
+
+    def _array(self, member):
+        offset, _ = self._offsets[member]
+        with open(self.path, 'rb') as handle:
+            handle.seek(offset)
+            version = np.lib.format.read_magic(handle)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(handle)
+            start = handle.tell()
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=start, shape=shape, order='F' if fortran_order else 'C')
+
+    def cube(self):
+        cube = self.manifest['cube']
+        dates = pd.DatetimeIndex(np.asarray(self._array(cube['dates'])))
+        return PriceCube(dates, cube['tickers'], self._array(cube['values']))
+
@@ -0,0 +1,114 @@
+# Base SQLite locale (fichier unique) : historique OHLCV, profils et fondamentaux,
+# indexés par (action, date) pour lire une période d'une action sans charger COURS
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from brvm.csv_import import to_price_sheets
+from brvm.prices import FIELDS, PriceCube
+
+DB_PATH = os.environ.get('BRVM_DB_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'brvm.sqlite'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profiles (
+    sheet TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (sheet, ticker, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    value TEXT,
+    PRIMARY KEY (ticker, row, col)
+) WITHOUT ROWID;
+"""
+
+
+def _nullable(values):
+    # NaN -> NULL pour SQLite
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+class PriceDatabase:
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def load_cube(self, cube):
+        # Insertion en masse de toutes les lignes (date, action) ayant au moins une valeur
+        rows_t, rows_j = np.nonzero(~np.isnan(cube.values).all(axis=2))
+        dates = cube.dates.strftime('%Y-%m-%d').to_numpy()
+        tickers = np.asarray(cube.tickers, dtype=object)
+        values = cube.values[rows_t, rows_j, :]
+        records = zip(tickers[rows_j].tolist(), dates[rows_t].tolist(), *(_nullable(values[:, f]) for f in range(len(FIELDS))))
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)', records)
+        return len(rows_t)
+
+    def load_csv(self, frames):
+        # Exports CSV par action (voir csv_import.import_directory)
+        sheets = to_price_sheets(frames)
+        return self.load_cube(PriceCube.from_sheets(*(sheets[name] for name in ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME'])))
+
+    def load_profiles(self, sheet_name, data):
+        # Feuille indexée par sa première colonne (Profil, Profil 1, Statistique) : une ligne par (action, champ)
+        stacked = data.stack(future_stack=True).dropna()
+        records = ((sheet_name, str(ticker), str(field), str(value)) for (field, ticker), value in stacked.items())
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?)', records)
+
+    def load_fundamentals(self, ticker, data):
+        # Feuille propre à une action, sans en-tête : cellules non vides repérées par (ligne, colonne)
+        stacked = data.stack(future_stack=True).dropna()
+        records = ((ticker, int(row), int(col), str(value)) for (row, col), value in stacked.items())
+        with self.connection:
+            self.connection.execute('DELETE FROM fundamentals WHERE ticker = ?', (ticker,))
+            self.connection.executemany('INSERT INTO fundamentals VALUES (?, ?, ?, ?)', records)
+
+    def load_workbook(self, workbook):
+        count = self.load_cube(workbook.price_cube())
+        for sheet_name, accessor in [('Profil', workbook.profil), ('Profil 1', workbook.profil_1), ('Statistique', workbook.statistique)]:
+            if sheet_name in workbook.sheet_names:
+                self.load_profiles(sheet_name, accessor())
+        for ticker in workbook.price_cube().tickers:
+            if ticker in workbook.sheet_names:
+                self.load_fundamentals(ticker, workbook.ticker_sheet(ticker))
+        return count
+
+    def prices(self, ticker, start=None, end=None):
+        # Parcours de l'index (ticker, date) : seule la période demandée est lue
+        query = 'SELECT date, open, high, low, close, volume FROM prices WHERE ticker = ? AND date >= ? AND date <= ? ORDER BY date'
+        start = '0000' if start is None else pd.Timestamp(start).strftime('%Y-%m-%d')
+        end = '9999' if end is None else pd.Timestamp(end).strftime('%Y-%m-%d')
+        data = pd.DataFrame(self.connection.execute(query, (ticker, start, end)).fetchall(), columns=['Date'] + FIELDS)
+        data['Date'] = pd.to_datetime(data['Date'], format='%Y-%m-%d')
+        return data.astype({field: 'float64' for field in FIELDS})
+
+    def tickers(self):
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT ticker FROM prices ORDER BY ticker')]
+
+    def profile(self, sheet_name, ticker):
+        query = 'SELECT field, value FROM profiles WHERE sheet = ? AND ticker = ?'
+        return dict(self.connection.execute(query, (sheet_name, ticker)).fetchall())
+
+    def fundamentals(self, ticker):
+        cells = self.connection.execute('SELECT row, col, value FROM fundamentals WHERE ticker = ?', (ticker,)).fetchall()
+        data = pd.DataFrame(cells, columns=['row', 'col', 'value'])
+        return data.pivot(index='row', columns='col', values='value').rename_axis(index=None, columns=None)
+
+    def close(self):
+        self.connection.close()
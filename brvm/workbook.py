@@ -0,0 +1,365 @@
+# Classeur .xlsm analysé une seule fois et partagé par toutes les pages
+import copy
+import hashlib
+import threading
+
+import pandas as pd
+
+from brvm.excel_reader import SheetReader, sheet_fingerprints
+from brvm.incremental import IndicatorState
+from brvm.indicators import START
+from brvm.parquet_cache import ParquetCache
+from brvm.prices import PriceCube
+from brvm.shared_cache import SessionHandle, SharedCache
+from brvm.snapshot import Snapshot, snapshot_manifest
+
+# Feuilles de séries temporelles : une colonne 'Date' puis une colonne par action / indice
+PRICE_SHEETS = ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME']
+# Feuilles de référence indexées par leur première colonne
+PROFILE_SHEETS = ['Profil', 'Profil 1', 'Statistique']
+HEADER_SHEETS = PRICE_SHEETS + ['INDICES'] + PROFILE_SHEETS
+# Feuilles lues en arrière-plan dès l'import (MAX d'abord : la page Data en a besoin tout de suite)
+PREFETCH_SHEETS = ['MAX', 'COURS', 'OUVERTURE', 'MIN', 'VOLUME', 'INDICES', 'Profil', 'Profil 1', 'Statistique']
+
+_default_cache = None
+_shared_workbooks = SharedCache()
+
+
+def content_hash(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def sheet_header(sheet_name):
+    # Les feuilles propres à chaque action (fondamentaux, actionnaires) n'ont pas d'en-tête
+    return 0 if sheet_name in HEADER_SHEETS else None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParquetCache()
+    return _default_cache
+
+
+def shared_workbooks():
+    return _shared_workbooks
+
+
+class WorkbookStore:
+    """Feuilles du classeur, chacune lue au plus une fois.
+
+    Les accesseurs renvoient des copies : les pages peuvent modifier le
+    résultat (dropna, set_index, ...) sans altérer le cache. Avec un
+    ParquetCache, un classeur déjà vu est relu depuis le disque sans openpyxl.
+
+    base est la version précédente du même classeur (même session ou cache
+    disque) : les feuilles inchangées en sont reprises telles quelles et les
+    feuilles de cours n'en lisent que les nouvelles dates (voir appended).
+
+    Les feuilles sont lues au premier accès ; prefetch() les lit à l'avance
+    dans un thread, pendant que l'utilisateur choisit son action.
+    """
+
+    def __init__(self, raw=None, cache=None, base=None, key=None):
+        self.key = key or content_hash(raw)
+        self.source_key = self.key  # Empreinte du fichier importé (différente de key pour une variante)
+        self._raw = raw
+        self._cache = cache
+        self._reader = None
+        self._sheets = {}
+        self._typed = {}
+        self._base = None
+        self._lock = threading.RLock()
+        self._pending_write = False
+        self.prefetch_thread = None
+        self.reused = set()  # Feuilles identiques à celles de base
+        self.appended = {}  # Feuille de cours -> nombre de dates ajoutées depuis base
+        self._base_key = None
+        self._base_state = None
+        self._prices_appended = False  # Cours de base prolongés sans modification des dates connues
+        cached_names = cache.sheet_names(self.key) if cache is not None else None
+        self._cache_written = cached_names is not None
+        if cached_names is not None:
+            self.sheet_names = cached_names
+            self.fingerprints = cache.fingerprints(self.key)
+            return
+        self.sheet_names = self._open().sheet_names
+        self.fingerprints = sheet_fingerprints(raw)
+        if base is None and cache is not None:
+            base_key = cache.closest(self.fingerprints, exclude=self.key)
+            base = WorkbookStore(cache=cache, key=base_key) if base_key else None
+        if base is not None:
+            self._ingest(base)
+        self._pending_write = cache is not None
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # Classeur relu depuis un instantané : feuilles décodées à la demande, cube projeté en mémoire
+        store = cls(cache=snapshot, key=snapshot.key)
+        store.source_key = snapshot.manifest['source_key']
+        store._typed['cube'] = snapshot.cube()
+        return store
+
+    def _ingest(self, base):
+        for name in self.sheet_names:
+            if name not in base.sheet_names:
+                continue
+            if self.fingerprints.get(name) is not None and base.fingerprints.get(name) == self.fingerprints[name]:
+                self._sheets[name] = base._parse(name)
+                self.reused.add(name)
+            elif name in PRICE_SHEETS:
+                result = self._open().read_appended(name, base._parse(name))
+                if result is not None:
+                    self._sheets[name], self.appended[name] = result
+        self._base = base
+        self._base_key = base.key
+        self._base_state = base._typed.get('state')
+        self._prices_appended = all(name in self.reused or name in self.appended for name in PRICE_SHEETS)
+
+    def nbytes(self):
+        # Mémoire occupée (feuilles lues, données typées, cube, contenu brut), pour le cache partagé
+        with self._lock:
+            frames = list(self._sheets.values()) + [data for data in self._typed.values() if isinstance(data, pd.DataFrame)]
+            size = sum(int(data.memory_usage(index=True).sum()) for data in frames)
+            if 'cube' in self._typed:
+                size += self._typed['cube'].values.nbytes
+            return size + len(self._raw or b'')
+
+    def with_prices(self, sheets, key):
+        # Variante du classeur complétée par des cours externes (imports CSV), sous une autre clé :
+        # le classeur partagé par les autres sessions n'est pas modifié
+        with self._lock:
+            store = copy.copy(self)
+            store.key = key
+            store._sheets = dict(self._sheets)
+            store._typed = dict(self._typed)
+            store._reader = None
+            store._lock = threading.RLock()
+            store._pending_write = False
+            store._cache_written = False
+            # Les cours importés remplacent aussi des dates connues : rien n'est repris de base
+            store._base = store._base_key = store._base_state = None
+            store.reused = set()
+            store.appended = {}
+            store._prices_appended = False
+            store.prefetch_thread = None
+        store.merge_prices(sheets)
+        return store
+
+    def prefetch(self, sheet_names=PREFETCH_SHEETS):
+        if self.prefetch_thread is None:
+            self.prefetch_thread = threading.Thread(target=self._prefetch, args=(list(sheet_names),), daemon=True, name=f'prefetch-{self.key[:8]}')
+            self.prefetch_thread.start()
+        return self.prefetch_thread
+
+    def _prefetch(self, sheet_names):
+        for name in sheet_names:
+            if name in self.sheet_names:
+                self._parse(name)
+        if all(name in self.sheet_names for name in PRICE_SHEETS):
+            self.price_cube()
+        self.write_cache()
+
+    def write_cache(self):
+        # Conversion feuille par feuille : une seule feuille non utilisée en mémoire à la fois.
+        # Les feuilles sont lues hors verrou (les pages ne sont pas bloquées pendant l'écriture),
+        # le verrou ne protège que le drapeau d'écriture et la publication du résultat
+        with self._lock:
+            if not self._pending_write:
+                return
+            self._pending_write = False
+        self._cache.write(self.key, self._sheets_for_cache(), self.fingerprints)
+        with self._lock:
+            self._cache_written = True
+            state = self._typed.get('state')
+        if state is not None:
+            self._cache.write_arrays(self.key, 'indicators', state.arrays())
+
+    def _sheets_for_cache(self):
+        # Feuilles déjà lues, sinon relues par un lecteur propre à l'écriture : le lecteur
+        # openpyxl du classeur ne se partage pas entre threads
+        reader = None
+        for name in self.sheet_names:
+            data = self._sheets.get(name)
+            if data is None:
+                reader = reader or SheetReader(self._raw)
+                data = reader.read(name, sheet_header(name))
+            yield name, data
+
+    def _open(self):
+        if self._reader is None:
+            self._reader = SheetReader(self._raw)
+        return self._reader
+
+    def _parse(self, sheet_name):
+        data = self._sheets.get(sheet_name)
+        if data is None:
+            # Un seul lecteur à la fois (page et thread de préchargement partagent le classeur)
+            with self._lock:
+                if sheet_name not in self._sheets:
+                    data = self._cache.read(self.key, sheet_name) if self._cache is not None else None
+                    if data is None:
+                        data = self._open().read(sheet_name, sheet_header(sheet_name))
+                    self._sheets[sheet_name] = data
+                data = self._sheets[sheet_name]
+        return data
+
+    def raw_sheet(self, sheet_name):
+        # Lecture brute (pour l'aperçu de la page Data)
+        if sheet_name in PRICE_SHEETS:
+            return self.prices(sheet_name)
+        return self._parse(sheet_name).copy()
+
+    def _price_frame(self, sheet_name):
+        with self._lock:
+            if sheet_name not in self._typed:
+                data = self._parse(sheet_name).copy()
+                data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
+                values = data.columns.drop('Date')
+                data[values] = data[values].apply(pd.to_numeric, errors='coerce')
+                self._typed[sheet_name] = data
+            return self._typed[sheet_name]
+
+    def prices(self, sheet_name):
+        return self._price_frame(sheet_name).copy()
+
+    def merge_prices(self, sheets):
+        # Fusionne des feuilles de cours externes (imports CSV) : leurs valeurs priment sur
+        # celles du classeur, l'ordre des dates de la feuille d'origine est conservé
+        with self._lock:
+            for sheet_name, imported in sheets.items():
+                current = self._price_frame(sheet_name).dropna(subset=['Date']).drop_duplicates('Date', keep='last')
+                newest_first = len(current) > 1 and current['Date'].is_monotonic_decreasing
+                columns = list(current.columns.drop('Date')) + [column for column in imported.columns if column not in current.columns]
+                merged = imported.set_index('Date').combine_first(current.set_index('Date'))
+                merged = merged.reindex(columns=columns).sort_index(ascending=not newest_first)
+                self._typed[sheet_name] = merged.rename_axis('Date').reset_index()
+            self._typed.pop('cube', None)
+            self._typed.pop('state', None)
+
+    def cours(self):
+        return self.prices('COURS')
+
+    def ouverture(self):
+        return self.prices('OUVERTURE')
+
+    def max(self):
+        return self.prices('MAX')
+
+    def min(self):
+        return self.prices('MIN')
+
+    def volume(self):
+        return self.prices('VOLUME')
+
+    def price_cube(self):
+        # Objet partagé en lecture seule (tableaux non modifiables), pas de copie
+        with self._lock:
+            if 'cube' not in self._typed:
+                sheets = [self._price_frame(name) for name in ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME']]
+                cube = None
+                if self._base is not None and all(name in self.reused or name in self.appended for name in PRICE_SHEETS):
+                    # Simple ajout de dates : on prolonge le cube de la version précédente
+                    cube = self._base.price_cube().extended(*sheets)
+                self._typed['cube'] = cube if cube is not None else PriceCube.from_sheets(*sheets)
+                self._base = None
+            return self._typed['cube']
+
+    def previous_key(self):
+        # Version précédente du classeur dont celui-ci ne fait que prolonger les cours, sinon None :
+        # les calculs en cache pour cette version peuvent être prolongés au lieu d'être refaits
+        return self._base_key if self._prices_appended else None
+
+    def indicator_state(self):
+        # État incrémental des indicateurs du marché depuis START (brvm.incremental) : relu à côté
+        # des feuilles en cache, sinon prolongé depuis la version précédente du classeur quand
+        # seules des dates ont été ajoutées, sinon calculé sur tout l'historique
+        with self._lock:
+            if 'state' not in self._typed:
+                cube = self.price_cube()
+                start = cube.dates.searchsorted(pd.Timestamp(START))
+                dates, close = cube.dates[start:], cube.field('Close', START)
+                # Aucune séance depuis START : état vide, sans relecture ni prolongement
+                state = self._read_state(self.key) if len(dates) else IndicatorState.empty(cube.tickers)
+                if state is not None and len(dates) and (not len(state.dates) or state.dates[-1] != dates[-1]):
+                    state = None
+                if state is None and self._prices_appended:
+                    base = self._base_state.copy() if self._base_state is not None else self._read_state(self._base_key)
+                    if base is not None and (not len(base.dates) or base.dates[-1] in dates):
+                        state = base.extended(dates, cube.tickers, close)
+                if state is None:
+                    state = IndicatorState.from_history(dates, cube.tickers, close)
+                self._typed['state'] = state
+                if self._cache_written:
+                    self._cache.write_arrays(self.key, 'indicators', state.arrays())
+            return self._typed['state']
+
+    def _read_state(self, key):
+        arrays = self._cache.read_arrays(key, 'indicators') if self._cache is not None and key else None
+        return IndicatorState.from_arrays(arrays) if arrays is not None else None
+
+    def indices(self):
+        return self._parse('INDICES').copy()
+
+    def _profile(self, sheet_name):
+        with self._lock:
+            if sheet_name not in self._typed:
+                data = self._parse(sheet_name)
+                self._typed[sheet_name] = data.set_index(data.columns[0])
+            return self._typed[sheet_name].copy()
+
+    def profil(self):
+        return self._profile('Profil')
+
+    def profil_1(self):
+        return self._profile('Profil 1')
+
+    def statistique(self):
+        return self._profile('Statistique')
+
+    def ticker_sheet(self, action):
+        # Feuille propre à une action (fondamentaux, actionnaires), sans en-tête
+        return self._parse(action).copy()
+
+    def columns(self, sheet_name):
+        if sheet_name in PRICE_SHEETS:
+            return self._price_frame(sheet_name).columns.tolist()
+        return self._parse(sheet_name).columns.tolist()
+
+
+def _new_workbook(raw, key, cache, base):
+    store = WorkbookStore(raw, cache=cache if cache is not None else default_cache(), base=base, key=key)
+    store.prefetch()
+    return store
+
+
+def share_workbook(session_state, key, factory):
+    # Rattache la session au classeur partagé de clé key (créé par factory s'il n'existe pas encore)
+    # et libère celui qu'elle utilisait jusque-là
+    store = _shared_workbooks.acquire(key, factory)
+    handle = session_state.get('workbook_handle')
+    session_state['workbook_handle'] = SessionHandle(_shared_workbooks, key)
+    session_state['workbook'] = store
+    if handle is not None:
+        handle.release()
+    return store
+
+
+def get_workbook(session_state, raw=None, cache=None):
+    # Réutilise le classeur de la session tant que le contenu importé ne change pas ;
+    # un classeur déjà importé par une autre session est partagé, pas relu
+    store = session_state.get('workbook')
+    if raw is None:
+        return store
+    manifest = snapshot_manifest(raw)
+    if manifest is not None:
+        # Instantané exporté : ni openpyxl ni Parquet, le fichier est projeté en mémoire
+        if store is None or store.source_key != manifest['source_key']:
+            store = share_workbook(session_state, manifest['key'], lambda: WorkbookStore.from_snapshot(Snapshot.from_bytes(raw)))
+        return store
+    key = content_hash(raw)
+    if store is None or store.source_key != key:
+        # Le classeur précédent de la session sert de base à une mise à jour incrémentale
+        base = store
+        store = share_workbook(session_state, key, lambda: _new_workbook(raw, key, cache, base))
+    return store
@@ -0,0 +1,59 @@
+# Classeurs .xlsm synthétiques pour les tests : feuilles de cours, INDICES, profils et une
+# feuille par action, au format du classeur de la BRVM
+import io
+import os
+import sys
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRICE_FACTORS = [('COURS', 1.0), ('OUVERTURE', 1.0), ('MAX', 1.01), ('MIN', 0.99), ('VOLUME', None)]
+
+
+def make_workbook(days=300, tickers=('SNTS', 'ORAC', 'SGBC'), seed=0, start='2020-01-01', newest_first=False, total=3000, listings=None):
+    # Les days premières séances d'un même historique de total séances : deux appels avec
+    # des days différents simulent un classeur complété par de nouvelles dates ; listings :
+    # action -> indice de sa première séance cotée
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=total)[:days]
+    close = pd.DataFrame(1000 * np.exp(np.cumsum(rng.normal(0, 0.01, (total, len(tickers))), 0)), columns=list(tickers)).iloc[:days]
+    close['BRVMC'] = (200 * np.exp(np.cumsum(rng.normal(0, 0.005, total))))[:days]
+    volume = pd.DataFrame(rng.integers(0, 1000, (total, len(tickers) + 1)), columns=close.columns).iloc[:days].astype(float)
+    for ticker, first in (listings or {}).items():
+        close.iloc[:first, close.columns.get_loc(ticker)] = np.nan
+        volume.iloc[:first, volume.columns.get_loc(ticker)] = np.nan
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for name, factor in PRICE_FACTORS:
+            data = close * factor if factor else volume.copy()
+            data.insert(0, 'Date', dates)
+            if newest_first:
+                data = data[::-1]
+            data.to_excel(writer, sheet_name=name, index=False)
+        pd.DataFrame({ticker: ['BRVMC'] for ticker in tickers}).to_excel(writer, sheet_name='INDICES', index=False)
+        # Feuilles de référence aux colonnes mixtes (textes, entiers, décimaux, dates), comme dans le classeur
+        pd.DataFrame({'Champ': ['Profil', 'Secteur', 'Effectif', 'Capital'], **{t: [f'{t} desc', 'Banque', 1500, 2.5] for t in tickers}}).to_excel(writer, sheet_name='Profil', index=False)
+        pd.DataFrame({'Champ': ['Capi', 'Flottant', 'Introduction', 'Statut'], **{t: [1, 2.5, pd.Timestamp('2010-03-01'), 'Coté'] for t in tickers}}).to_excel(writer, sheet_name='Profil 1', index=False)
+        pd.DataFrame({'Champ': ['a', 'PER', 'DCF', 'ANC', 'Graham', 'Note'], **{t: [0, 900, 1100, 1000, 950, 'n.d.'] for t in tickers}}).to_excel(writer, sheet_name='Statistique', index=False)
+        for ticker in tickers:
+            pd.DataFrame([[None] * 12, [None, None, None, 'Etat', '10,5%', None, None, 1, 2, 3, 4, 5]]).to_excel(writer, sheet_name=ticker, index=False, header=False)
+    return buffer.getvalue()
+
+
+def set_cell(raw, sheet_name, row, column, value):
+    # Copie du classeur avec une cellule modifiée (row, column : numérotation Excel, en-tête = 1)
+    workbook = openpyxl.load_workbook(io.BytesIO(raw))
+    workbook[sheet_name].cell(row=row, column=column, value=value)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def parquet_cache(tmp_path):
+    from brvm.parquet_cache import ParquetCache
+    return ParquetCache(str(tmp_path / 'workbooks'))
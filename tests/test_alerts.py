@@ -0,0 +1,72 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from brvm.alerts import AlertStore, evaluate, parse_operand
+from brvm.indicators import IndicatorCache
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+@pytest.mark.parametrize('spec', ['RSI(0)', 'EMA(2.5)', 'ROC(-3)', 'SMA(100000)', 'MACD(26,12,9)', 'Bollinger haute(20,0)', 'SMA(a)', 'nan'])
+def test_invalid_parameters_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_operand(spec)
+
+
+def test_valid_parameters():
+    assert parse_operand('Bollinger basse(20, 2.5)') == ('Bollinger basse', (20, 2.5))
+    assert parse_operand('MACD') == ('MACD', (12, 26, 9))
+    assert parse_operand('30') == (None, 30.0)
+
+
+def test_invalid_rule_does_not_block_others(tmp_path):
+    store = AlertStore(str(tmp_path / 'alerts.sqlite'))
+    # Règle enregistrée sans validation (ancienne version de la base)
+    with store.connection:
+        store.connection.execute("INSERT INTO rules (left, operator, right) VALUES ('RSI(0)', '>', '0')")
+    rule = store.add_rule('Cours', '>', '0')
+    workbook = WorkbookStore(make_workbook(600, start='2020-06-01'))
+    assert evaluate(workbook, store, IndicatorCache()) == len(workbook.price_cube().tickers)
+    rules = store.rules().set_index('id')
+    assert rules.loc[rule, 'last_date'] is not None and rules['last_date'].isna().sum() == 1
+    # Motif de l'échec enregistré pour la règle invalide seulement
+    invalid = rules.index[rules.index != rule][0]
+    assert 'fenêtre' in rules.loc[invalid, 'error'] and pd.isna(rules.loc[rule, 'error'])
+    # Nouvelle évaluation sans nouvelles données : aucune alerte ajoutée
+    assert evaluate(workbook, store, IndicatorCache()) == 0
+    store.close()
+
+
+def test_unexpected_errors_are_not_swallowed(tmp_path, monkeypatch):
+    store = AlertStore(str(tmp_path / 'alerts.sqlite'))
+    store.add_rule('RSI(14)', '>', '70')
+
+    def broken(*args):
+        raise ZeroDivisionError
+    monkeypatch.setattr('brvm.alerts._operand', broken)
+    with pytest.raises(ZeroDivisionError):
+        evaluate(WorkbookStore(make_workbook(600, start='2020-06-01')), store, IndicatorCache())
+    store.close()
+
+
+def test_error_column_added_to_existing_database(tmp_path):
+    path = str(tmp_path / 'alerts.sqlite')
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE rules (id INTEGER PRIMARY KEY AUTOINCREMENT, left TEXT NOT NULL, operator TEXT NOT NULL, "
+                       "right TEXT NOT NULL, tickers TEXT NOT NULL DEFAULT '', last_date TEXT)")
+    connection.commit()
+    connection.close()
+    store = AlertStore(path)
+    store.add_rule('Cours', '>', '0')
+    assert store.rules()['error'].isna().all()
+    store.close()
+
+
+def test_no_rule_computes_nothing(tmp_path):
+    store = AlertStore(str(tmp_path / 'alerts.sqlite'))
+    workbook = WorkbookStore(make_workbook(300))
+    assert evaluate(workbook, store, IndicatorCache()) == 0
+    assert 'cube' not in workbook._typed
+    store.close()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm.allocation import Allocation, MomentStats
+
+
+@pytest.fixture(scope='module')
+def prices():
+    rng = np.random.default_rng(11)
+    factors = rng.normal(0, 0.01, (600, 2))
+    returns = factors @ rng.normal(0, 1, (2, 8)) + rng.normal(0.0004, 0.015, (600, 8)) * np.linspace(0.5, 2, 8)
+    close = 1000 * np.exp(np.cumsum(returns, axis=0))
+    close[rng.random(close.shape) < 0.02] = np.nan
+    return pd.bdate_range('2020-01-01', periods=len(close)), close
+
+
+@pytest.fixture(scope='module')
+def allocation(prices):
+    dates, close = prices
+    return Allocation.from_stats([f'T{i}' for i in range(close.shape[1])], MomentStats.from_prices(dates, close))
+
+
+def assert_kkt(allocation, weights, appetite, cap):
+    # Optimum de ½ wᵀΣw - appetite · μᵀw sous somme = 1, 0 <= w <= cap
+    assert weights.sum() == pytest.approx(1.0, abs=1e-9)
+    assert weights.min() >= -1e-9 and weights.max() <= cap + 1e-9
+    gradient = allocation.covariance @ weights - appetite * allocation.mean
+    free = (weights > 1e-7) & (weights < cap - 1e-7)
+    level = gradient[free].mean() if free.any() else None
+    if level is not None:
+        np.testing.assert_allclose(gradient[free], level, atol=1e-8)
+        assert (gradient[weights <= 1e-7] >= level - 1e-8).all()
+        assert (gradient[weights >= cap - 1e-7] <= level + 1e-8).all()
+
+
+@pytest.mark.parametrize('cap', [1.0, 0.3, 0.15])
+@pytest.mark.parametrize('appetite', [0.0, 0.05, 1.0])
+def test_mean_variance_kkt(allocation, appetite, cap):
+    assert_kkt(allocation, allocation.mean_variance(appetite, cap), appetite, cap)
+
+
+def test_cap_too_low(allocation):
+    with pytest.raises(ValueError):
+        allocation.mean_variance(0.0, 0.1)
+
+
+def test_frontier_is_efficient(allocation):
+    frontier = allocation.frontier(cap=0.4)
+    weights = frontier[allocation.tickers].to_numpy()
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, atol=1e-9)
+    assert frontier['Rendement %'].is_monotonic_increasing
+    assert frontier['Volatilité %'].iloc[0] == pytest.approx(allocation.risk(allocation.minimum_variance(0.4)) * 100)
+    assert (np.diff(frontier['Volatilité %']) >= -1e-9).all()
+
+
+def test_risk_parity(allocation):
+    weights = allocation.risk_parity()
+    assert weights.sum() == pytest.approx(1.0) and (weights > 0).all()
+    np.testing.assert_allclose(allocation.risk_contributions(weights), 1 / len(weights), atol=1e-8)
+
+
+def test_extended_stats_match_full_history(prices):
+    dates, close = prices
+    extended = MomentStats.from_prices(dates[:400], close[:400]).extended(dates, close)
+    full = MomentStats.from_prices(dates, close)
+    assert extended.count == full.count
+    for name in ('total', 'cross', 'weighted', 'fourth'):
+        np.testing.assert_allclose(getattr(extended, name), getattr(full, name), rtol=1e-10, atol=1e-14)
+    np.testing.assert_allclose(extended.shrunk()[0], full.shrunk()[0], rtol=1e-10)
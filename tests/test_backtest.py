@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm.backtest import forward_fill, positions_from_states, run, score_states
+from brvm.signals import BUY, NEUTRAL, SELL
+
+# Deux actions sur cinq séances, résultats calculés à la main (frais de 1 %)
+CLOSE = np.array([[100.0, np.nan],
+                  [110.0, 50.0],
+                  [np.nan, 40.0],
+                  [121.0, 60.0],
+                  [110.0, 30.0]])
+POSITIONS = np.array([[1.0, 1.0],
+                      [1.0, 0.0],
+                      [0.0, 1.0],
+                      [0.0, 1.0],
+                      [0.0, 0.0]])
+
+
+@pytest.fixture
+def result():
+    return run(CLOSE, POSITIONS, fee=0.01, dates=pd.bdate_range('2024-01-01', periods=5), tickers=['A', 'B'])
+
+
+def test_positions_and_returns(result):
+    # A : pas de transaction sans cours (séance 2), vente à la séance 3 ; B : rien avant la cotation
+    np.testing.assert_allclose(result.held, [[0, 0], [1, 0], [1, 0], [1, 1], [0, 1]])
+    np.testing.assert_allclose(result.turnover, [[1, 0], [0, 0], [0, 1], [1, 0], [0, 1]])
+    np.testing.assert_allclose(result.returns, [[-0.01, 0], [0.1, 0], [0, -0.01], [0.09, 0.5], [0, -0.51]])
+    np.testing.assert_allclose(result.equity[-1], [0.99 * 1.1 * 1.09, 0.99 * 1.5 * 0.49])
+    np.testing.assert_allclose(result.benchmark[-1], [1.1, 0.6])
+
+
+def test_summary(result):
+    summary = result.summary()
+    assert list(summary.index) == ['A', 'B']
+    assert summary.loc['A', 'Rendement %'] == pytest.approx((0.99 * 1.1 * 1.09 - 1) * 100)
+    assert summary.loc['A', 'Drawdown max %'] == pytest.approx(0.0)
+    assert summary.loc['B', 'Drawdown max %'] == pytest.approx(-51.0)
+    assert summary.loc['A', 'Transactions'] == 2 and summary.loc['B', 'Transactions'] == 2
+    assert summary.loc['B', 'Exposition %'] == pytest.approx(40.0)
+    assert summary.loc['A', 'Achat-conservation %'] == pytest.approx(10.0)
+
+
+def test_states_to_positions():
+    states = np.array([[NEUTRAL], [BUY], [NEUTRAL], [SELL], [NEUTRAL], [BUY]])
+    np.testing.assert_array_equal(positions_from_states(states)[:, 0], [0, 1, 1, 0, 0, 1])
+    np.testing.assert_array_equal(score_states(np.array([61.0, 60.0, 40.0, 39.0])), [BUY, NEUTRAL, NEUTRAL, SELL])
+
+
+def test_forward_fill():
+    np.testing.assert_array_equal(forward_fill(np.array([[np.nan], [1.0], [np.nan], [2.0]]))[:, 0], [np.nan, 1.0, 1.0, 2.0])
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm.correlation import WINDOWS, CorrelationState, cluster_order
+
+
+@pytest.fixture(scope='module')
+def prices():
+    rng = np.random.default_rng(3)
+    common = rng.normal(0, 0.01, (400, 1))
+    close = 1000 * np.exp(np.cumsum(common + rng.normal(0, 0.01, (400, 4)), axis=0))
+    close[:280, 1] = np.nan  # Cotée pendant les séances ajoutées
+    close[rng.random(400) < 0.1, 2] = np.nan
+    return pd.bdate_range('2021-01-01', periods=len(close)), ['A', 'B', 'C', 'D'], close
+
+
+@pytest.mark.parametrize('split', [100, 300, 399])
+def test_extended_matches_full_recompute(prices, split):
+    dates, tickers, close = prices
+    state = CorrelationState.from_prices(dates[:split], tickers, close[:split])
+    # Ajouts par tranches inégales, comme des versions successives du classeur
+    for end in sorted({min(split + 1, len(dates)), min(split + 60, len(dates)), len(dates)}):
+        state = state.extended(dates[:end], tickers, close[:end])
+    full = CorrelationState.from_prices(dates, tickers, close)
+    assert state.dates.equals(full.dates)
+    for window in (None, *WINDOWS):
+        pd.testing.assert_frame_equal(state.correlation(window), full.correlation(window), atol=1e-9)
+        pd.testing.assert_frame_equal(state.covariance(window), full.covariance(window), atol=1e-9)
+
+
+def test_correlation_matches_pandas(prices):
+    dates, tickers, close = prices
+    state = CorrelationState.from_prices(dates, tickers, close)
+    frame = pd.DataFrame(close, columns=tickers).ffill()
+    returns = frame / frame.shift() - 1
+    pd.testing.assert_frame_equal(state.correlation(), returns.corr(min_periods=20), atol=1e-9)
+    pd.testing.assert_frame_equal(state.covariance(63), returns.iloc[-63:].cov(min_periods=20) * 252, atol=1e-12)
+
+
+def test_unchanged_or_renamed_tickers(prices):
+    dates, tickers, close = prices
+    state = CorrelationState.from_prices(dates, tickers, close)
+    assert state.extended(dates, tickers, close) is state
+    assert state.extended(dates, ['A', 'B', 'C', 'E'], close) is None
+
+
+def test_cluster_order_keeps_groups_contiguous():
+    rng = np.random.default_rng(0)
+    factors = rng.normal(size=(500, 2))
+    # Colonnes entrelacées de deux groupes : 0, 2, 4 suivent le premier facteur, 1, 3 le second
+    returns = factors[:, [0, 1, 0, 1, 0]] + 0.3 * rng.normal(size=(500, 5))
+    order = cluster_order(np.corrcoef(returns, rowvar=False))
+    assert sorted(order) == [0, 1, 2, 3, 4]
+    groups = [0 if column % 2 == 0 else 1 for column in order]
+    assert groups in ([0, 0, 0, 1, 1], [1, 1, 0, 0, 0])
+    assert cluster_order(np.full((1, 1), np.nan)) == [0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from brvm.csv_import import import_directory, read_ticker_csv, to_price_sheets
+
+# Format de DANGSUG.csv : BOM, ';', dates jj/mm/aaaa, plus récentes d'abord
+DANGSUG = """﻿Date;Close;Open;High;Low;Volume;Variation %
+27/02/2024;60;60.1;65;59.6;12750000;0.00%
+26/02/2024;60;65;65;60;5130000;-7.69%
+23/02/2024;65;65;65.5;62;1650000;0.00%
+"""
+SNTS = """﻿Date;Close;Open;High;Low;Volume;Variation %
+27/02/2024;1500;1490;1510;1480;200;1.35%
+22/02/2024;1480;1480;1480;1480;0;0.00%
+"""
+
+
+def write(directory):
+    (directory / 'DANGSUG.csv').write_text(DANGSUG, encoding='utf-8')
+    (directory / 'SNTS.csv').write_text(SNTS, encoding='utf-8')
+    return str(directory)
+
+
+def test_ticker_rows(tmp_path):
+    data = read_ticker_csv(write(tmp_path) + '/DANGSUG.csv')
+    assert list(data['Date']) == list(pd.to_datetime(['2024-02-23', '2024-02-26', '2024-02-27']))
+    assert list(data['Close']) == [65.0, 60.0, 60.0]
+    assert list(data['Open']) == [65.0, 65.0, 60.1]
+    np.testing.assert_allclose(data['Variation %'], [0.0, -7.69, 0.0])
+    assert (data.dtypes.drop('Date') == 'float64').all()
+
+
+def test_price_sheets(tmp_path):
+    sheets = to_price_sheets(import_directory(write(tmp_path)))
+    assert list(sheets) == ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME']
+    cours = sheets['COURS']
+    assert list(cours.columns) == ['Date', 'DANGSUG', 'SNTS']
+    assert list(cours['Date']) == list(pd.to_datetime(['2024-02-22', '2024-02-23', '2024-02-26', '2024-02-27']))
+    np.testing.assert_array_equal(cours['DANGSUG'], [np.nan, 65, 60, 60])
+    np.testing.assert_array_equal(cours['SNTS'], [1480, np.nan, np.nan, 1500])
+    np.testing.assert_array_equal(sheets['MAX']['DANGSUG'], [np.nan, 65.5, 65, 65])
+    np.testing.assert_array_equal(sheets['MIN']['SNTS'], [1480, np.nan, np.nan, 1480])
+    np.testing.assert_array_equal(sheets['OUVERTURE']['DANGSUG'], [np.nan, 65, 65, 60.1])
+    np.testing.assert_array_equal(sheets['VOLUME']['SNTS'], [0, np.nan, np.nan, 200])
+
+
+def test_process_pool_matches_serial(tmp_path):
+    directory = write(tmp_path)
+    parallel = import_directory(directory, max_workers=2)
+    serial = {path.stem: read_ticker_csv(str(path)) for path in sorted(tmp_path.glob('*.csv'))}
+    assert list(parallel) == list(serial)
+    for ticker in serial:
+        pd.testing.assert_frame_equal(parallel[ticker], serial[ticker])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm.excel_reader import SheetReader
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook, set_cell
+
+
+@pytest.mark.parametrize('newest_first', [False, True])
+def test_appended_dates_are_merged(parquet_cache, newest_first):
+    base = WorkbookStore(make_workbook(300, newest_first=newest_first), cache=parquet_cache)
+    base.prefetch().join()
+    raw = make_workbook(305, newest_first=newest_first)
+    store = WorkbookStore(raw, cache=parquet_cache)
+    assert store.appended == {name: 5 for name in ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME']}
+    assert np.array_equal(store.price_cube().values, WorkbookStore(raw).price_cube().values, equal_nan=True)
+
+
+@pytest.mark.parametrize('newest_first', [False, True])
+def test_corrected_price_forces_full_read(parquet_cache, newest_first):
+    base = WorkbookStore(make_workbook(300, newest_first=newest_first), cache=parquet_cache)
+    base.prefetch().join()
+    # Nouvelles dates et correction d'un cours déjà connu
+    raw = set_cell(make_workbook(305, newest_first=newest_first), 'COURS', 150, 2, 99999)
+    store = WorkbookStore(raw, cache=parquet_cache)
+    assert 'COURS' not in store.appended and 'COURS' not in store.reused
+    assert (store.cours()['SNTS'] == 99999).any()
+    assert np.array_equal(store.price_cube().values, WorkbookStore(raw).price_cube().values, equal_nan=True)
+    # La version enregistrée sur disque garde la correction après redémarrage
+    store.prefetch().join()
+    assert (WorkbookStore(cache=parquet_cache, key=store.key).cours()['SNTS'] == 99999).any()
+
+
+def test_interleaved_dates_force_full_read(parquet_cache):
+    base = WorkbookStore(make_workbook(300), cache=parquet_cache)
+    base.prefetch().join()
+    # Une date postérieure à la dernière connue au milieu de la feuille
+    raw = set_cell(make_workbook(300), 'COURS', 100, 1, '2030-01-01')
+    assert 'COURS' not in WorkbookStore(raw, cache=parquet_cache).appended
+
+
+@pytest.mark.filterwarnings('error')
+@pytest.mark.parametrize('newest_first', [False, True])
+def test_read_appended_without_new_dates(newest_first):
+    reader = SheetReader(make_workbook(300, newest_first=newest_first, listings={'SGBC': 300}))
+    previous = reader.read('COURS')
+    data, added = reader.read_appended('COURS', previous)
+    assert added == 0
+    pd.testing.assert_frame_equal(data, previous)
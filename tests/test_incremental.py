@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm import kernels
+from brvm.incremental import EMA_WINDOWS, SMA_WINDOWS, IndicatorState
+from brvm.indicators import IndicatorCache, MarketIndicators
+from brvm.screener import screen
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+@pytest.fixture(scope='module')
+def history():
+    rng = np.random.default_rng(5)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (360, 5)), axis=0))
+    close[:200, 1] = np.nan  # Cotée pendant les séances ajoutées
+    close[rng.random(360) < 0.1, 2] = np.nan
+    close[:, 3] = np.repeat(np.round(close[::30, 3]), 30)
+    dates = pd.bdate_range('2021-01-01', periods=len(close))
+    return dates, ['A', 'B', 'C', 'D', 'E'], close
+
+
+def accessors(state):
+    values = {f'sma{window}': state.sma(window) for window in SMA_WINDOWS}
+    values.update({f'ema{window}': state.ema(window) for window in EMA_WINDOWS})
+    values.update({'rsi': state.rsi(), 'roc': state.roc(), 'close': state.close()})
+    values.update({f'macd_{name}': value for name, value in state.macd().items()})
+    values.update({f'bollinger_{name}': value for name, value in state.bollinger().items()})
+    return values
+
+
+@pytest.mark.parametrize('split', [5, 150, 250])
+def test_append_matches_full_recompute(history, split):
+    dates, tickers, close = history
+    state = IndicatorState.from_history(dates[:split], tickers, close[:split])
+    for row in range(split, len(close)):
+        state.append(dates[row], close[row])
+        if row % 37 == 0 or row == len(close) - 1:
+            full = accessors(IndicatorState.from_history(dates[:row + 1], tickers, close[:row + 1]))
+            for name, value in accessors(state).items():
+                np.testing.assert_allclose(value, full[name], rtol=1e-9, atol=1e-8, equal_nan=True, err_msg=name)
+
+
+def test_state_matches_kernels_at_last_date(history):
+    dates, tickers, close = history
+    state = IndicatorState.from_history(dates[:100], tickers, close[:100]).extended(dates, tickers, close)
+    np.testing.assert_allclose(state.sma(21)[0], kernels.sma(close, 21)[-1], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(state.ema(26)[0], kernels.ema(close, 26)[-1], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(state.rsi()[0], kernels.rsi(close, 14)[-1], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(state.roc()[0], kernels.roc(close, 12)[-1], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(state.macd()['diff'][0], kernels.macd(close)[2][-1], rtol=1e-9, atol=1e-8, equal_nan=True)
+    np.testing.assert_allclose(state.bollinger()['hband'][0], kernels.bollinger(close)[0][-1], rtol=1e-9, equal_nan=True)
+
+
+def test_saved_state_resumes(history):
+    dates, tickers, close = history
+    state = IndicatorState.from_history(dates[:300], tickers, close[:300])
+    restored = IndicatorState.from_arrays(state.arrays())
+    for row in range(300, len(close)):
+        state.append(dates[row], close[row])
+        restored.append(dates[row], close[row])
+    for name, value in accessors(state).items():
+        np.testing.assert_array_equal(accessors(restored)[name], value, err_msg=name)
+
+
+def test_empty_state_extends_like_full_history(history):
+    dates, tickers, close = history
+    empty = IndicatorState.from_history(dates[:0], tickers, close[:0])
+    assert not len(empty.dates)
+    restored = IndicatorState.from_arrays(empty.arrays())
+    full = accessors(IndicatorState.from_history(dates, tickers, close))
+    for state in (empty, restored):
+        state.extended(dates, tickers, close)
+        for name, value in accessors(state).items():
+            np.testing.assert_allclose(value, full[name], rtol=1e-9, atol=1e-8, equal_nan=True, err_msg=name)
+
+
+def test_workbook_without_dates_after_start(parquet_cache):
+    # Classeur arrêté avant START : aucune séance à afficher, sans IndexError
+    before = WorkbookStore(make_workbook(100, start='2019-01-01'), cache=parquet_cache)
+    assert not len(before.indicator_state().dates)
+    assert screen(before, IndicatorCache()).empty
+    assert MarketIndicators(before, cache=IndicatorCache()).rsi(14).shape == (0, 4)
+    before.prefetch().join()
+    # Version prolongée au-delà de START : état vide repris puis prolongé
+    after = WorkbookStore(make_workbook(600, start='2019-01-01'), cache=parquet_cache)
+    assert after.previous_key() == before.key
+    market = MarketIndicators(after, cache=IndicatorCache())
+    state = after.indicator_state()
+    assert state.dates[-1] == market.dates[-1]
+    np.testing.assert_allclose(state.rsi()[0], market.rsi(14)[-1], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(state.sma(20)[0], market.sma(20)[-1], rtol=1e-9, equal_nan=True)
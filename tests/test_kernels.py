@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import ROCIndicator, RSIIndicator
+from ta.trend import MACD, EMAIndicator, SMAIndicator
+from ta.volatility import BollingerBands
+
+from brvm import kernels
+
+
+@pytest.fixture(scope='module')
+def close():
+    # Colonnes sans trou, cotée tardivement, à trous, arrêtée en cours de route, à cours
+    # constants (titre peu liquide) et vide
+    rng = np.random.default_rng(3)
+    values = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (400, 6)), axis=0))
+    values[:150, 1] = np.nan
+    values[rng.random(400) < 0.1, 2] = np.nan
+    values[300:, 3] = np.nan
+    values[:, 4] = np.repeat(np.round(values[::40, 4]), 40)
+    values[:, 5] = np.nan
+    return values
+
+
+def assert_columns(result, expected):
+    for column, reference in enumerate(expected):
+        np.testing.assert_allclose(result[:, column], reference.to_numpy(dtype=float), rtol=1e-9, atol=1e-8, equal_nan=True)
+
+
+def series(close):
+    return [pd.Series(close[:, column]) for column in range(close.shape[1])]
+
+
+@pytest.mark.parametrize('window', [7, 21, 100])
+def test_sma(close, window):
+    assert_columns(kernels.sma(close, window), [SMAIndicator(s, window).sma_indicator() for s in series(close)])
+
+
+@pytest.mark.parametrize('window', [14, 100])
+def test_ema(close, window):
+    assert_columns(kernels.ema(close, window), [EMAIndicator(s, window).ema_indicator() for s in series(close)])
+
+
+def test_rsi(close):
+    assert_columns(kernels.rsi(close, 14), [RSIIndicator(s, 14).rsi() for s in series(close)])
+
+
+def test_macd(close):
+    line, signal, diff = kernels.macd(close, 12, 26, 9)
+    indicators = [MACD(s, 26, 12, 9) for s in series(close)]
+    assert_columns(line, [indicator.macd() for indicator in indicators])
+    assert_columns(signal, [indicator.macd_signal() for indicator in indicators])
+    assert_columns(diff, [indicator.macd_diff() for indicator in indicators])
+
+
+def test_bollinger(close):
+    hband, lband, mavg, hband_indicator, lband_indicator = kernels.bollinger(close, 20, 2)
+    indicators = [BollingerBands(s, 20, 2) for s in series(close)]
+    assert_columns(hband, [indicator.bollinger_hband() for indicator in indicators])
+    assert_columns(lband, [indicator.bollinger_lband() for indicator in indicators])
+    assert_columns(mavg, [indicator.bollinger_mavg() for indicator in indicators])
+    # Cours exactement sur une bande (fenêtre à deux paliers) : le signe de l'écart ne tient
+    # qu'aux arrondis, ces lignes sont exclues de la comparaison des indicateurs
+    for result, band, expected in [(hband_indicator, hband, [indicator.bollinger_hband_indicator() for indicator in indicators]),
+                                   (lband_indicator, lband, [indicator.bollinger_lband_indicator() for indicator in indicators])]:
+        ties = np.isclose(close, band, rtol=1e-12, atol=0.0)
+        assert_columns(np.where(ties, np.nan, result), [reference.where(~ties[:, column]) for column, reference in enumerate(expected)])
+
+
+def test_roc(close):
+    assert_columns(kernels.roc(close, 12), [ROCIndicator(s, 12).roc() for s in series(close)])
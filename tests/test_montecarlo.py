@@ -0,0 +1,21 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from brvm.montecarlo import BOOTSTRAP, COVARIANCE, simulate
+
+
+@pytest.mark.parametrize('method', [COVARIANCE, BOOTSTRAP])
+def test_chunks_stay_within_budget(method):
+    returns = np.random.default_rng(1).normal(0.0003, 0.01, (500, 10))
+    budget = 4 << 20
+    tracemalloc.start()
+    projection = simulate(returns, np.full(10, 100.0), 250, 5000, method, budget=budget)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # Résultats gardés pour tous les chemins (valeurs aux échéances, drawdowns) + un bloc
+    kept = projection.final.size * (len(projection.bands) + 1) * 8
+    assert peak <= kept + budget * 1.1
+    # Le découpage en blocs ne change pas les chemins tirés
+    assert np.allclose(simulate(returns, np.full(10, 100.0), 250, 5000, method, budget=budget * 8).final, projection.final)
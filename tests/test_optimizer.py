@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm import kernels
+from brvm.backtest import positions_from_states, run
+from brvm.indicators import START, IndicatorCache
+from brvm.optimizer import SPACES, sweep, walk_forward
+from brvm.prices import PriceCube
+from brvm.signals import BUY, NEUTRAL, SELL
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+class CubeWorkbook:
+    # Classeur réduit à son cube de prix (clôtures recopiées dans tous les champs)
+    def __init__(self, close, key):
+        self.key = key
+        self._cube = PriceCube(pd.bdate_range('2019-01-01', periods=len(close)), [f'T{j}' for j in range(close.shape[1])],
+                               np.repeat(close[:, :, None], 5, axis=2))
+
+    def price_cube(self):
+        return self._cube
+
+
+def test_sweep_matches_brute_force():
+    workbook = WorkbookStore(make_workbook(700, start='2020-06-01', listings={'ORAC': 400}))
+    table = sweep(workbook, 'Moyenne mobile', cache=IndicatorCache())
+    close = workbook.price_cube().field('Close', START)
+    sharpes = {}
+    for window in SPACES['Moyenne mobile']['window']:
+        # Règle écrite directement : achat au-dessus de la moyenne, vente en dessous
+        sma = kernels.sma(close, window)
+        with np.errstate(invalid='ignore'):
+            states = np.where(sma < close, BUY, np.where(sma > close, SELL, NEUTRAL))
+        sharpes[window] = np.nanmean(run(close, positions_from_states(states)).sharpe())
+    assert table.loc[0, 'window'] == max(sharpes, key=sharpes.get)
+    for row in table.itertuples(index=False):
+        assert row.Sharpe == pytest.approx(sharpes[row.window], rel=1e-9)
+    assert table['Sharpe'].is_monotonic_decreasing
+
+
+def test_walk_forward_never_reads_out_of_sample_dates():
+    rng = np.random.default_rng(2)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0.0002, 0.015, (420, 3)), axis=0))
+    reference = walk_forward(CubeWorkbook(close, 'reference'), 'Moyenne mobile', in_sample=150, out_of_sample=60,
+                             cache=IndicatorCache()).windows
+    assert len(reference) == 5
+    for k, middle in enumerate(reference['Début out-of-sample']):
+        # Cours modifiés à partir de la période out-of-sample de la fenêtre k
+        row = pd.bdate_range('2019-01-01', periods=len(close)).get_loc(middle)
+        changed = close.copy()
+        changed[row:] *= np.exp(np.cumsum(rng.normal(0, 0.05, changed[row:].shape), axis=0))
+        windows = walk_forward(CubeWorkbook(changed, f'changed{k}'), 'Moyenne mobile', in_sample=150, out_of_sample=60,
+                               cache=IndicatorCache()).windows
+        # Choix des fenêtres 0 à k identiques : seules leurs données in-sample comptent
+        pd.testing.assert_series_equal(windows['window'][:k + 1], reference['window'][:k + 1])
+        np.testing.assert_allclose(windows['Sharpe in-sample'][:k + 1], reference['Sharpe in-sample'][:k + 1], rtol=1e-12)
+        assert not np.allclose(windows['Sharpe out-of-sample'][k], reference['Sharpe out-of-sample'][k])
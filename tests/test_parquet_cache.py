@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+import pytest
+
+from brvm.parquet_cache import arrow_safe, from_arrow_safe
+from brvm.snapshot import Snapshot, export_snapshot
+from brvm.workbook import PROFILE_SHEETS, WorkbookStore
+from conftest import make_workbook
+
+
+@pytest.mark.filterwarnings('error')
+def test_mixed_columns_round_trip():
+    data = pd.DataFrame({'Champ': ['a', 'b', 'c', 'd', 'e'], 'X': ['texte', 3, 2.5, pd.Timestamp('2020-01-02'), None], 7: [1, 2, 3, 4, 5]})
+    buffer = io.BytesIO()
+    arrow_safe(data).to_parquet(buffer, index=False)
+    restored = from_arrow_safe(pd.read_parquet(io.BytesIO(buffer.getvalue())), list(data.columns))
+    assert [type(value) for value in restored['X'][:3]] == [str, int, float]
+    pd.testing.assert_frame_equal(restored, data.fillna({'X': float('nan')}), check_dtype=False)
+
+
+@pytest.mark.parametrize('sheet_name', PROFILE_SHEETS)
+def test_profile_sheets_match_excel(parquet_cache, tmp_path, sheet_name):
+    raw = make_workbook(50)
+    fresh = WorkbookStore(raw)._parse(sheet_name)
+    store = WorkbookStore(raw, cache=parquet_cache)
+    store.prefetch().join()
+    cached = WorkbookStore(cache=parquet_cache, key=store.key)._parse(sheet_name)
+    snapshot = Snapshot.from_bytes(export_snapshot(store), directory=str(tmp_path))
+    for data in (cached, snapshot.read(snapshot.key, sheet_name)):
+        pd.testing.assert_frame_equal(data, fresh)
+        assert [type(value) for value in data.iloc[:, 1]] == [type(value) for value in fresh.iloc[:, 1]]
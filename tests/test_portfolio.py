@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from brvm.portfolio import Portfolio
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+ARRAYS = ['prices', 'quantities', 'invested', 'bought', 'value', 'total']
+
+
+def test_appended_dates_match_full_recompute():
+    before = WorkbookStore(make_workbook(300)).price_cube()
+    after = WorkbookStore(make_workbook(320)).price_cube()
+    rows = [(before.dates[10], 'SNTS', 10.0, None, 50.0),
+            (before.dates[120], 'ORAC', 5.0, 980.0, 0.0),
+            (before.dates[250], 'SNTS', -4.0, None, 20.0)]
+    # Transaction sur une séance ajoutée, passée après la mise à jour
+    extended_rows = rows + [(after.dates[310], 'SGBC', 7.0, None, 10.0)]
+    portfolio = Portfolio.from_cube(before).add_all(rows)
+    incremental = portfolio.synced(after, extended_rows)
+    assert incremental is portfolio
+    full = Portfolio.from_cube(after).add_all(extended_rows)
+    assert incremental.dates.equals(full.dates)
+    for name in ARRAYS:
+        np.testing.assert_allclose(getattr(incremental, name), getattr(full, name), rtol=1e-12, equal_nan=True, err_msg=name)
+    pd.testing.assert_frame_equal(incremental.history(), full.history())
+    pd.testing.assert_frame_equal(incremental.summary(), full.summary())
+
+
+def test_rewritten_history_is_recomputed():
+    before = WorkbookStore(make_workbook(300)).price_cube()
+    after = WorkbookStore(make_workbook(320, seed=1)).price_cube()
+    rows = [(before.dates[10], 'SNTS', 10.0, None, 0.0)]
+    portfolio = Portfolio.from_cube(before).add_all(rows)
+    resynced = portfolio.synced(after, rows)
+    assert resynced is not portfolio
+    np.testing.assert_allclose(resynced.total, Portfolio.from_cube(after).add_all(rows).total)
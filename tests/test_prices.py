@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from brvm.prices import PriceCube
+from brvm.workbook import PRICE_SHEETS, WorkbookStore
+from conftest import make_workbook
+
+
+def sheets(raw):
+    store = WorkbookStore(raw)
+    return [store.prices(name) for name in ['COURS', 'OUVERTURE', 'MAX', 'MIN', 'VOLUME']]
+
+
+def assert_same_cube(cube, expected):
+    assert cube.dates.equals(expected.dates)
+    assert cube.tickers == expected.tickers
+    np.testing.assert_array_equal(cube.values, expected.values)
+
+
+@pytest.mark.parametrize('newest_first', [False, True])
+def test_extended_matches_cube_from_extended_workbook(newest_first):
+    base = PriceCube.from_sheets(*sheets(make_workbook(300, newest_first=newest_first, listings={'SGBC': 302})))
+    extended_sheets = sheets(make_workbook(310, newest_first=newest_first, listings={'SGBC': 302}))
+    cube = base.extended(*extended_sheets)
+    assert_same_cube(cube, PriceCube.from_sheets(*extended_sheets))
+    assert not cube.values.flags.writeable
+    assert base.extended(*sheets(make_workbook(300, newest_first=newest_first, listings={'SGBC': 302}))) is base
+
+
+def test_extended_refuses_changed_tickers():
+    base = PriceCube.from_sheets(*sheets(make_workbook(300)))
+    assert base.extended(*sheets(make_workbook(310, tickers=('SNTS', 'ORAC', 'BOAC')))) is None
+
+
+def test_appended_workbook_extends_previous_cube(parquet_cache):
+    WorkbookStore(make_workbook(300), cache=parquet_cache).prefetch().join()
+    store = WorkbookStore(make_workbook(310), cache=parquet_cache)
+    assert set(PRICE_SHEETS) <= set(store.appended) | set(store.reused) and store.previous_key() is not None
+    assert_same_cube(store.price_cube(), WorkbookStore(make_workbook(310)).price_cube())
@@ -0,0 +1,49 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from brvm.indicators import START, IndicatorCache
+from brvm.risk import max_drawdown, risk_metrics, risk_table
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def test_small_series_by_hand():
+    close = np.array([[100.0, np.nan], [110.0, np.nan], [99.0, 50.0], [np.nan, 40.0], [121.0, 60.0]])
+    # Plus haut 110 puis 99 : -10 % ; cours manquant prolongé ; 50 -> 40 : -20 %
+    np.testing.assert_allclose(max_drawdown(close), [-0.1, -0.2])
+    returns = np.array([[0.01], [-0.02], [0.03], [-0.04], [0.05], [np.nan]])
+    metrics = risk_metrics(returns, confidence=0.8)
+    observed = returns[:5, 0]
+    # Quantile 20 % : rang 0,8 entre -0,04 et -0,02, soit -0,024 ; seule -0,04 est au-delà
+    assert metrics['VaR historique %'][0] == pytest.approx(2.4)
+    assert metrics['CVaR historique %'][0] == pytest.approx(4.0)
+    assert metrics['Volatilité %'][0] == pytest.approx(observed.std(ddof=1) * np.sqrt(252) * 100)
+    z = NormalDist().inv_cdf(0.2)
+    assert metrics['VaR paramétrique %'][0] == pytest.approx(-(observed.mean() + z * observed.std(ddof=1)) * 100)
+
+
+def test_risk_table_matches_direct_computation():
+    workbook = WorkbookStore(make_workbook(600, start='2020-06-01', listings={'ORAC': 350}))
+    table = risk_table(workbook, confidence=0.95, cache=IndicatorCache())
+    cube = workbook.price_cube()
+    close = pd.DataFrame(cube.field('Close', START), columns=cube.tickers).ffill()
+    returns = close / close.shift() - 1
+    assert list(table.index) == cube.tickers
+    assert table.loc['SNTS', 'Indice'] == 'BRVMC' and table.loc['BRVMC', 'Indice'] == '-'
+    for ticker in ['SNTS', 'ORAC', 'SGBC']:
+        series = returns[ticker].dropna().to_numpy()
+        quantile = np.quantile(series, 0.05)
+        row = table.loc[ticker]
+        assert row['VaR historique %'] == pytest.approx(-quantile * 100)
+        assert row['CVaR historique %'] == pytest.approx(-series[series <= quantile].mean() * 100)
+        assert row['Volatilité %'] == pytest.approx(series.std(ddof=1) * np.sqrt(252) * 100)
+        prices = close[ticker].dropna()
+        assert row['Drawdown max %'] == pytest.approx((prices / prices.cummax() - 1).min() * 100)
+        both = returns[[ticker, 'BRVMC']].dropna().to_numpy()
+        covariance = np.cov(both, rowvar=False)
+        assert row['Bêta'] == pytest.approx(covariance[0, 1] / covariance[1, 1])
+        assert row['Corrélation'] == pytest.approx(np.corrcoef(both, rowvar=False)[0, 1])
+    assert np.isnan(table.loc['BRVMC', 'Bêta'])
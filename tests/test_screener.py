@@ -0,0 +1,36 @@
+import numpy as np
+
+from brvm.indicators import IndicatorCache, MarketIndicators
+from brvm.screener import screen
+from brvm.signals import BUY, SELL, global_score, signal_states
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def check_screen(workbook):
+    table = screen(workbook, IndicatorCache())
+    market = MarketIndicators(workbook, cache=IndicatorCache())
+    states = signal_states(market)[-1]
+    expected = global_score(states)
+    assert sorted(table.index) == sorted(market.tickers)
+    for j, ticker in enumerate(market.tickers):
+        row = table.loc[ticker]
+        assert row['Score'] == np.round(expected[j], 1)
+        assert row['Achats'] == (states[j] == BUY).sum()
+        assert row['Ventes'] == (states[j] == SELL).sum()
+        assert row['Cours'] == market.close()[-1, j]
+    assert (np.diff(table['Score'].to_numpy()) <= 0).all()
+
+
+def test_screen_matches_signal_states():
+    check_screen(WorkbookStore(make_workbook(600, start='2020-06-01', listings={'ORAC': 450})))
+
+
+def test_screen_on_appended_workbook(parquet_cache):
+    # Version prolongée : état des indicateurs repris de la version précédente
+    previous = WorkbookStore(make_workbook(600, start='2020-06-01'), cache=parquet_cache)
+    previous.indicator_state()
+    previous.prefetch().join()
+    workbook = WorkbookStore(make_workbook(620, start='2020-06-01'), cache=parquet_cache)
+    assert workbook.previous_key() is not None
+    check_screen(workbook)
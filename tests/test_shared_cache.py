@@ -0,0 +1,68 @@
+import gc
+
+from brvm.shared_cache import SessionHandle, SharedCache
+
+
+def make_cache(max_bytes=10):
+    return SharedCache(max_bytes=max_bytes, sizeof=len)
+
+
+def test_factory_called_once_per_key():
+    cache = make_cache()
+    calls = []
+    first = cache.acquire('a', lambda: calls.append('a') or b'aaaa')
+    assert cache.acquire('a', lambda: calls.append('a') or b'other') is first
+    assert calls == ['a'] and cache.nbytes() == 4
+
+
+def test_referenced_entries_are_never_evicted():
+    cache = make_cache()
+    for key in 'abc':
+        cache.acquire(key, lambda: b'xxxx')
+    # 12 octets pour 10 autorisés, mais toutes les entrées sont référencées
+    assert [cache.get(key) for key in 'abc'] == [b'xxxx'] * 3
+    cache.release('b')
+    assert cache.get('b') is None and cache.get('a') is not None and cache.nbytes() == 8
+
+
+def test_lru_honours_capacity():
+    cache = make_cache()
+    for key in 'abc':
+        cache.acquire(key, lambda: b'xxxx')
+        cache.release(key)
+    # Seules les deux dernières tiennent dans 10 octets ; la plus anciennement utilisée sort
+    assert cache.get('a') is None and cache.nbytes() == 8
+    cache.acquire('b', lambda: b'new!')
+    cache.release('b')
+    cache.acquire('d', lambda: b'xxxx')
+    cache.release('d')
+    assert cache.get('c') is None
+    assert cache.get('b') == b'xxxx' and cache.get('d') == b'xxxx'
+
+
+def test_dropped_handle_releases_its_reference():
+    cache = make_cache(max_bytes=4)
+    cache.acquire('a', lambda: b'xxxx')
+    handle = SessionHandle(cache, 'a')
+    cache.acquire('b', lambda: b'yyyy')
+    cache.release('b')
+    # 'a' est encore référencée par la session : c'est 'b' qui est évincée
+    assert cache.get('a') == b'xxxx' and cache.get('b') is None
+    del handle
+    gc.collect()
+    cache.acquire('c', lambda: b'zzzz')
+    cache.release('c')
+    assert cache.get('a') is None and cache.get('c') == b'zzzz'
+
+
+def test_explicit_release_happens_once():
+    cache = make_cache(max_bytes=0)
+    cache.acquire('a', lambda: b'xxxx')
+    cache.acquire('a', lambda: b'xxxx')
+    handle = SessionHandle(cache, 'a')
+    handle.release()
+    handle.release()
+    # Deux références prises, une seule rendue par la poignée
+    assert cache.get('a') == b'xxxx'
+    cache.release('a')
+    assert cache.get('a') is None
@@ -0,0 +1,17 @@
+import numpy as np
+
+from brvm.indicators import IndicatorCache
+from brvm.signals import score_matrix, weekly_scores
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def test_scores_are_missing_before_listing():
+    workbook = WorkbookStore(make_workbook(600, start='2020-06-01', listings={'ORAC': 400}))
+    cache = IndicatorCache()
+    scores = score_matrix(workbook, cache)
+    listing = workbook.cours()['Date'].iloc[400]
+    assert scores.loc[:listing - np.timedelta64(1, 'D'), 'ORAC'].isna().all()
+    assert scores.loc[listing:, 'ORAC'].notna().all()
+    assert scores['SNTS'].notna().all() and scores.stack().dropna().between(0, 100).all()
+    assert weekly_scores(workbook, 4, cache).notna().all().all()
@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from brvm.snapshot import Snapshot, export_snapshot, snapshot_manifest
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = WorkbookStore(make_workbook(300, listings={'ORAC': 100}))
+    raw = export_snapshot(store)
+    assert snapshot_manifest(raw)['key'] == store.key
+    snapshot = Snapshot.from_bytes(raw, directory=str(tmp_path))
+    loaded = WorkbookStore.from_snapshot(snapshot)
+    assert loaded.key == store.key and loaded.sheet_names == store.sheet_names
+    # Cube projeté en mémoire depuis le fichier, identique à celui du classeur
+    cube, expected = loaded.price_cube(), store.price_cube()
+    assert isinstance(cube.values, np.memmap) and os.path.samefile(cube.values.filename, snapshot.path)
+    assert cube.tickers == expected.tickers
+    assert cube.dates.equals(expected.dates)
+    np.testing.assert_array_equal(cube.values, expected.values)
+    for name in store.sheet_names:
+        pd.testing.assert_frame_equal(loaded.raw_sheet(name), store.raw_sheet(name))
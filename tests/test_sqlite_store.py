@@ -0,0 +1,21 @@
+import numpy as np
+
+from brvm.indicators import START
+from brvm.sqlite_store import PriceDatabase
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def test_history_read_back_from_database(tmp_path):
+    workbook = WorkbookStore(make_workbook(600, start='2020-06-01', listings={'ORAC': 400}))
+    database = PriceDatabase(str(tmp_path / 'brvm.sqlite'))
+    database.load_workbook(workbook)
+    assert database.tickers() == sorted(workbook.price_cube().tickers)
+    cube = workbook.price_cube()
+    for ticker in cube.tickers:
+        history = database.prices(ticker, start=START)
+        expected = cube.frame(ticker, start=START).dropna(subset=['Close'])
+        assert np.array_equal(history['Date'].to_numpy(), expected['Date'].to_numpy())
+        assert np.allclose(history['Close'], expected['Close'])
+    assert database.profile('Profil', 'SNTS')['Secteur'] == 'Banque'
+    database.close()
@@ -0,0 +1,50 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from brvm import workbook as workbook_module
+from brvm.excel_reader import SheetReader
+from brvm.workbook import WorkbookStore
+from conftest import make_workbook
+
+
+def test_imported_prices_override_appended_workbook(parquet_cache):
+    WorkbookStore(make_workbook(300), cache=parquet_cache).prefetch().join()
+    store = WorkbookStore(make_workbook(305), cache=parquet_cache)
+    assert store.appended
+    date = store.cours()['Date'].iloc[100]
+    imported = pd.DataFrame({'Date': [date], 'SNTS': [12345.0]})
+    variant = store.with_prices({'COURS': imported}, key='variant')
+    assert not variant.appended and not variant.reused and variant.previous_key() is None
+    cube = variant.price_cube()
+    assert cube.field('Close')[cube.dates.get_loc(date), cube.columns['SNTS']] == 12345.0
+    # Le classeur d'origine n'est pas modifié
+    original = store.price_cube()
+    assert original.field('Close')[original.dates.get_loc(date), original.columns['SNTS']] != 12345.0
+    assert np.array_equal(original.values, WorkbookStore(make_workbook(305)).price_cube().values, equal_nan=True)
+
+
+def test_cache_write_does_not_block_pages(parquet_cache, monkeypatch):
+    store = WorkbookStore(make_workbook(300), cache=parquet_cache)
+    started, release = threading.Event(), threading.Event()
+
+    class SlowReader(SheetReader):
+        # Lecture bloquée dans le thread d'écriture du cache seulement
+        def read(self, sheet_name, header=0):
+            if threading.current_thread() is not threading.main_thread():
+                started.set()
+                release.wait(5)
+            return super().read(sheet_name, header)
+    monkeypatch.setattr(workbook_module, 'SheetReader', SlowReader)
+    thread = threading.Thread(target=store.write_cache)
+    thread.start()
+    assert started.wait(10)
+    # Pendant la lecture d'une feuille pour le cache : la page lit les siennes, un second
+    # appel n'écrit rien
+    assert len(store.cours()) == 300
+    store.write_cache()
+    assert thread.is_alive()
+    release.set()
+    thread.join()
+    pd.testing.assert_frame_equal(parquet_cache.read(store.key, 'INDICES'), store.indices())